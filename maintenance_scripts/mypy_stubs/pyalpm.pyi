@@ -4,14 +4,29 @@ def vercmp(x: str, y: str) -> int: ...
 
 def version() -> str: ...
 
+def find_satisfier(pkgs: list[Package], depstring: str) -> Package | None: ...
+
+def sync_newversion(pkg: Package, dbs: list[DB]) -> Package | None: ...
+
+class error(Exception): ...  # noqa: N801,N818
+
 class DB:
     name: str
+    pkgcache: list[Package]
     def search(self, query: str) -> list[Package]: ...
     def get_pkg(self, name: str) -> Package: ...
 
+class Transaction:
+    to_add: list[Package]
+    def add_pkg(self, pkg: Package) -> None: ...
+    def prepare(self) -> None: ...
+    def release(self) -> None: ...
+
 class Handle:
+    ignorepkgs: list[str]
     def get_localdb(self) -> DB: ...
     def get_syncdbs(self) -> list[DB]: ...
+    def init_transaction(self, **flags: bool) -> Transaction: ...
 
 class Package:
     db: DB
@@ -16,6 +16,7 @@ whitelist: Whitelist = Whitelist()  # type: ignore[no-any-unimported]
 whitelist.__new__
 whitelist.Any
 whitelist.BinaryIO
+whitelist.BufferedIOBase
 whitelist.Final
 whitelist.IOStream
 whitelist.Iterable
@@ -45,9 +46,15 @@ whitelist.aur.AURPackageInfo.git_url
 whitelist.aur.AURPackageInfo.web_url
 whitelist.aur.AURPackageInfo.submitter
 whitelist.aur.AURPackageInfo.comaintainers
+whitelist.aur.AurDiskCacheEntry.fetched
 
 whitelist.build.PackageBuild._get_deps.deps_destination
 
+whitelist.build_cache.BuildCacheEntry.last_used
+
+whitelist.build_executor.BuildWorkerServer.allow_reuse_address
+whitelist.build_executor.BuildWorkerServer.daemon_threads
+
 whitelist.config.DeprecatedConfigValue.option
 whitelist.config.ConfigValueType.data_type
 whitelist.config.ConfigValueType.deprecated
@@ -91,7 +91,7 @@ LIST_ALL_ACTIONS: "Final[str]" = "_ALL_"
 
 PACMAN_APPEND_OPTS: "Final[ArgSchema]" = [
     Arg(None, "ignore", None, None),
-    Arg(None, "ignoregroup", None, None),  # @TODO
+    Arg(None, "ignoregroup", None, None),
     Arg(None, "overwrite", None, None),
     Arg(None, "assume-installed", None, None),  # @TODO
 ]
@@ -419,6 +419,10 @@ def get_pikaur_int_opts(action: str | None = None) -> ArgSchema:
                 None, "aur-clone-concurrency", None,
                 translate("how many git-clones/pulls to do from AUR"),
             ),
+            Arg(
+                None, "build-jobs", PikaurConfig().build.Jobs.get_int(),
+                translate("how many AUR packages to build at the same time"),
+            ),
         ]
     if action == "extras":
         result += [
@@ -525,6 +529,7 @@ class PikaurArgs(argparse.Namespace):
     dbpath: str | None
     devel: int
     ignore: list[str]
+    ignoregroup: list[str]
     info: bool | None
     keepbuild: bool | None
     level: int
@@ -537,6 +542,7 @@ class PikaurArgs(argparse.Namespace):
     sysupgrade: int
 
     aur_clone_concurrency: int | None
+    build_jobs: int
     build_gpgdir: str
     interactive_package_select: bool = False
     makepkg_config: str | None
@@ -567,6 +573,10 @@ class PikaurArgs(argparse.Namespace):
         for ignored in self.ignore or []:
             new_ignore += ignored.split(",")
         self.ignore = new_ignore
+        new_ignoregroup: list[str] = []
+        for ignored in self.ignoregroup or []:
+            new_ignoregroup += ignored.split(",")
+        self.ignoregroup = new_ignoregroup
 
         if self.debug:
             self.pikaur_debug = True
@@ -1,19 +1,35 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/"""
 
-from multiprocessing.pool import ThreadPool
-from typing import ClassVar, Final
+import asyncio
+import atexit
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from functools import partial
+from threading import Lock, Thread
+from time import time
+from typing import TYPE_CHECKING, ClassVar, Final, TypedDict
 from urllib import parse
 from urllib.parse import quote
 
+from .args import parse_args
+from .aur_index import AurOfflineIndex
+from .config import AurInfoCachePath, PikaurConfig
 from .exceptions import AURError
 from .logging_extras import create_logger
+from .os_utils import write_file_atomically
 from .pikatypes import AurBaseUrl, AURPackageInfo
 from .progressbar import ThreadSafeProgressBar
 from .provider import Provider
 from .urllib_helper import get_gzip_from_url, get_json_from_url
 from .version import VersionMatcher
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from typing import Any
+
 MAX_URL_LENGTH: Final = 8177  # default value in many web servers
+ARG_PARAM: Final = "&arg[]="
 
 
 logger = create_logger("aur_module")
@@ -49,6 +65,8 @@ def strip_aur_repo_name(pkg_name: str) -> str:
 def aur_rpc_search(
         search_query: str, search_by: str = "name-desc",
 ) -> list[AURPackageInfo]:
+    if AurOfflineIndex.is_enabled() and search_by in AurOfflineIndex.SEARCH_BY:
+        return AurOfflineIndex.search(strip_aur_repo_name(search_query), search_by=search_by)
     url = construct_aur_rpc_url_from_params({
         "v": 5,
         "type": "search",
@@ -64,23 +82,28 @@ def aur_rpc_search(
     ]
 
 
-def aur_rpc_search_provider(package_name: str) -> tuple[str, list[AURPackageInfo]]:
-    return package_name, aur_rpc_search(search_query=package_name, search_by="provides")
-
-
 def _get_aur_rpc_info_url(search_queries: list[str]) -> str:
     uri = parse.urlencode({
         "v": 5,
         "type": "info",
     })
     for package in search_queries:
-        uri += "&arg[]=" + quote(strip_aur_repo_name(package))
+        uri += _get_aur_rpc_info_arg(package)
     return construct_aur_rpc_url_from_uri(uri)
 
 
+def _get_aur_rpc_info_arg(package_name: str) -> str:
+    return ARG_PARAM + quote(strip_aur_repo_name(package_name))
+
+
 def aur_rpc_info(search_queries: list[str]) -> list[AURPackageInfo]:
     url = _get_aur_rpc_info_url(search_queries=search_queries)
-    result_json = get_json_from_url(url)
+    data = None
+    if len(url) >= MAX_URL_LENGTH:
+        # too many packages for GET request, sending them as a form instead:
+        url, query = url.split("?", 1)
+        data = query.encode()
+    result_json = get_json_from_url(url, data=data)
     if AurRPCErrors.ERROR_KEY in result_json:
         raise AURError(url=url, error=result_json[AurRPCErrors.ERROR_KEY])
     return [
@@ -103,26 +126,14 @@ def aur_rpc_info_with_progress(
     return result
 
 
-def aur_rpc_search_provider_with_progress(
-        package_name: str,
-        *, progressbar_length: int, with_progressbar: bool,
-) -> tuple[str, list[AURPackageInfo]]:
-    result = aur_rpc_search_provider(package_name=package_name)
-    if with_progressbar:
-        progressbar = ThreadSafeProgressBar.get(
-            progressbar_length=progressbar_length,
-            progressbar_id="aur_provides_search",
-        )
-        progressbar.update()
-    return result
-
-
 class AurPackageListCache:
 
     cache: ClassVar[list[str]] = []
 
     @classmethod
     def get(cls) -> list[str]:
+        if not cls.cache and AurOfflineIndex.is_enabled():
+            cls.cache = AurOfflineIndex.get_all_names()
         if not cls.cache:
             cls.cache = get_gzip_from_url(AurBaseUrl.get() + "/packages.gz").splitlines()[1:]
         return cls.cache
@@ -158,25 +169,302 @@ class AurProvidedPackageSearchCache:
         return cls.cache.get(provides)
 
 
+class AurDiskCacheEntry(TypedDict):
+    fetched: float
+    value: "Any"
+
+
+class AurDiskCache:
+    """
+    AUR RPC results persisted between pikaur runs.
+    Entries older than `[network]AurCacheExpiration` seconds are stale,
+    and `--refresh` flag makes all of them stale.
+    """
+
+    INFO: Final = "info"
+    # results of RPC `provides` search:
+    PROVIDES: Final = "provides"
+    # reverse index of `provides` of the packages in `INFO`, could be incomplete,
+    # so it's only used for fetching info of the providers in fewer requests:
+    PROVIDERS: Final = "providers"
+    FORMAT_VERSION: Final = 1
+
+    _data: ClassVar[dict[str, dict[str, AurDiskCacheEntry]] | None] = None
+    _lock: ClassVar[Lock] = Lock()
+    _save_registered: ClassVar[bool] = False
+
+    @classmethod
+    def get_expiration(cls) -> int:
+        return PikaurConfig().network.AurCacheExpiration.get_int()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.get_expiration() > 0
+
+    @classmethod
+    def _load(cls) -> dict[str, dict[str, AurDiskCacheEntry]]:
+        if cls._data is not None:
+            return cls._data
+        cache_path = AurInfoCachePath()
+        data = {}
+        try:
+            data = json.loads(cache_path.read_bytes())
+        except (OSError, ValueError) as exc:
+            logger.debug("can't load {}: {}", cache_path, exc)
+        if not isinstance(data, dict) or data.get("version") != cls.FORMAT_VERSION:
+            data = {}
+        loaded_data: dict[str, dict[str, AurDiskCacheEntry]] = {
+            section: data.get(section, {})
+            for section in (cls.INFO, cls.PROVIDES, cls.PROVIDERS)
+        }
+        cls._data = loaded_data
+        return loaded_data
+
+    @classmethod
+    def get(cls, section: str, key: str) -> "Any":
+        if (not cls.is_enabled()) or parse_args().refresh:
+            return None
+        with cls._lock:
+            entry = cls._load()[section].get(key)
+        if (not entry) or (time() - entry["fetched"] > cls.get_expiration()):
+            return None
+        return entry["value"]
+
+    @classmethod
+    def put(cls, section: str, key: str, value: "Any") -> None:
+        if not cls.is_enabled():
+            return
+        with cls._lock:
+            cls._load()[section][key] = {"fetched": time(), "value": value}
+            if not cls._save_registered:
+                atexit.register(cls.save)
+                cls._save_registered = True
+
+    @classmethod
+    def get_package(cls, pkg_name: str) -> AURPackageInfo | None:
+        aur_json = cls.get(cls.INFO, pkg_name)
+        return AURPackageInfo.from_json(aur_json) if aur_json else None
+
+    @classmethod
+    def put_package(cls, pkg: AURPackageInfo) -> None:
+        cls.put(cls.INFO, pkg.name, asdict(pkg))
+        for provided_line in pkg.provides:
+            provided_name = VersionMatcher(provided_line).pkg_name
+            providers: list[str] = cls.get(cls.PROVIDERS, provided_name) or []
+            if pkg.name not in providers:
+                cls.put(cls.PROVIDERS, provided_name, [*providers, pkg.name])
+
+    @classmethod
+    def _evict(cls, entries: dict[str, AurDiskCacheEntry]) -> dict[str, AurDiskCacheEntry]:
+        """Drop expired entries and then the oldest ones exceeding `[network]AurCacheSize`."""
+        now = time()
+        expiration = cls.get_expiration()
+        max_size = PikaurConfig().network.AurCacheSize.get_int()
+        fresh_entries = sorted(
+            (
+                (key, entry) for key, entry in entries.items()
+                if now - entry["fetched"] <= expiration
+            ),
+            key=lambda key_and_entry: key_and_entry[1]["fetched"],
+        )
+        return dict(fresh_entries[-max_size:] if max_size > 0 else [])
+
+    @classmethod
+    def save(cls) -> None:
+        with cls._lock:
+            if cls._data is None:
+                return
+            data: dict[str, Any] = {
+                section: cls._evict(entries)
+                for section, entries in cls._data.items()
+            }
+            data["version"] = cls.FORMAT_VERSION
+            cache_path = AurInfoCachePath()
+            try:
+                write_file_atomically(cache_path, json.dumps(data).encode())
+            except OSError as exc:
+                logger.debug("can't save {}: {}", cache_path, exc)
+
+
 def get_all_aur_names() -> list[str]:
     return AurPackageListCache.get()
 
 
-def get_max_pkgs_chunks(package_names: list[str]) -> list[list[str]]:
+def get_max_pkgs_chunks(
+        package_names: list[str], post_batch_size: int | None = None,
+) -> list[list[str]]:
+    """
+    Split package names into as few RPC `info` requests as possible:
+    fitting into `MAX_URL_LENGTH` for GET requests,
+    or by `[network]AurPostBatchSize` if more than one GET request would be needed.
+    """
     chunks = []
     chunk: list[str] = []
-    pkgs_to_do = package_names.copy()
-    while pkgs_to_do:
-        if len(_get_aur_rpc_info_url([*chunk, pkgs_to_do[0]])) < MAX_URL_LENGTH:
-            chunk.append(pkgs_to_do.pop(0))
-        else:
+    base_url_length = len(_get_aur_rpc_info_url([]))
+    url_length = base_url_length
+    for package_name in package_names:
+        arg_length = len(_get_aur_rpc_info_arg(package_name))
+        if chunk and (url_length + arg_length >= MAX_URL_LENGTH):
             chunks.append(chunk)
             chunk = []
+            url_length = base_url_length
+        chunk.append(package_name)
+        url_length += arg_length
     if chunk:
         chunks.append(chunk)
+    if post_batch_size is None:
+        post_batch_size = PikaurConfig().network.AurPostBatchSize.get_int()
+    if len(chunks) > 1 and post_batch_size > 0:
+        return [
+            package_names[chunk_start:chunk_start + post_batch_size]
+            for chunk_start in range(0, len(package_names), post_batch_size)
+        ]
     return chunks
 
 
+class AurClient:
+    """
+    Runs AUR RPC requests in a single background event loop,
+    with at most `[network]AurConcurrency` requests at once.
+    Concurrent lookups of the same package or the same search query
+    are waiting for the same in-flight request.
+    """
+
+    _loop: ClassVar[asyncio.AbstractEventLoop | None] = None
+    _loop_lock: ClassVar[Lock] = Lock()
+    _executor: ClassVar[ThreadPoolExecutor | None] = None
+    _semaphore: ClassVar[asyncio.Semaphore | None] = None
+    _tasks: ClassVar[set[asyncio.Task[None]]] = set()
+    _info_requests: ClassVar[dict[str, asyncio.Future[AURPackageInfo | None]]] = {}
+    _search_requests: ClassVar[dict[tuple[str, str], asyncio.Task[list[AURPackageInfo]]]] = {}
+
+    @classmethod
+    def get_concurrency(cls) -> int:
+        return max(PikaurConfig().network.AurConcurrency.get_int(), 1)
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._loop_lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                Thread(target=loop.run_forever, name="aur_client", daemon=True).start()
+                cls._loop = loop
+            return cls._loop
+
+    @classmethod
+    def _run[T](cls, coro: "Coroutine[Any, Any, T]") -> T:
+        return asyncio.run_coroutine_threadsafe(coro, cls._get_loop()).result()
+
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        semaphore = cls._semaphore
+        if semaphore is None:
+            concurrency = cls.get_concurrency()
+            semaphore = cls._semaphore = asyncio.Semaphore(concurrency)
+            cls._executor = ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix="aur_client",
+            )
+        return semaphore
+
+    @classmethod
+    async def _call[T](cls, func: "Callable[[], T]") -> T:
+        async with cls._get_semaphore():
+            return await asyncio.get_running_loop().run_in_executor(cls._executor, func)
+
+    @classmethod
+    async def _fetch_info_chunk(
+            cls, chunk: list[str], *, progressbar_length: int, with_progressbar: bool,
+    ) -> None:
+        try:
+            aur_pkgs = await cls._call(partial(
+                aur_rpc_info_with_progress,
+                search_queries=chunk,
+                progressbar_length=progressbar_length,
+                with_progressbar=with_progressbar,
+            ))
+        except BaseException as exc:
+            for pkg_name in chunk:
+                future = cls._info_requests.pop(pkg_name)
+                future.set_exception(exc)
+                future.exception()  # don't warn about it if nobody is awaiting
+            return
+        results = {aur_pkg.name: aur_pkg for aur_pkg in aur_pkgs}
+        for pkg_name in chunk:
+            cls._info_requests.pop(pkg_name).set_result(results.get(pkg_name))
+
+    @classmethod
+    async def _info(
+            cls, package_names: list[str], *, with_progressbar: bool,
+    ) -> list[AURPackageInfo]:
+        new_package_names = [
+            pkg_name for pkg_name in dict.fromkeys(package_names)
+            if pkg_name not in cls._info_requests
+        ]
+        loop = asyncio.get_running_loop()
+        for pkg_name in new_package_names:
+            cls._info_requests[pkg_name] = loop.create_future()
+        futures = [cls._info_requests[pkg_name] for pkg_name in package_names]
+        search_chunks = get_max_pkgs_chunks(new_package_names)
+        for chunk in search_chunks:
+            task = loop.create_task(cls._fetch_info_chunk(
+                chunk,
+                progressbar_length=len(search_chunks),
+                with_progressbar=with_progressbar,
+            ))
+            cls._tasks.add(task)
+            task.add_done_callback(cls._tasks.discard)
+        return [
+            aur_pkg for aur_pkg in await asyncio.gather(*futures)
+            if aur_pkg
+        ]
+
+    @classmethod
+    async def _search(
+            cls, search_query: str, search_by: str,
+            progress_callback: "Callable[[], None] | None" = None,
+    ) -> list[AURPackageInfo]:
+        key = (search_query, search_by)
+        if key not in cls._search_requests:
+            task = asyncio.create_task(cls._call(partial(
+                aur_rpc_search, search_query=search_query, search_by=search_by,
+            )))
+            task.add_done_callback(lambda _task: cls._search_requests.pop(key, None))
+            cls._search_requests[key] = task
+        try:
+            return await asyncio.shield(cls._search_requests[key])
+        finally:
+            if progress_callback:
+                progress_callback()
+
+    @classmethod
+    async def _search_many(
+            cls, search_queries: list[str], search_by: str,
+            progress_callback: "Callable[[], None] | None" = None,
+    ) -> dict[str, list[AURPackageInfo] | BaseException]:
+        results = await asyncio.gather(
+            *(
+                cls._search(query, search_by, progress_callback)
+                for query in search_queries
+            ),
+            return_exceptions=True,
+        )
+        return dict(zip(search_queries, results, strict=True))
+
+    @classmethod
+    def info(
+            cls, package_names: list[str], *, with_progressbar: bool = False,
+    ) -> list[AURPackageInfo]:
+        return cls._run(cls._info(package_names, with_progressbar=with_progressbar))
+
+    @classmethod
+    def search_many(
+            cls, search_queries: list[str], search_by: str = "name-desc",
+            progress_callback: "Callable[[], None] | None" = None,
+    ) -> dict[str, list[AURPackageInfo] | BaseException]:
+        """Exceptions are returned instead of results for the failed queries."""
+        return cls._run(cls._search_many(search_queries, search_by, progress_callback))
+
+
 def find_aur_packages(
         package_names: list[str], *, with_progressbar: bool = False,
 ) -> tuple[list[AURPackageInfo], list[str]]:
@@ -188,6 +476,10 @@ def find_aur_packages(
     cached_not_found_pkgs: list[str] = []
     for package_name in package_names[:]:
         aur_pkg = AurPackageSearchCache.get(package_name)
+        if aur_pkg is None:
+            aur_pkg = AurDiskCache.get_package(package_name)
+            if aur_pkg:
+                AurPackageSearchCache.put(aur_pkg)
         if aur_pkg is NOT_FOUND:
             package_names.remove(package_name)
             cached_not_found_pkgs.append(package_name)
@@ -199,25 +491,15 @@ def find_aur_packages(
         else:
             logger.debug("find_aur_packages: {} uncached", package_name)
 
-    if package_names:
-        with ThreadPool() as pool:
-            search_chunks = get_max_pkgs_chunks(package_names)
-            requests = [
-                pool.apply_async(aur_rpc_info_with_progress, [], {
-                    "search_queries": chunk,
-                    "progressbar_length": len(search_chunks),
-                    "with_progressbar": with_progressbar,
-                })
-                for chunk in search_chunks
-            ]
-            pool.close()
-            results = [request.get() for request in requests]
-            pool.join()
-            for result in results:
-                for aur_pkg_result in result:
-                    AurPackageSearchCache.put(aur_pkg_result)
-                    if aur_pkg_result.name in package_names:
-                        json_results.append(aur_pkg_result)
+    if package_names and AurOfflineIndex.is_enabled():
+        for aur_pkg_result in AurOfflineIndex.get_packages(package_names):
+            AurPackageSearchCache.put(aur_pkg_result)
+            json_results.append(aur_pkg_result)
+    elif package_names:
+        for aur_pkg_result in AurClient.info(package_names, with_progressbar=with_progressbar):
+            AurPackageSearchCache.put(aur_pkg_result)
+            AurDiskCache.put_package(aur_pkg_result)
+            json_results.append(aur_pkg_result)
 
     found_aur_packages = [
         result.name for result in json_results
@@ -236,6 +518,72 @@ def find_aur_packages(
     return json_results, not_found_packages
 
 
+def _get_disk_cached_providers(provides: str) -> list[AURPackageInfo] | None:
+    provider_names: list[str] | None = AurDiskCache.get(AurDiskCache.PROVIDES, provides)
+    if not provider_names:
+        return None
+    aur_pkgs, not_found_pkgs = find_aur_packages(provider_names)
+    if not_found_pkgs:
+        return None
+    AurProvidedPackageSearchCache.put(pkgs=aur_pkgs, provides=provides)
+    return aur_pkgs
+
+
+def _get_cached_providers(
+        provides: str, version_matcher: VersionMatcher | None = None,
+) -> list[AURPackageInfo] | None:
+    aur_pkgs = AurProvidedPackageSearchCache.get(provides)
+    if aur_pkgs is None:
+        aur_pkgs = _get_disk_cached_providers(provides)
+    if aur_pkgs and version_matcher:
+        aur_pkgs = [aur_pkg for aur_pkg in aur_pkgs if version_matcher(aur_pkg.version)]
+    return aur_pkgs
+
+
+def _prefetch_known_providers(package_names: list[str]) -> None:
+    """Fetch info for all the known providers at once."""
+    find_aur_packages(sorted({
+        provider_name
+        for package_name in package_names
+        for section in (AurDiskCache.PROVIDES, AurDiskCache.PROVIDERS)
+        for provider_name in (AurDiskCache.get(section, package_name) or [])
+    }))
+
+
+def _put_provided_search_result(provides: str, aur_pkgs: list[AURPackageInfo]) -> None:
+    AurProvidedPackageSearchCache.put(pkgs=aur_pkgs, provides=provides)
+    if not aur_pkgs:
+        return
+    AurDiskCache.put(AurDiskCache.PROVIDES, provides, [pkg.name for pkg in aur_pkgs])
+
+
+def prefetch_aur_provided_deps(package_names: list[str]) -> None:
+    """
+    Search providers of all the `package_names` which are not cached yet
+    with a single batch of concurrent AUR requests,
+    so `find_aur_provided_deps()` for them would be served from the cache.
+    """
+    package_names = sorted({strip_aur_repo_name(name) for name in package_names})
+    if not package_names:
+        return
+    _prefetch_known_providers(package_names)
+    not_cached_names = [
+        package_name for package_name in package_names
+        if _get_cached_providers(package_name) is None
+    ]
+    if not not_cached_names:
+        return
+    search_results = AurClient.search_many(not_cached_names, search_by="provides")
+    for provided_pkg_name, search_result in search_results.items():
+        if isinstance(search_result, BaseException):
+            # will be retried and reported by `find_aur_provided_deps()`:
+            logger.debug(
+                "prefetch_aur_provided_deps: {} failed: {}", provided_pkg_name, search_result,
+            )
+            continue
+        _put_provided_search_result(provided_pkg_name, search_result)
+
+
 def find_aur_provided_deps(  # pylint: disable=too-many-branches
         package_names: list[str],
         version_matchers: dict[str, VersionMatcher] | None = None,
@@ -247,8 +595,11 @@ def find_aur_provided_deps(  # pylint: disable=too-many-branches
     num_packages = len(package_names)
     json_results = []
     cached_not_found_pkgs: list[str] = []
+    _prefetch_known_providers(package_names)
     for package_name in package_names[:]:
-        aur_pkgs = AurProvidedPackageSearchCache.get(package_name)
+        aur_pkgs = _get_cached_providers(
+            package_name, version_matchers.get(package_name) if version_matchers else None,
+        )
         if aur_pkgs is None:
             logger.debug("find_aur_provided_deps: {} not cached", package_name)
         elif len(aur_pkgs) == 0:
@@ -274,47 +625,48 @@ def find_aur_provided_deps(  # pylint: disable=too-many-branches
             logger.debug("find_aur_provided_deps: {} cached", package_name)
 
     if package_names:
-        with ThreadPool() as pool:
-            requests = [
-                pool.apply_async(aur_rpc_search_provider_with_progress, [], {
-                    "package_name": package_name,
-                    "progressbar_length": len(package_names),
-                    "with_progressbar": with_progressbar,
-                })
-                for package_name in package_names
-            ]
-            pool.close()
-            results = [request.get() for request in requests]
-            pool.join()
-            for provided_pkg_name, aur_pkgs in results:
-                if not aur_pkgs:
-                    continue
-                AurProvidedPackageSearchCache.put(pkgs=aur_pkgs, provides=provided_pkg_name)
-                matching_aur_pkgs = [
-                    aur_pkg
-                    for aur_pkg in aur_pkgs
-                    if (
-                        (provided_pkg_name in package_names)
-                        and (
-                            (not version_matchers)
-                            or (version_matchers[provided_pkg_name](aur_pkg.version))
-                        )
-                    )
-                ]
-                if not matching_aur_pkgs:
-                    continue
-                if len(matching_aur_pkgs) == 1:
-                    aur_pkg = matching_aur_pkgs[0]
-                else:
-                    aur_pkg = Provider.choose(
-                        dependency=(
-                            version_matchers[provided_pkg_name].line
-                            if version_matchers
-                            else provided_pkg_name
-                        ),
-                        options=matching_aur_pkgs,
+        search_results = AurClient.search_many(
+            package_names,
+            search_by="provides",
+            progress_callback=(
+                lambda: ThreadSafeProgressBar.get(
+                    progressbar_length=len(package_names),
+                    progressbar_id="aur_provides_search",
+                ).update()
+            ) if with_progressbar else None,
+        )
+        for provided_pkg_name, search_result in search_results.items():
+            if isinstance(search_result, BaseException):
+                raise search_result
+            aur_pkgs = search_result
+            _put_provided_search_result(provided_pkg_name, aur_pkgs)
+            if not aur_pkgs:
+                continue
+            matching_aur_pkgs = [
+                aur_pkg
+                for aur_pkg in aur_pkgs
+                if (
+                    (provided_pkg_name in package_names)
+                    and (
+                        (not version_matchers)
+                        or (version_matchers[provided_pkg_name](aur_pkg.version))
                     )
-                json_results += [aur_pkg]
+                )
+            ]
+            if not matching_aur_pkgs:
+                continue
+            if len(matching_aur_pkgs) == 1:
+                aur_pkg = matching_aur_pkgs[0]
+            else:
+                aur_pkg = Provider.choose(
+                    dependency=(
+                        version_matchers[provided_pkg_name].line
+                        if version_matchers
+                        else provided_pkg_name
+                    ),
+                    options=matching_aur_pkgs,
+                )
+            json_results += [aur_pkg]
 
     found_aur_packages = [
         result.name for result in json_results
@@ -337,4 +689,6 @@ def get_repo_url(package_base_name: str) -> str:
 
 
 def get_all_aur_packages() -> list[AURPackageInfo]:
+    if AurOfflineIndex.is_enabled():
+        return AurOfflineIndex.get_all_packages()
     return find_aur_packages(get_all_aur_names(), with_progressbar=True)[0]
@@ -4,7 +4,7 @@ from multiprocessing.pool import ThreadPool
 from typing import TYPE_CHECKING
 
 from .args import parse_args
-from .aur import find_aur_packages, find_aur_provided_deps
+from .aur import find_aur_packages, find_aur_provided_deps, prefetch_aur_provided_deps
 from .exceptions import (
     DependencyVersionMismatchError,
     PackagesNotFoundInAURError,
@@ -15,7 +15,7 @@ from .logging_extras import create_logger
 from .pacman import PackageDB
 from .pikaprint import print_error
 from .pikatypes import PackageSource
-from .version import VersionMatcher
+from .version import DepSpec, VersionMatcher
 
 if TYPE_CHECKING:
     from .pikatypes import AURPackageInfo
@@ -188,18 +188,19 @@ def check_requested_pkgs(
                     aur_pkg.name != dep_name
             ) and (
                 not aur_pkg.provides or dep_name not in [
-                    VersionMatcher(prov_line).pkg_name
+                    DepSpec.parse(prov_line).pkg_name
                     for prov_line in aur_pkg.provides
                 ]
             ):
                 continue
+            version_matches = version_matcher.match_many([
+                aur_pkg.version,
+                *(VersionMatcher(prov_line).version for prov_line in aur_pkg.provides),
+            ])
             if (
-                    not version_matcher(aur_pkg.version)
+                    not version_matches[0]
                     and (
-                        not aur_pkg.provides or not min(
-                            version_matcher(VersionMatcher(prov_line).version)
-                            for prov_line in aur_pkg.provides
-                        )
+                        not aur_pkg.provides or not all(version_matches[1:])
                     )
             ):
                 raise DependencyVersionMismatchError(
@@ -213,13 +214,12 @@ def check_requested_pkgs(
     return not_found_in_requested_pkgs
 
 
-def find_missing_deps_for_aur_pkg(
+def find_not_installed_deps_for_aur_pkg(
         aur_pkg_name: str,
         version_matchers: dict[str, VersionMatcher],
         aur_pkgs_info: "list[AURPackageInfo]",
-        requested_aur_pkgs_info: "list[AURPackageInfo]",
 ) -> list[str]:
-
+    """Deps which are neither requested, nor installed, nor available in the repos."""
     # check if any of packages requested to install by user
     # are satisfying any of the deps:
     not_found_in_requested_pkgs = check_requested_pkgs(
@@ -228,7 +228,7 @@ def find_missing_deps_for_aur_pkg(
         aur_pkgs_info=aur_pkgs_info,
     )
     if not not_found_in_requested_pkgs:
-        logger.debug("find_missing_deps_for_aur_pkg: NOT not_found_in_requested_pkgs")
+        logger.debug("find_not_installed_deps_for_aur_pkg: NOT not_found_in_requested_pkgs")
         return []
 
     # check among local pkgs:
@@ -238,7 +238,7 @@ def find_missing_deps_for_aur_pkg(
         source=PackageSource.LOCAL,
     )
     if not not_found_local_pkgs:
-        logger.debug("find_missing_deps_for_aur_pkg: NOT not_found_local_pkgs")
+        logger.debug("find_not_installed_deps_for_aur_pkg: NOT not_found_local_pkgs")
         return []
 
     # repo pkgs:
@@ -248,7 +248,20 @@ def find_missing_deps_for_aur_pkg(
         source=PackageSource.REPO,
     )
     if not not_found_repo_pkgs:
-        logger.debug("find_missing_deps_for_aur_pkg: NOT not_found_repo_pkgs")
+        logger.debug("find_not_installed_deps_for_aur_pkg: NOT not_found_repo_pkgs")
+        return []
+
+    return not_found_repo_pkgs
+
+
+def find_missing_deps_for_aur_pkg(
+        aur_pkg_name: str,
+        version_matchers: dict[str, VersionMatcher],
+        not_found_repo_pkgs: list[str],
+        aur_pkgs_info: "list[AURPackageInfo]",
+        requested_aur_pkgs_info: "list[AURPackageInfo]",
+) -> list[str]:
+    if not not_found_repo_pkgs:
         return []
 
     # try finding those packages in AUR
@@ -280,7 +293,7 @@ def find_missing_deps_for_aur_pkg(
             pkg_version_matchers = [version_matcher]
         else:
             for provide in aur_dep_info.provides:
-                version_matcher = version_matchers.get(VersionMatcher(provide).pkg_name)
+                version_matcher = version_matchers.get(DepSpec.parse(provide).pkg_name)
                 if version_matcher is not None:
                     pkg_version_matchers.append(version_matcher)
         logger.debug(
@@ -301,6 +314,15 @@ def find_missing_deps_for_aur_pkg(
     return not_found_repo_pkgs
 
 
+def prefetch_aur_deps(not_found_repo_pkgs: list[str]) -> None:
+    """
+    Look up all the deps which are missing locally in AUR at once,
+    so resolving them for each package separately would be served from the cache.
+    """
+    _aur_deps_info, not_found_aur_deps = find_aur_packages(not_found_repo_pkgs)
+    prefetch_aur_provided_deps(not_found_aur_deps)
+
+
 def find_aur_deps(  # pylint: disable=too-many-branches
         aur_pkgs_infos: "list[AURPackageInfo]",
         skip_checkdeps_for_pkgnames: list[str] | None = None,
@@ -341,39 +363,58 @@ def find_aur_deps(  # pylint: disable=too-many-branches
             if aur_pkg_deps:
                 all_deps_for_aur_packages[aur_pkg.name] = aur_pkg_deps
 
+        PackageDB.prefetch_deps([
+            version_matcher.line
+            for deps_for_aur_package in all_deps_for_aur_packages.values()
+            for version_matcher in deps_for_aur_package.values()
+        ])
         not_found_local_pkgs: list[str] = []
+        # check local and repo deps concurrently:
         with ThreadPool() as pool:
-            all_requests = {}
-            for aur_pkg_name, deps_for_aur_package in all_deps_for_aur_packages.items():
-                all_requests[aur_pkg_name] = pool.apply_async(
-                    find_missing_deps_for_aur_pkg, (
+            all_requests = {
+                aur_pkg_name: pool.apply_async(
+                    find_not_installed_deps_for_aur_pkg, (
                         aur_pkg_name,
                         deps_for_aur_package,
                         aur_pkgs_info,
-                        initial_pkg_infos2_todo,
                     ),
                 )
+                for aur_pkg_name, deps_for_aur_package in all_deps_for_aur_packages.items()
+            }
             pool.close()
             pool.join()
-            for aur_pkg_name, request in all_requests.items():
-                try:
-                    results = request.get()
-                except DependencyVersionMismatchError as exc:
-                    if exc.who_depends not in parse_args().ignore:
-                        raise
-                except Exception as exc:
-                    logger.debug(
-                        "exception during aur search: {}: {}",
-                        exc.__class__.__name__, exc,
-                    )
-                    print_error(translate(
-                        "Can't resolve dependencies for AUR package '{pkg}':",
-                    ).format(pkg=aur_pkg_name))
+        # and AUR ones in batches (errors are handled per package below):
+        prefetch_aur_deps(sorted({
+            dep_name
+            for request in all_requests.values() if request.successful()
+            for dep_name in request.get()
+        }))
+        for aur_pkg_name, deps_for_aur_package in all_deps_for_aur_packages.items():
+            try:
+                results = find_missing_deps_for_aur_pkg(
+                    aur_pkg_name,
+                    deps_for_aur_package,
+                    all_requests[aur_pkg_name].get(),
+                    aur_pkgs_info,
+                    initial_pkg_infos2_todo,
+                )
+            except DependencyVersionMismatchError as exc:
+                if exc.who_depends not in parse_args().ignore:
                     raise
-                not_found_local_pkgs += results
-                for dep_pkg_name in results:
-                    if dep_pkg_name not in package_names:
-                        result_aur_deps.setdefault(aur_pkg_name, []).append(dep_pkg_name)
+                continue
+            except Exception as exc:
+                logger.debug(
+                    "exception during aur search: {}: {}",
+                    exc.__class__.__name__, exc,
+                )
+                print_error(translate(
+                    "Can't resolve dependencies for AUR package '{pkg}':",
+                ).format(pkg=aur_pkg_name))
+                raise
+            not_found_local_pkgs += results
+            for dep_pkg_name in results:
+                if dep_pkg_name not in package_names:
+                    result_aur_deps.setdefault(aur_pkg_name, []).append(dep_pkg_name)
 
         iter_package_names = []
         for pkg_name in not_found_local_pkgs:
@@ -435,6 +476,11 @@ def find_repo_deps_of_aur_pkgs(
         skip_checkdeps_for_pkgnames: list[str],
 ) -> list[VersionMatcher]:
     new_dep_names: list[VersionMatcher] = []
+    PackageDB.prefetch_deps([
+        version_matcher.line
+        for aur_pkg in aur_pkgs
+        for version_matcher in get_aur_pkg_deps_and_version_matchers(aur_pkg).values()
+    ])
     with ThreadPool() as pool:
         results = [
             pool.apply_async(
@@ -0,0 +1,186 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, ClassVar, Final
+
+from .args import parse_args
+from .config import AurIndexPath, PikaurConfig
+from .i18n import translate
+from .logging_extras import create_logger
+from .os_utils import mkdir
+from .pikaprint import print_stderr
+from .pikatypes import AurBaseUrl, AURPackageInfo
+from .urllib_helper import get_gzip_from_url
+from .version import VersionMatcher
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+    from typing import Any
+
+
+logger = create_logger("aur_index")
+
+
+SQL_SCHEMA: Final = """
+CREATE TABLE packages (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    info TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE provides (
+    provides TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX provides_idx ON provides (provides);
+"""
+
+
+def _escape_like(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class AurOfflineIndex:
+    """
+    SQLite index built from the whole AUR metadata dump (`packages-meta-ext-v1.json.gz`),
+    used instead of AUR RPC if `[network]AurIndexExpiration` is set.
+    """
+
+    FORMAT_VERSION: Final = 1
+    SEARCH_BY: Final = ("name", "name-desc", "provides")
+
+    _connection: ClassVar[sqlite3.Connection | None] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_expiration(cls) -> int:
+        return PikaurConfig().network.AurIndexExpiration.get_int()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.get_expiration() > 0
+
+    @classmethod
+    def get_dump_url(cls) -> str:
+        return AurBaseUrl.get() + "/packages-meta-ext-v1.json.gz"
+
+    @classmethod
+    def _is_outdated(cls, index_path: "Path") -> bool:
+        if parse_args().refresh > 1:
+            return True
+        try:
+            return time() - index_path.stat().st_mtime > cls.get_expiration()
+        except FileNotFoundError:
+            return True
+
+    @classmethod
+    def build(cls, index_path: "Path", aur_dump: "list[dict[str, Any]]") -> None:
+        tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        mkdir(tmp_path.parent)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            with connection:
+                connection.executescript(SQL_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {cls.FORMAT_VERSION}")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO packages VALUES (?, ?, ?)",
+                    (
+                        (aur_json["Name"], aur_json.get("Description") or "", json.dumps(aur_json))
+                        for aur_json in aur_dump
+                    ),
+                )
+                connection.executemany(
+                    "INSERT INTO provides VALUES (?, ?)",
+                    (
+                        (VersionMatcher(provided_line).pkg_name, aur_json["Name"])
+                        for aur_json in aur_dump
+                        for provided_line in (aur_json.get("Provides") or [])
+                    ),
+                )
+        finally:
+            connection.close()
+        tmp_path.replace(index_path)
+
+    @classmethod
+    def update(cls) -> None:
+        url = cls.get_dump_url()
+        if not parse_args().quiet:
+            print_stderr(translate("Downloading AUR package index..."))
+        logger.debug("downloading {}", url)
+        cls.build(AurIndexPath(), json.loads(get_gzip_from_url(url)))
+
+    @classmethod
+    def _connect(cls, index_path: "Path") -> sqlite3.Connection:
+        return sqlite3.connect(
+            f"{index_path.as_uri()}?mode=ro", uri=True, check_same_thread=False,
+        )
+
+    @classmethod
+    def _has_current_format(cls, index_path: "Path") -> bool:
+        connection = cls._connect(index_path)
+        try:
+            format_version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError as exc:
+            logger.debug("can't read {}: {}", index_path, exc)
+            return False
+        finally:
+            connection.close()
+        return format_version == cls.FORMAT_VERSION
+
+    @classmethod
+    def _get_connection(cls) -> sqlite3.Connection:
+        if cls._connection is None:
+            index_path = AurIndexPath()
+            if cls._is_outdated(index_path) or not cls._has_current_format(index_path):
+                cls.update()
+            cls._connection = cls._connect(index_path)
+        return cls._connection
+
+    @classmethod
+    def _query(cls, sql: str, params: "Iterable[str]" = ()) -> list[tuple[str]]:
+        with cls._lock:
+            return cls._get_connection().execute(sql, tuple(params)).fetchall()
+
+    @classmethod
+    def _to_packages(cls, rows: "Iterable[tuple[str]]") -> list[AURPackageInfo]:
+        return [AURPackageInfo.from_json(json.loads(info)) for (info, ) in rows]
+
+    @classmethod
+    def get_all_names(cls) -> list[str]:
+        return [name for (name, ) in cls._query("SELECT name FROM packages")]
+
+    @classmethod
+    def get_all_packages(cls) -> list[AURPackageInfo]:
+        return cls._to_packages(cls._query("SELECT info FROM packages"))
+
+    @classmethod
+    def get_packages(cls, package_names: list[str]) -> list[AURPackageInfo]:
+        return cls._to_packages(cls._query(
+            "SELECT info FROM packages WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(package_names), ),
+        ))
+
+    @classmethod
+    def search(cls, search_query: str, search_by: str = "name-desc") -> list[AURPackageInfo]:
+        if search_by == "provides":
+            return cls._to_packages(cls._query(
+                "SELECT info FROM packages WHERE name = ?"
+                " OR name IN (SELECT name FROM provides WHERE provides = ?)",
+                (search_query, search_query),
+            ))
+        pattern = f"%{_escape_like(search_query)}%"
+        if search_by == "name":
+            return cls._to_packages(cls._query(
+                "SELECT info FROM packages WHERE name LIKE ? ESCAPE '\\'",
+                (pattern, ),
+            ))
+        return cls._to_packages(cls._query(
+            "SELECT info FROM packages"
+            " WHERE name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\'",
+            (pattern, pattern),
+        ))
@@ -3,6 +3,7 @@
 
 import os
 import shutil
+from dataclasses import dataclass
 from glob import glob
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
@@ -10,6 +11,8 @@ from typing import TYPE_CHECKING, ClassVar
 
 from .args import parse_args
 from .aur import find_aur_packages, get_repo_url
+from .build_cache import BuildCache
+from .build_executor import BuildExecutor, BuildJob, BuildResult
 from .config import (
     DECORATION,
     AurReposCachePath,
@@ -29,6 +32,7 @@ from .exceptions import (
 )
 from .filelock import FileLock
 from .i18n import translate, translate_many
+from .local_repo import LocalRepo
 from .logging_extras import create_logger
 from .makepkg_config import MakePkgCommand, MakepkgConfig, get_pkgdest
 from .os_utils import (
@@ -56,13 +60,13 @@ from .privilege import (
     sudo,
 )
 from .prompt import (
+    InteractivePromptLock,
     ask_to_continue,
     get_editor_or_exit,
     get_input,
     retry_interactive_command_or_exit,
 )
 from .spawn import (
-    PIPE,
     interactive_spawn,
     joined_spawn,
     spawn,
@@ -70,14 +74,15 @@ from .spawn import (
 from .srcinfo import SrcInfo
 from .updates import is_devel_pkg
 from .urllib_helper import wrap_proxy_env
-from .version import VersionMatcher, compare_versions
+from .version import DepSpec, compare_versions
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Final
 
     from .args import PikaurArgs
     from .pacman import ProvidedDependency
-    from .spawn import InteractiveSpawn, SpawnArgs
+    from .spawn import InteractiveSpawn
 
 logger = create_logger("build")
 
@@ -86,8 +91,9 @@ ARCH_ANY: "Final" = "any"
 IGNORE_PATHS_WHEN_COPYING: "Final[tuple[str]]" = (".git", )
 
 
+@dataclass
 class PkgbuildChanged(Exception):  # noqa: N818
-    pass
+    build: "PackageBuild"
 
 
 def _shell(cmds: list[str]) -> "InteractiveSpawn":
@@ -411,7 +417,7 @@ class PackageBuild(ComparableType):
                         str(self.pkgbuild_path),
                         str(self.build_dir / DEFAULT_PKGBUILD_BASENAME),
                     ]))
-                    raise PkgbuildChanged
+                    raise PkgbuildChanged(build=self)
                 self.get_latest_dev_sources(check_dev_pkgs=check_dev_pkgs)
                 return
             if answer == translate("i"):
@@ -450,42 +456,62 @@ class PackageBuild(ComparableType):
     def all_deps_to_install(self) -> list[str]:
         return self.new_make_deps_to_install + self.new_deps_to_install
 
-    def _filter_built_deps(
-            self,
+    @staticmethod
+    def get_all_provided_pkgnames(
             all_package_builds: dict[str, "PackageBuild"],
-    ) -> None:
-        logger.debug("<< _FILTER_BUILT_DEPS")
-
-        def _mark_dep_resolved(dep: str) -> None:
-            logger.debug("  _mark_dep_resolved: {}", dep)
-            if dep in self.new_make_deps_to_install:
-                self.new_make_deps_to_install.remove(dep)
-            if dep in self.new_deps_to_install:
-                self.new_deps_to_install.remove(dep)
-
+    ) -> dict[str, str]:
+        """Package names by the names they provide, including their own."""
         all_provided_pkgnames: dict[str, str] = {}
         for pkg_build in all_package_builds.values():
             for pkg_name in pkg_build.package_names:
                 srcinfo = SrcInfo(
                     pkgbuild_path=pkg_build.pkgbuild_path, package_name=pkg_name,
                 )
-                stripped_pkg_name = VersionMatcher(pkg_name).pkg_name
+                stripped_pkg_name = DepSpec.parse(pkg_name).pkg_name
                 all_provided_pkgnames.update(
                     dict.fromkeys(
                         [stripped_pkg_name, *(
-                            VersionMatcher(name).pkg_name
+                            DepSpec.parse(name).pkg_name
                             for name in srcinfo.get_values("provides")
                         )],
                         stripped_pkg_name,
                     ),
                 )
+        return all_provided_pkgnames
+
+    def get_build_order_deps(
+            self,
+            all_package_builds: dict[str, "PackageBuild"],
+            all_provided_pkgnames: dict[str, str],
+    ) -> set[str]:
+        """Package bases which need to be built before this one."""
+        self.get_deps(all_package_builds, filter_built=False)
+        return {
+            all_package_builds[all_provided_pkgnames[dep_name]].package_base
+            for dep in self.all_deps_to_install
+            if (dep_name := DepSpec.parse(dep).pkg_name) in all_provided_pkgnames
+        } - {self.package_base}
+
+    def _filter_built_deps(
+            self,
+            all_package_builds: dict[str, "PackageBuild"],
+    ) -> None:
+        logger.debug("<< _FILTER_BUILT_DEPS")
+
+        def _mark_dep_resolved(dep: str) -> None:
+            logger.debug("  _mark_dep_resolved: {}", dep)
+            if dep in self.new_make_deps_to_install:
+                self.new_make_deps_to_install.remove(dep)
+            if dep in self.new_deps_to_install:
+                self.new_deps_to_install.remove(dep)
 
+        all_provided_pkgnames = self.get_all_provided_pkgnames(all_package_builds)
         self.built_deps_to_install = {}
 
         logger.debug("  self.all_deps_to_install={}", self.all_deps_to_install)
         logger.debug("  all_provided_pkgnames={}", all_provided_pkgnames)
         for dep in self.all_deps_to_install:
-            dep_name = VersionMatcher(dep).pkg_name
+            dep_name = DepSpec.parse(dep).pkg_name
             logger.debug("    {} {}", dep, dep_name)
             if dep_name not in all_provided_pkgnames:
                 continue
@@ -513,6 +539,18 @@ class PackageBuild(ComparableType):
             ["--noconfirm"] if self.args.noconfirm else []
         )
 
+    def get_all_built_deps(
+            self,
+            all_package_builds: dict[str, "PackageBuild"],
+    ) -> dict[str, Path]:
+        """Already built deps of the package, along with their own already built deps."""
+        self.get_deps(all_package_builds)
+        built_deps = dict(self.built_deps_to_install)
+        for pkg_name, pkg_build in all_package_builds.items():
+            if pkg_name in self.built_deps_to_install:
+                built_deps.update(pkg_build.get_all_built_deps(all_package_builds))
+        return built_deps
+
     def install_built_deps(
             self,
             all_package_builds: dict[str, "PackageBuild"],
@@ -543,7 +581,7 @@ class PackageBuild(ComparableType):
             self.failed = True
             raise dep_exc from None
         finally:
-            PackageDB.discard_local_cache()
+            PackageDB.update_local_cache()
 
     def set_built_package_path(self) -> None:  # pylint: disable=too-many-branches
         pkg_paths_spawn = spawn(
@@ -616,13 +654,97 @@ class PackageBuild(ComparableType):
             if pkg_path and pkg_path.exists():
                 self.built_packages_paths[pkg_name] = pkg_path
 
+    def restore_from_build_cache(self, build_cache_key: str) -> bool:
+        if self.args.rebuild and not self.is_dep:
+            return False
+        if not BuildCache.restore(build_cache_key, get_pkgdest() or PackageCachePath()):
+            return False
+        self.set_built_package_path()
+        if len(self.built_packages_paths) != len(self.package_names):
+            return False
+        message = translate_many(
+            "Package {pkg} is restored from the build cache.",
+            "Packages {pkg} are restored from the build cache.",
+            len(self.package_names),
+        ).format(
+            pkg=bold_line(", ".join(self.package_names)),
+        )
+        print_stderr(f"{color_line(DECORATION, ColorsHighlight.green)} {message}\n")
+        return True
+
+    def restore_from_local_repo(self) -> bool:
+        if self.args.rebuild and not self.is_dep:
+            return False
+        local_repo_pkgs = [
+            LocalRepo.find_package(pkg_name, self.get_version(pkg_name))
+            for pkg_name in self.package_names
+        ]
+        destination = get_pkgdest() or PackageCachePath()
+        for local_repo_pkg in local_repo_pkgs:
+            if not local_repo_pkg or not LocalRepo.download(local_repo_pkg, destination):
+                return False
+        self.set_built_package_path()
+        if len(self.built_packages_paths) != len(self.package_names):
+            return False
+        message = translate_many(
+            "Package {pkg} is downloaded from the local repository.",
+            "Packages {pkg} are downloaded from the local repository.",
+            len(self.package_names),
+        ).format(
+            pkg=bold_line(", ".join(self.package_names)),
+        )
+        print_stderr(f"{color_line(DECORATION, ColorsHighlight.green)} {message}\n")
+        return True
+
+    def store_built_packages(self, build_cache_key: str | None) -> None:
+        if build_cache_key:
+            BuildCache.put(
+                build_cache_key, self.package_base, self.built_packages_paths.values(),
+            )
+        LocalRepo.publish(self.built_packages_paths.values())
+
+    def has_build_results(self, all_package_builds: dict[str, "PackageBuild"]) -> bool:
+        """
+        Packages could be restored from the local repo, the build cache
+        or are already built in PKGDEST (see `build()`).
+        """
+        if (self.args.rebuild and not self.is_dep) or is_devel_pkg(self.package_base):
+            return False
+        self.prepare_build_destination()
+        return all(
+            LocalRepo.find_package(pkg_name, self.get_version(pkg_name))
+            for pkg_name in self.package_names
+        ) or BuildCache.contains(
+            BuildCache.get_key(self, all_package_builds),
+        ) or self.is_already_built()
+
+    def prefetch_sources(self) -> None:
+        if self._source_repo_updated:
+            return
+        self.prepare_build_destination()
+        result = joined_spawn(
+            isolate_root_cmd(
+                [*MakePkgCommand.get(), "--verifysource", "--nodeps"],
+                cwd=self.build_dir,
+            ),
+            cwd=self.build_dir,
+        )
+        # errors would be handled during the build itself:
+        if result.returncode != 0:
+            logger.debug(
+                "failed to prefetch sources for {}: {}", self.package_base, result.stdout_text,
+            )
+
+    def is_already_built(self) -> bool:
+        self.set_built_package_path()
+        return (
+            not (self.args.rebuild and not self.is_dep) and
+            len(self.built_packages_paths) == len(self.package_names)
+        )
+
     def check_if_already_built(self) -> bool:
         self.get_latest_dev_sources()
-        self.set_built_package_path()
-        if (
-                not (self.args.rebuild and not self.is_dep) and
-                len(self.built_packages_paths) == len(self.package_names)
-        ):
+        if self.is_already_built():
             message = translate_many(
                 "Package {pkg} is already built. Pass '--rebuild' flag to force the build.",
                 "Packages {pkg} are already built. Pass '--rebuild' flag to force the build.",
@@ -719,20 +841,28 @@ class PackageBuild(ComparableType):
         with FileLock(BuildDepsLockPath()):
             self.get_deps(all_package_builds)
             if self.all_deps_to_install or self.built_deps_to_install:
-                PackageDB.discard_local_cache()
+                PackageDB.update_local_cache()
                 self._local_pkgs_wo_build_deps = set(PackageDB.get_local_dict().keys())
             self.install_built_deps(all_package_builds)
             self._install_repo_deps()
-            PackageDB.discard_local_cache()
+            PackageDB.update_local_cache()
             self._local_pkgs_with_build_deps = set(PackageDB.get_local_dict().keys())
             self._local_provided_pkgs_with_build_deps = PackageDB.get_local_provided_dict()
 
-    def _remove_installed_deps(self) -> None:
+    def prepare_build_deps(self, all_package_builds: dict[str, "PackageBuild"]) -> None:
+        if BuildExecutor.get().installs_deps:
+            # build worker installs them itself:
+            self.built_deps_to_install = self.get_all_built_deps(all_package_builds)
+        else:
+            self.install_all_deps(all_package_builds)
+
+    def pop_installed_deps(self) -> set[str]:
+        """Build deps installed for this package which need to be removed after the build."""
         # logger.debug(
         #     "Local pkgs before installing build deps: {}", self._local_pkgs_wo_build_deps,
         # )
         if not self._local_pkgs_wo_build_deps:
-            return
+            return set()
 
         logger.debug("Gonna compute diff of installed pkgs")
         deps_packages_installed = self._local_pkgs_with_build_deps.difference(
@@ -741,10 +871,11 @@ class PackageBuild(ComparableType):
         deps_packages_removed = self._local_pkgs_wo_build_deps.difference(
             self._local_pkgs_with_build_deps,
         )
+        self._local_pkgs_wo_build_deps = set()
         logger.debug("Deps installed: {}", deps_packages_installed)
         logger.debug("Deps removed: {}", deps_packages_removed)
         if not deps_packages_installed:
-            return
+            return set()
 
         # check if there is diff incosistency because of the package replacement:
         if deps_packages_removed:
@@ -772,25 +903,9 @@ class PackageBuild(ComparableType):
             print_error(error_text)
             if not ask_to_continue():
                 raise DependencyError(error_text)
-        if not deps_packages_installed or self.args.keepbuilddeps:
-            return
-
-        message = translate("Removing already installed dependencies for {}").format(
-            bold_line(", ".join(self.package_names)),
-        )
-        print_stderr(f"{color_line(DECORATION, ColorsHighlight.purple)} {message}:")
-        retry_interactive_command_or_exit(
-            sudo(
-                # pacman --remove flag conflicts with some --sync options:
-                [
-                    *self._get_pacman_command(ignore_args=["overwrite"]),
-                    "--remove",
-                    *list(deps_packages_installed),
-                ],
-            ),
-            pikspect=True,
-        )
-        PackageDB.discard_local_cache()
+        if self.args.keepbuilddeps:
+            return set()
+        return deps_packages_installed
 
     def check_pkg_arch(self) -> None:
         if self.skip_carch_check:
@@ -829,8 +944,8 @@ class PackageBuild(ComparableType):
             skip_file_checksums: bool,
             skip_check: bool,
             no_prepare: bool,
-    ) -> "InteractiveSpawn":
-        cmd_args = MakePkgCommand.get() + makepkg_args
+    ) -> BuildResult:
+        cmd_args = makepkg_args.copy()
         if skip_pgp_check:
             cmd_args += ["--skippgpcheck"]
         if skip_file_checksums:
@@ -846,21 +961,15 @@ class PackageBuild(ComparableType):
         if self.build_gpgdir:
             env["GNUPGHOME"] = self.build_gpgdir
 
-        cmd_args = isolate_root_cmd(cmd_args, cwd=self.build_dir, env=env)
-        spawn_kwargs: SpawnArgs = {
-            "cwd": str(self.build_dir),
-            "env": {**os.environ, **env},
-        }
-        if self.args.hide_build_log:
-            spawn_kwargs.update({
-                "stdout": PIPE,
-                "stderr": PIPE,
-            })
-
-        result = interactive_spawn(
-            cmd_args,
-            **spawn_kwargs,
-        )
+        result = BuildExecutor.get().run(BuildJob(
+            build_dir=self.build_dir,
+            artifacts_dir=(
+                (not MakePkgCommand.pkgdest_skipped and get_pkgdest()) or self.build_dir
+            ),
+            makepkg_args=cmd_args,
+            env=env,
+            dep_packages=list(self.built_deps_to_install.values()),
+        ))
         print_stdout()
         return result
 
@@ -965,15 +1074,16 @@ class PackageBuild(ComparableType):
             if answer == translate("e"):  # pragma: no cover
                 editor_cmd = get_editor_or_exit()
                 if editor_cmd:
-                    interactive_spawn(
-                        [*editor_cmd, str(self.pkgbuild_path)],
-                    )
+                    with InteractivePromptLock():
+                        interactive_spawn(
+                            [*editor_cmd, str(self.pkgbuild_path)],
+                        )
                     interactive_spawn(isolate_root_cmd([
                         "cp",
                         str(self.pkgbuild_path),
                         str(self.build_dir / DEFAULT_PKGBUILD_BASENAME),
                     ]))
-                    raise PkgbuildChanged
+                    raise PkgbuildChanged(build=self)
                 continue
             if answer == translate("a"):
                 raise SysExit(125)
@@ -987,29 +1097,76 @@ class PackageBuild(ComparableType):
             all_package_builds: dict[str, "PackageBuild"],
             resolved_conflicts: list[list[str]],
             skip_checkfunc_for_pkgnames: list[str],
+            *,
+            remove_deps: bool = True,
     ) -> None:
         self.resolved_conflicts = resolved_conflicts
 
         self.prepare_build_destination()
 
-        self.install_all_deps(all_package_builds)
+        # pkgver of VCS packages is known only after fetching their sources:
+        build_cache_key: str | None = None
+        if not is_devel_pkg(self.package_base):
+            if self.restore_from_local_repo():
+                return
+            build_cache_key = BuildCache.get_key(self, all_package_builds)
+            if self.restore_from_build_cache(build_cache_key):
+                return
+
+        self.prepare_build_deps(all_package_builds)
+        built_with_makepkg = False
         try:
             skip_check = False
             for pkg_name in self.package_names:
                 if pkg_name in skip_checkfunc_for_pkgnames:
                     skip_check = True
-            build_succeeded = (
-                True
-                if self.check_if_already_built()
-                else self.build_with_makepkg(skip_check=skip_check)
-            )
+            if self.check_if_already_built():
+                build_succeeded = True
+            else:
+                build_cache_key = build_cache_key or BuildCache.get_key(self, all_package_builds)
+                build_succeeded = self.restore_from_build_cache(build_cache_key)
+                if not build_succeeded:
+                    build_succeeded = built_with_makepkg = self.build_with_makepkg(
+                        skip_check=skip_check,
+                    )
         finally:
-            self._remove_installed_deps()
+            if remove_deps:
+                remove_build_deps([self])
 
         if not build_succeeded:
             self.failed = True
             raise BuildError(message="failed to build", build=self)
         self.set_built_package_path()
+        if built_with_makepkg:
+            self.store_built_packages(build_cache_key)
+
+
+def remove_build_deps(package_builds: list[PackageBuild]) -> None:
+    deps_packages_installed: set[str] = set().union(*(
+        pkg_build.pop_installed_deps() for pkg_build in package_builds
+    ))
+    if not deps_packages_installed:
+        return
+
+    message = translate("Removing already installed dependencies for {}").format(
+        bold_line(", ".join(
+            pkg_name for pkg_build in package_builds for pkg_name in pkg_build.package_names
+        )),
+    )
+    print_stderr(f"{color_line(DECORATION, ColorsHighlight.purple)} {message}:")
+    retry_interactive_command_or_exit(
+        sudo(
+            # pacman --remove flag conflicts with some --sync options:
+            [
+                *get_pacman_command(ignore_args=["overwrite"]),
+                *(["--noconfirm"] if parse_args().noconfirm else []),
+                "--remove",
+                *list(deps_packages_installed),
+            ],
+        ),
+        pikspect=True,
+    )
+    PackageDB.update_local_cache()
 
 
 class AlreadyClonedRepos:
@@ -1081,3 +1238,34 @@ def clone_aur_repos(package_infos: list[AURInstallInfo]) -> dict[str, PackageBui
         for pkgbase, pkg_names in packages_bases.items()
         for pkg_name in pkg_names
     }
+
+
+def prefetch_sources(
+        package_builds: "Iterable[PackageBuild]",
+        all_package_builds: dict[str, PackageBuild],
+) -> None:
+    """
+    Download and verify sources of all the packages concurrently
+    (up to `[build]PrefetchJobs` at a time) before building them one after another.
+    Packages which are going to be skipped by the build should be already filtered out.
+    """
+    pool_size = 1 if UsingDynamicUsers() else PikaurConfig().build.PrefetchJobs.get_int()
+    if pool_size <= 0:
+        return
+    prefetch_builds = [
+        pkg_build for pkg_build in set(package_builds)
+        if pkg_build.reviewed and not pkg_build.has_build_results(all_package_builds)
+    ]
+    if not prefetch_builds:
+        return
+    message = translate("Downloading sources for {}").format(
+        bold_line(", ".join(
+            pkg_name for pkg_build in prefetch_builds for pkg_name in pkg_build.package_names
+        )),
+    )
+    print_stderr(f"{color_line(DECORATION, ColorsHighlight.purple)} {message}...")
+    with (
+            TTYRestoreContext(),
+            ThreadPool(processes=pool_size) as pool,
+    ):
+        pool.map(PackageBuild.prefetch_sources, prefetch_builds)
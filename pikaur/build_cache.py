@@ -0,0 +1,306 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, ClassVar, Final, TypedDict
+
+from .build_executor import get_build_workers
+from .config import BuildResultsCachePath, PikaurConfig
+from .db_snapshot import PackageDBSnapshot
+from .logging_extras import create_logger
+from .makepkg_config import MakePkgCommand, MakepkgConfig
+from .os_utils import mkdir, remove_dir, write_file_atomically
+from .pikatypes import PackageSource
+from .srcinfo import SrcInfo
+from .version import DepSpec
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .build import PackageBuild
+
+
+logger = create_logger("build_cache")
+
+
+MAKEPKG_CONFIG_KEYS: Final = (
+    "CARCH",
+    "CHOST",
+    "CPPFLAGS",
+    "CFLAGS",
+    "CXXFLAGS",
+    "LDFLAGS",
+    "LTOFLAGS",
+    "RUSTFLAGS",
+    "DEBUG_CFLAGS",
+    "DEBUG_CXXFLAGS",
+    "DEBUG_RUSTFLAGS",
+    "BUILDENV",
+    "OPTIONS",
+    "STRIP_BINARIES",
+    "STRIP_SHARED",
+    "STRIP_STATIC",
+    "PACKAGER",
+    "PKGEXT",
+)
+# index of the build cache could be imported from another machine,
+# so its keys and file names are not trusted to be used as paths as-is:
+KEY_RE: Final = re.compile(r"[0-9a-f]{64}")
+PACKAGE_FILENAME_RE: Final = re.compile(r"[^/.][^/]*\.pkg\.tar(\.[a-z0-9]+)?(\.sig)?")
+
+
+class BuildCacheEntry(TypedDict):
+    package_base: str
+    files: list[str]
+    size: int
+    last_used: float
+
+
+def hash_file_content(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+class BuildCache:
+    """
+    Built packages stored by the hash of everything which affects the build result:
+    AUR commit, PKGBUILD and `.SRCINFO` (with the sources checksums),
+    effective `makepkg.conf`, build workers and versions of the build deps.
+    Least recently used entries are evicted when cache exceeds `[build]BuildCacheSize` MiB.
+    """
+
+    FORMAT_VERSION: Final = 1
+    INDEX_FILENAME: Final = "index.json"
+
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_max_size(cls) -> int:
+        return PikaurConfig().build.BuildCacheSize.get_int() * 1024 * 1024
+
+    @staticmethod
+    def _get_dep_version(
+            dep_line: str,
+            pkg_build: "PackageBuild",
+            all_package_builds: dict[str, "PackageBuild"],
+            all_provided_pkgnames: dict[str, str],
+    ) -> str | None:
+        dep_name = DepSpec.parse(dep_line).pkg_name
+        if pkg_name := all_provided_pkgnames.get(dep_name):
+            dep_build = all_package_builds[pkg_name]
+            if dep_build is pkg_build:
+                return None
+            return f"{pkg_name}={dep_build.get_version(pkg_name)}"
+        for package_source in (PackageSource.LOCAL, PackageSource.REPO):
+            if pkg := PackageDBSnapshot.find_satisfier(package_source, dep_line):
+                return f"{pkg.name}={pkg.version}"
+        return dep_line
+
+    @classmethod
+    def get_key(
+            cls,
+            pkg_build: "PackageBuild",
+            all_package_builds: dict[str, "PackageBuild"],
+    ) -> str:
+        """
+        Hash of the build inputs of the package in its build dir.
+        Deps which are not installed yet are resolved to the versions
+        which are going to be installed for the build.
+        """
+        src_info = SrcInfo(pkg_build.build_dir)
+        all_provided_pkgnames = pkg_build.get_all_provided_pkgnames(all_package_builds)
+        deps = {
+            cls._get_dep_version(
+                dep_line, pkg_build, all_package_builds, all_provided_pkgnames,
+            )
+            for version_matcher in (
+                *src_info.get_build_depends().values(),
+                *src_info.get_build_makedepends().values(),
+            )
+            for dep_line in version_matcher.line.split(",")
+        }
+        key_data = {
+            "version": cls.FORMAT_VERSION,
+            "package_names": sorted(pkg_build.package_names),
+            "commit": pkg_build.current_hash,
+            "pkgbuild": hash_file_content(pkg_build.build_dir / "PKGBUILD"),
+            "srcinfo": hash_file_content(src_info.path),
+            "makepkg_command": MakePkgCommand.get(),
+            "makepkg_config": {key: MakepkgConfig.get(key) for key in MAKEPKG_CONFIG_KEYS},
+            "ignore_arch": pkg_build.skip_carch_check,
+            "build_workers": sorted(get_build_workers()),
+            "deps": sorted(dep for dep in deps if dep),
+        }
+        logger.debug("build cache key data for {}: {}", pkg_build.package_base, key_data)
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    @classmethod
+    def _load_index(cls, cache_dir: Path) -> dict[str, BuildCacheEntry]:
+        index_path = cache_dir / cls.INDEX_FILENAME
+        try:
+            data = json.loads(index_path.read_bytes())
+        except (OSError, ValueError) as exc:
+            logger.debug("can't load {}: {}", index_path, exc)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != cls.FORMAT_VERSION:
+            return {}
+        entries: dict[str, BuildCacheEntry] = {}
+        for key, entry in data["entries"].items():
+            if cls._is_valid_entry(key, entry):
+                entries[key] = entry
+            else:
+                logger.debug("skipping invalid build cache entry {} in {}", key, index_path)
+        return entries
+
+    @staticmethod
+    def _is_valid_entry(key: str, entry: BuildCacheEntry) -> bool:
+        return bool(KEY_RE.fullmatch(key)) and isinstance(entry, dict) and isinstance(
+            entry.get("package_base"), str,
+        ) and isinstance(entry.get("size"), int) and isinstance(
+            entry.get("last_used"), int | float,
+        ) and isinstance(entry.get("files"), list) and all(
+            isinstance(filename, str) and PACKAGE_FILENAME_RE.fullmatch(filename)
+            for filename in entry["files"]
+        )
+
+    @classmethod
+    def _save_index(cls, entries: dict[str, BuildCacheEntry]) -> None:
+        write_file_atomically(
+            BuildResultsCachePath() / cls.INDEX_FILENAME,
+            json.dumps({"version": cls.FORMAT_VERSION, "entries": entries}).encode(),
+        )
+
+    @classmethod
+    def _evict(cls, entries: dict[str, BuildCacheEntry], max_size: int) -> None:
+        total_size = 0
+        for key, entry in sorted(
+                entries.items(), key=lambda key_and_entry: key_and_entry[1]["last_used"],
+                reverse=True,
+        ):
+            total_size += entry["size"]
+            if total_size > max_size:
+                logger.debug("evicting {} ({})", key, entry["package_base"])
+                del entries[key]
+                remove_dir(BuildResultsCachePath() / key)
+
+    @classmethod
+    def get(cls, key: str) -> list[Path] | None:
+        """Cached package files or `None` on cache miss."""
+        if cls.get_max_size() <= 0:
+            return None
+        cache_dir = BuildResultsCachePath()
+        with cls._lock:
+            entries = cls._load_index(cache_dir)
+            entry = entries.get(key)
+            if not entry:
+                return None
+            paths = [cache_dir / key / filename for filename in entry["files"]]
+            if not all(path.exists() for path in paths):
+                logger.debug("files of {} are missing", key)
+                del entries[key]
+                cls._save_index(entries)
+                return None
+            entry["last_used"] = time()
+            cls._save_index(entries)
+        return paths
+
+    @classmethod
+    def contains(cls, key: str) -> bool:
+        """Same as `get()` but doesn't update the index."""
+        if cls.get_max_size() <= 0:
+            return False
+        cache_dir = BuildResultsCachePath()
+        with cls._lock:
+            entry = cls._load_index(cache_dir).get(key)
+        if not entry:
+            return False
+        return all((cache_dir / key / filename).exists() for filename in entry["files"])
+
+    @staticmethod
+    def _copy_files(paths: list[Path], destination: Path) -> None:
+        mkdir(destination)
+        for path in paths:
+            logger.debug("Copying {} to {}", path, destination)
+            # not hard-linked, makepkg could overwrite the original files in-place:
+            shutil.copy2(path, destination / path.name)
+
+    @classmethod
+    def _add_entry(cls, key: str, entry: BuildCacheEntry, max_size: int) -> None:
+        with cls._lock:
+            entries = cls._load_index(BuildResultsCachePath())
+            entries[key] = entry
+            cls._evict(entries, max_size)
+            cls._save_index(entries)
+
+    @classmethod
+    def put(cls, key: str, package_base: str, package_paths: "Iterable[Path]") -> bool:
+        """Returns whether the packages were stored."""
+        max_size = cls.get_max_size()
+        paths = [
+            path
+            for package_path in package_paths
+            for path in (package_path, package_path.with_name(package_path.name + ".sig"))
+            if path.exists()
+        ]
+        size = sum(path.stat().st_size for path in paths)
+        entry: BuildCacheEntry = {
+            "package_base": package_base,
+            "files": [path.name for path in paths],
+            "size": size,
+            "last_used": time(),
+        }
+        if (max_size <= 0) or (size > max_size) or not paths or (
+                not cls._is_valid_entry(key, entry)
+        ):
+            return False
+        try:
+            cls._copy_files(paths, BuildResultsCachePath() / key)
+            cls._add_entry(key, entry, max_size)
+        except OSError as exc:
+            logger.debug("can't cache build results of {}: {}", package_base, exc)
+            return False
+        return True
+
+    @classmethod
+    def restore(cls, key: str, destination: Path) -> bool:
+        """Copy cached package files to `destination` dir."""
+        paths = cls.get(key)
+        if not paths:
+            return False
+        try:
+            cls._copy_files(paths, destination)
+        except OSError as exc:
+            logger.debug("can't restore build results for {}: {}", key, exc)
+            return False
+        return True
+
+    @classmethod
+    def import_cache(cls, cache_dir: Path) -> list[str]:
+        """
+        Add entries from the build cache dir of another machine,
+        for example of a build host with the same `makepkg.conf`.
+        Returns the keys of imported entries.
+        """
+        imported_keys = []
+        with cls._lock:
+            known_keys = set(cls._load_index(BuildResultsCachePath()))
+        for key, entry in cls._load_index(cache_dir).items():
+            if key in known_keys:
+                continue
+            if cls.put(
+                key, entry["package_base"],
+                [
+                    cache_dir / key / filename
+                    for filename in entry["files"]
+                    if not filename.endswith(".sig")
+                ],
+            ):
+                imported_keys.append(key)
+        return imported_keys
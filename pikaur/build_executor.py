@@ -0,0 +1,599 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import argparse
+import codecs
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import struct
+import subprocess  # nosec B404  # noqa: S404
+import tarfile
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Queue
+from threading import Lock
+from typing import TYPE_CHECKING, Any, ClassVar, Final, NamedTuple
+
+from .args import parse_args
+from .config import DEFAULT_INPUT_ENCODING, PikaurConfig
+from .exceptions import SysExit
+from .i18n import translate
+from .logging_extras import create_logger
+from .makepkg_config import MakePkgCommand, MakepkgConfig
+from .os_utils import mkdir
+from .pikaprint import print_error, print_stdout
+from .privilege import isolate_root_cmd
+from .spawn import PIPE, interactive_spawn
+
+if TYPE_CHECKING:
+    from io import BufferedIOBase
+
+    from .spawn import SpawnArgs
+
+
+logger = create_logger("build_executor")
+
+
+DEFAULT_WORKER_ADDRESS: Final = "127.0.0.1:7790"
+CHUNK_SIZE: Final = 64 * 1024
+# files are sent in `CHUNK_SIZE` frames, so larger ones are not expected from the peer:
+MAX_FRAME_SIZE: Final = 1024 * 1024
+FRAME_HEADER: Final = struct.Struct("!cQ")
+FRAME_SEQUENCE: Final = struct.Struct("!Q")
+AUTH_CHALLENGE_SIZE: Final = 32
+SIGNATURE_SIZE: Final = hashlib.sha256().digest_size
+CLIENT_ROLE: Final = b"client"
+WORKER_ROLE: Final = b"worker"
+SESSION_KEY_LABEL: Final = b"session"
+# the only makepkg options pikaur passes for a remote build:
+ALLOWED_MAKEPKG_ARGS: Final = frozenset((
+    "--force",
+    "--nocolor",
+    "--skippgpcheck",
+    "--skipchecksums",
+    "--ignorearch",
+    "--nocheck",
+    "--noprepare",
+))
+# build dir entries which are not needed (or are re-created) on the worker:
+SKIPPED_BUILD_DIR_ENTRIES: Final = frozenset((".git", "src", "pkg"))
+
+
+class FrameKind:
+    # random bytes sent by the client on connect:
+    HELLO: Final = b"H"
+    # random bytes of the worker and its HMAC of both challenges with the shared token:
+    CHALLENGE: Final = b"C"
+    # HMAC of both challenges by the client:
+    AUTH: Final = b"T"
+    JOB: Final = b"J"
+    LOG: Final = b"L"
+    # followed by `DATA` frames of the file named in the payload:
+    ARTIFACT: Final = b"A"
+    # file content chunk, the empty one ends the file:
+    DATA: Final = b"D"
+    RESULT: Final = b"R"
+
+
+class WorkerProtocolError(Exception):
+    pass
+
+
+def sign_challenge(token: bytes, role: bytes, challenge: bytes) -> bytes:
+    return hmac.new(token, role + challenge, hashlib.sha256).digest()
+
+
+class FrameStream:
+    """
+    Frames of the build worker connection.
+    After `start_session()` each frame is followed by its HMAC
+    with the session key, the sender role and the frame number,
+    so the frames can't be forged, replayed or reordered by the network.
+    """
+
+    def __init__(
+            self, rfile: "BufferedIOBase", wfile: "BufferedIOBase", role: bytes,
+    ) -> None:
+        self.rfile = rfile
+        self.wfile = wfile
+        self.role = role
+        self.peer_role = WORKER_ROLE if role == CLIENT_ROLE else CLIENT_ROLE
+        self.session_key: bytes | None = None
+        self.sent = 0
+        self.received = 0
+
+    def start_session(self, token: bytes, challenge: bytes) -> None:
+        self.session_key = sign_challenge(token, SESSION_KEY_LABEL, challenge)
+
+    def _sign(self, role: bytes, number: int, header: bytes, payload: bytes) -> bytes:
+        if self.session_key is None:
+            return b""
+        return hmac.new(
+            self.session_key, role + FRAME_SEQUENCE.pack(number) + header + payload,
+            hashlib.sha256,
+        ).digest()
+
+    def _read(self, size: int) -> bytes:
+        data = self.rfile.read(size)
+        if len(data) != size:
+            raise WorkerProtocolError(translate("connection closed"))
+        return data
+
+    def send(self, kind: bytes, payload: bytes) -> None:
+        header = FRAME_HEADER.pack(kind, len(payload))
+        self.wfile.write(header)
+        self.wfile.write(payload)
+        self.wfile.write(self._sign(self.role, self.sent, header, payload))
+        self.wfile.flush()
+        self.sent += 1
+
+    def recv(self) -> tuple[bytes, bytes]:
+        header = self._read(FRAME_HEADER.size)
+        kind, length = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise WorkerProtocolError(translate("frame is too big"))
+        payload = self._read(length)
+        if self.session_key is not None and not hmac.compare_digest(
+                self._read(SIGNATURE_SIZE),
+                self._sign(self.peer_role, self.received, header, payload),
+        ):
+            raise WorkerProtocolError(translate("frame signature mismatch"))
+        self.received += 1
+        return kind, payload
+
+    def send_file(self, path: Path) -> None:
+        with path.open("rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                self.send(FrameKind.DATA, chunk)
+        self.send(FrameKind.DATA, b"")
+
+    def recv_file(self, path: Path) -> None:
+        """Write `DATA` frames into `path` until the empty one."""
+        with path.open("wb") as file:
+            while True:
+                kind, payload = self.recv()
+                if kind != FrameKind.DATA:
+                    raise WorkerProtocolError(kind)
+                if not payload:
+                    return
+                file.write(payload)
+
+
+def read_token(token_path: str | Path) -> bytes:
+    if not token_path:
+        print_error(translate("Build workers token file is not set"))
+        raise SysExit(1)
+    try:
+        token = Path(token_path).expanduser().read_bytes().strip()
+    except OSError as exc:
+        print_error(translate("Can't read build workers token: {}").format(exc))
+        raise SysExit(1) from exc
+    if not token:
+        print_error(translate("Build workers token file {} is empty").format(token_path))
+        raise SysExit(1)
+    return token
+
+
+def get_file_name(payload: bytes) -> str:
+    """Peer-provided file name, not allowed to point outside of the dir."""
+    name = Path(payload.decode()).name
+    if name in {"", ".", ".."}:
+        raise WorkerProtocolError(payload)
+    return name
+
+
+def pack_build_dir(build_dir: Path, archive_path: Path) -> None:
+    def _filter(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo | None:
+        path_parts = Path(tarinfo.name).parts
+        if path_parts and path_parts[0] in SKIPPED_BUILD_DIR_ENTRIES:
+            return None
+        return tarinfo
+
+    with tarfile.open(archive_path, mode="w:gz") as archive:
+        archive.add(build_dir, arcname=".", filter=_filter)
+
+
+def get_build_workers() -> list[str]:
+    return [
+        address.strip()
+        for address in PikaurConfig().build.BuildWorkers.get_str().split(",")
+        if address.strip()
+    ]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _sep, port = address.strip().rpartition(":")
+    return host, int(port)
+
+
+@dataclass(kw_only=True)
+class BuildJob:
+    build_dir: Path
+    # where makepkg is expected to put the built packages:
+    artifacts_dir: Path
+    makepkg_args: list[str]
+    env: dict[str, str]
+    # already built packages which are needed for the build:
+    dep_packages: list[Path]
+
+
+class BuildResult(NamedTuple):
+    args: list[str]
+    returncode: int
+
+
+class BuildExecutor(ABC):
+    """Runs makepkg for `BuildJob`, the executor is chosen by `[build]BuildWorkers`."""
+
+    _executor: ClassVar["BuildExecutor | None"] = None
+    # otherwise the build deps have to be installed before running the job:
+    installs_deps: ClassVar[bool]
+
+    def __init__(self) -> None:
+        self.args = parse_args()
+
+    @abstractmethod
+    def run(self, job: BuildJob) -> BuildResult:  # pragma: no cover
+        pass
+
+    @classmethod
+    def get(cls) -> "BuildExecutor":
+        if cls._executor is None:
+            workers = get_build_workers()
+            cls._executor = RemoteBuildExecutor(
+                workers, read_token(PikaurConfig().build.BuildWorkersTokenPath.get_str()),
+            ) if workers else LocalBuildExecutor()
+            logger.debug("build executor: {}", cls._executor)
+        return cls._executor
+
+
+class LocalBuildExecutor(BuildExecutor):
+
+    installs_deps = False
+
+    def run(self, job: BuildJob) -> BuildResult:
+        cmd_args = isolate_root_cmd(
+            MakePkgCommand.get() + job.makepkg_args, cwd=job.build_dir, env=job.env,
+        )
+        spawn_kwargs: SpawnArgs = {
+            "cwd": str(job.build_dir),
+            "env": {**os.environ, **job.env},
+        }
+        if self.args.hide_build_log:
+            spawn_kwargs.update({
+                "stdout": PIPE,
+                "stderr": PIPE,
+            })
+        result = interactive_spawn(
+            cmd_args,
+            **spawn_kwargs,
+        )
+        return BuildResult(args=cmd_args, returncode=result.returncode)
+
+
+class RemoteBuildExecutor(BuildExecutor):
+    """
+    Sends the build dir snapshot, makepkg args and config and the already built deps
+    to the first free build worker (see `build_worker_cli`),
+    streams back the build log and the built packages.
+    The client and the worker authenticate each other by the HMAC of their challenges
+    with the token shared with them (`[build]BuildWorkersTokenPath`),
+    all the following frames are signed with the session key (see `FrameStream`).
+    """
+
+    installs_deps = True
+
+    def __init__(self, workers: list[str], token: bytes) -> None:
+        super().__init__()
+        self.token = token
+        self.free_workers: Queue[str] = Queue()
+        for address in workers:
+            self.free_workers.put(address)
+
+    @staticmethod
+    def _recv_artifact(frames: FrameStream, filename: str, artifacts_dir: Path) -> None:
+        mkdir(artifacts_dir)
+        # not to leave partially received package if the connection breaks:
+        part_path = artifacts_dir / f".{filename}.part"
+        try:
+            frames.recv_file(part_path)
+            part_path.replace(artifacts_dir / filename)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+    def _authenticate(self, frames: FrameStream) -> None:
+        client_challenge = secrets.token_bytes(AUTH_CHALLENGE_SIZE)
+        frames.send(FrameKind.HELLO, client_challenge)
+        kind, payload = frames.recv()
+        if kind != FrameKind.CHALLENGE or len(payload) != AUTH_CHALLENGE_SIZE + SIGNATURE_SIZE:
+            raise WorkerProtocolError(kind)
+        challenge = client_challenge + payload[:AUTH_CHALLENGE_SIZE]
+        if not hmac.compare_digest(
+                payload[AUTH_CHALLENGE_SIZE:], sign_challenge(self.token, WORKER_ROLE, challenge),
+        ):
+            raise WorkerProtocolError(translate("worker is not authenticated"))
+        frames.send(FrameKind.AUTH, sign_challenge(self.token, CLIENT_ROLE, challenge))
+        frames.start_session(self.token, challenge)
+
+    def _send_job(self, frames: FrameStream, job: BuildJob) -> None:
+        self._authenticate(frames)
+        frames.send(FrameKind.JOB, json.dumps({
+            "makepkg_args": [*MakePkgCommand.get_flags(), *job.makepkg_args],
+            # the packages have to be built and named the same way as the local ones:
+            "makepkg_config": "\n".join(
+                path.read_text() for path in MakepkgConfig.get_config_paths()
+            ),
+            "dep_packages": [path.name for path in job.dep_packages],
+        }).encode())
+        with tempfile.TemporaryDirectory(prefix="pikaur-build-job-") as tmp_dir:
+            sources_path = Path(tmp_dir) / "sources.tar.gz"
+            pack_build_dir(job.build_dir, sources_path)
+            frames.send_file(sources_path)
+        for path in job.dep_packages:
+            frames.send_file(path)
+
+    def _run_on_worker(self, address: str, job: BuildJob) -> int:
+        decoder = codecs.getincrementaldecoder(DEFAULT_INPUT_ENCODING)(errors="replace")
+        with (
+                socket.create_connection(parse_address(address)) as connection,
+                connection.makefile("rwb") as stream,
+        ):
+            frames = FrameStream(stream, stream, CLIENT_ROLE)
+            self._send_job(frames, job)
+            while True:
+                kind, payload = frames.recv()
+                if kind == FrameKind.LOG:
+                    if not self.args.hide_build_log:
+                        print_stdout(decoder.decode(payload), end="", flush=True)
+                elif kind == FrameKind.ARTIFACT:
+                    self._recv_artifact(frames, get_file_name(payload), job.artifacts_dir)
+                elif kind == FrameKind.RESULT:
+                    returncode: int = json.loads(payload)["returncode"]
+                    return returncode
+                else:
+                    raise WorkerProtocolError(kind)
+
+    def run(self, job: BuildJob) -> BuildResult:
+        address = self.free_workers.get()
+        cmd_args = [f"{address}:", "makepkg", *job.makepkg_args]
+        try:
+            returncode = self._run_on_worker(address, job)
+        except (OSError, ValueError, WorkerProtocolError) as exc:
+            print_error(
+                translate("Build worker {} failed: {}").format(address, exc),
+            )
+            returncode = 1
+        finally:
+            self.free_workers.put(address)
+        return BuildResult(args=cmd_args, returncode=returncode)
+
+
+class BuildWorkerHandler(socketserver.StreamRequestHandler):
+
+    server: "BuildWorkerServer"
+    frames: FrameStream
+
+    def setup(self) -> None:
+        super().setup()
+        self.frames = FrameStream(self.rfile, self.wfile, WORKER_ROLE)
+
+    def send_log(self, message: str) -> None:
+        self.frames.send(FrameKind.LOG, message.encode(DEFAULT_INPUT_ENCODING))
+
+    def authenticate(self) -> bool:
+        kind, client_challenge = self.frames.recv()
+        if kind != FrameKind.HELLO or len(client_challenge) != AUTH_CHALLENGE_SIZE:
+            return False
+        worker_challenge = secrets.token_bytes(AUTH_CHALLENGE_SIZE)
+        challenge = client_challenge + worker_challenge
+        self.frames.send(
+            FrameKind.CHALLENGE,
+            worker_challenge + sign_challenge(self.server.token, WORKER_ROLE, challenge),
+        )
+        kind, signature = self.frames.recv()
+        if kind != FrameKind.AUTH or not hmac.compare_digest(
+                signature, sign_challenge(self.server.token, CLIENT_ROLE, challenge),
+        ):
+            return False
+        self.frames.start_session(self.server.token, challenge)
+        return True
+
+    def check_job(self, job: dict[str, Any]) -> bool:
+        """Only the options pikaur uses are accepted."""
+        if not all(
+                isinstance(values, list) and all(isinstance(value, str) for value in values)
+                for values in (job["makepkg_args"], job["dep_packages"])
+        ) or not isinstance(job["makepkg_config"], str):
+            self.send_log("Invalid build job\n")
+            return False
+        not_allowed_args = [
+            arg for arg in job["makepkg_args"] if arg not in ALLOWED_MAKEPKG_ARGS
+        ]
+        if not_allowed_args:
+            self.send_log(f"makepkg options are not allowed: {' '.join(not_allowed_args)}\n")
+            return False
+        return True
+
+    def run_logged(
+            self, cmd: list[str], cwd: Path | None = None, env: dict[str, str] | None = None,
+    ) -> int:
+        """Run `cmd` streaming its output to the client as the build log."""
+        self.send_log(f"=> {' '.join(cmd)}\n")
+        try:
+            proc = subprocess.Popen(  # nosec B603  # noqa: S603
+                cmd, cwd=cwd, env=env,
+                # not to hang on password prompts:
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            )
+        except OSError as exc:
+            self.send_log(f"{exc}\n")
+            return 127
+        with proc:
+            if proc.stdout:
+                stdout_fd = proc.stdout.fileno()
+                for chunk in iter(lambda: os.read(stdout_fd, CHUNK_SIZE), b""):
+                    self.frames.send(FrameKind.LOG, chunk)
+            return proc.wait()
+
+    def query_packages(self, pacman_args: list[str]) -> list[str]:
+        result = subprocess.run(  # nosec B603  # noqa: S603
+            [*self.server.pacman_cmd, "--query", "--quiet", *pacman_args],
+            capture_output=True, check=False,
+        )
+        return result.stdout.decode(DEFAULT_INPUT_ENCODING).split()
+
+    def install_dep_packages(self, paths: list[Path]) -> tuple[int, list[str]]:
+        """
+        Install already built deps sent with the job,
+        returns pacman exit code and the names of newly installed packages.
+        """
+        if not paths:
+            return 0, []
+        pkg_names = self.query_packages(["--file", *(str(path) for path in paths)])
+        installed_before = set(self.query_packages(pkg_names))
+        returncode = self.run_logged([
+            *self.server.sudo_cmd, *self.server.pacman_cmd,
+            "--upgrade", "--needed", "--asdeps", "--noconfirm",
+            *(str(path) for path in paths),
+        ])
+        return returncode, [
+            pkg_name for pkg_name in pkg_names if pkg_name not in installed_before
+        ]
+
+    def remove_packages(self, pkg_names: list[str]) -> None:
+        if pkg_names:
+            self.run_logged([
+                *self.server.sudo_cmd, *self.server.pacman_cmd,
+                "--remove", "--noconfirm", *pkg_names,
+            ])
+
+    def run_makepkg(self, makepkg_args: list[str], build_dir: Path, pkgdest: Path) -> int:
+        return self.run_logged(
+            [
+                *self.server.makepkg_cmd,
+                "--config", str(build_dir.parent / "makepkg.conf"),
+                # repo deps are installed by makepkg and removed after the build:
+                "--syncdeps", "--rmdeps", "--noconfirm",
+                *makepkg_args,
+            ],
+            cwd=build_dir,
+            env={**os.environ, "PKGDEST": str(pkgdest)},
+        )
+
+    def run_build(
+            self, makepkg_args: list[str], dep_packages: list[Path], build_dir: Path, pkgdest: Path,
+    ) -> int:
+        # builds are changing the installed packages:
+        with self.server.build_lock:
+            returncode, installed_pkg_names = self.install_dep_packages(dep_packages)
+            try:
+                return returncode or self.run_makepkg(makepkg_args, build_dir, pkgdest)
+            finally:
+                self.remove_packages(installed_pkg_names)
+
+    def build(self, job: dict[str, Any], tmp_path: Path) -> int:
+        sources_path = tmp_path / "sources.tar.gz"
+        self.frames.recv_file(sources_path)
+        if not self.check_job(job):
+            return 1
+        deps_dir = tmp_path / "deps"
+        deps_dir.mkdir()
+        dep_packages = [deps_dir / get_file_name(name.encode()) for name in job["dep_packages"]]
+        for path in dep_packages:
+            self.frames.recv_file(path)
+        (tmp_path / "makepkg.conf").write_text(job["makepkg_config"])
+        build_dir = tmp_path / "build"
+        pkgdest = tmp_path / "pkgdest"
+        pkgdest.mkdir()
+        with tarfile.open(sources_path) as archive:
+            archive.extractall(build_dir, filter="data")
+        sources_path.unlink()
+        returncode = self.run_build(job["makepkg_args"], dep_packages, build_dir, pkgdest)
+        if returncode == 0:
+            for path in sorted(pkgdest.iterdir()):
+                self.frames.send(FrameKind.ARTIFACT, path.name.encode())
+                self.frames.send_file(path)
+        return returncode
+
+    def recv_job(self) -> dict[str, Any] | None:
+        if not self.authenticate():
+            logger.debug("{} is not authenticated", self.client_address)
+            return None
+        kind, job_payload = self.frames.recv()
+        if kind != FrameKind.JOB:
+            return None
+        job: dict[str, Any] = json.loads(job_payload)
+        return job
+
+    def handle(self) -> None:
+        try:
+            job = self.recv_job()
+            if job is None:
+                return
+            with tempfile.TemporaryDirectory(prefix="pikaur-build-worker-") as tmp_dir:
+                returncode = self.build(job, Path(tmp_dir))
+        except (WorkerProtocolError, tarfile.TarError, ValueError, KeyError) as exc:
+            logger.debug("build job from {} failed: {}", self.client_address, exc)
+            return
+        self.frames.send(FrameKind.RESULT, json.dumps({"returncode": returncode}).encode())
+
+
+class BuildWorkerServer(socketserver.ThreadingTCPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+            self,
+            address: tuple[str, int],
+            makepkg_cmd: list[str],
+            token: bytes,
+            pacman_cmd: list[str] | None = None,
+            sudo_cmd: list[str] | None = None,
+    ) -> None:
+        self.makepkg_cmd = makepkg_cmd
+        self.token = token
+        self.pacman_cmd = pacman_cmd or ["pacman"]
+        self.sudo_cmd = ["sudo", "--non-interactive"] if sudo_cmd is None else sudo_cmd
+        self.build_lock = Lock()
+        super().__init__(address, BuildWorkerHandler)
+
+
+def build_worker_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pikaur build worker: builds packages sent by `[build]BuildWorkers`",
+    )
+    parser.add_argument(
+        "--listen",
+        default=DEFAULT_WORKER_ADDRESS,
+        help="host:port to accept build jobs on",
+    )
+    parser.add_argument(
+        "--token-file",
+        required=True,
+        help=(
+            "file with the secret token shared with the clients (`[build]BuildWorkersTokenPath`),"
+            " only the clients which know it are allowed to build"
+        ),
+    )
+    parser.add_argument(
+        "--makepkg-path",
+        default="makepkg",
+        help="makepkg command",
+    )
+    args = parser.parse_args()
+    with BuildWorkerServer(
+            parse_address(args.listen), [args.makepkg_path], read_token(args.token_file),
+    ) as server:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    build_worker_cli()
@@ -0,0 +1,97 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import CycleError, TopologicalSorter
+from typing import TYPE_CHECKING
+
+from .build import PackageBuild
+from .exceptions import DependencyCycleError
+from .logging_extras import create_logger
+from .pikaprint import TTYRestoreContext
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from concurrent.futures import Future
+
+
+logger = create_logger("build_scheduler")
+
+
+class BuildScheduler:
+    """
+    Builds package bases in the order of their build dependencies,
+    running up to `jobs` independent builds at the same time.
+    Failed build cancels only the package bases which depend on it.
+    """
+
+    package_builds: dict[str, PackageBuild]
+    graph: dict[str, set[str]]
+    jobs: int
+    failed: list[str]
+
+    def __init__(
+            self,
+            package_builds: list[PackageBuild],
+            all_package_builds: dict[str, PackageBuild],
+            jobs: int = 1,
+    ) -> None:
+        self.package_builds = {
+            pkg_build.package_base: pkg_build for pkg_build in package_builds
+        }
+        all_provided_pkgnames = PackageBuild.get_all_provided_pkgnames(all_package_builds)
+        self.graph = {
+            pkg_base: pkg_build.get_build_order_deps(
+                all_package_builds, all_provided_pkgnames,
+            ).intersection(self.package_builds)
+            for pkg_base, pkg_build in self.package_builds.items()
+        }
+        logger.debug("build graph: {}", self.graph)
+        self.jobs = max(jobs, 1)
+        self.failed = []
+        self._sorter = TopologicalSorter(self.graph)
+        try:
+            self._sorter.prepare()
+        except CycleError as exc:
+            raise DependencyCycleError(
+                package_bases=list(dict.fromkeys(exc.args[1])),
+            ) from exc
+
+    def run(self, build: "Callable[[PackageBuild], bool]") -> None:
+        """
+        Call `build` for each package base once all its deps are built,
+        package bases which failed or were canceled are collected into `failed`.
+        If `build` raises, no more builds are started
+        and the exception is re-raised after the running ones finish.
+        """
+        running: dict[Future[bool], str] = {}
+        error: Exception | None = None
+        with (
+                TTYRestoreContext(),
+                ThreadPoolExecutor(max_workers=self.jobs) as executor,
+        ):
+            while (error is None) and self._sorter.is_active():
+                for pkg_base in self._sorter.get_ready():
+                    if self.graph[pkg_base].intersection(self.failed):
+                        logger.debug("canceling {}", pkg_base)
+                        self.package_builds[pkg_base].failed = True
+                        self.failed.append(pkg_base)
+                        self._sorter.done(pkg_base)
+                        continue
+                    logger.debug("starting {}", pkg_base)
+                    running[executor.submit(build, self.package_builds[pkg_base])] = pkg_base
+                if not running:
+                    continue
+                finished, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pkg_base = running.pop(future)
+                    try:
+                        build_succeeded = future.result()
+                    except Exception as exc:
+                        logger.debug("{} interrupted the builds: {!r}", pkg_base, exc)
+                        error = error or exc
+                        continue
+                    if not build_succeeded:
+                        self.failed.append(pkg_base)
+                    self._sorter.done(pkg_base)
+        if error:
+            raise error
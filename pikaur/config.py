@@ -232,6 +232,42 @@ class PackageCachePath(PathConfig):
         return CacheRoot() / "pkg"
 
 
+class BuildResultsCachePath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "build_results"
+
+
+class AurInfoCachePath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "aur_info.json"
+
+
+class AurIndexPath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "aur_index.sqlite3"
+
+
+class PackageDbSnapshotPath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "pacman_db_snapshot.json"
+
+
+class RepoSearchIndexPath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "repo_search_index.sqlite3"
+
+
+class HttpCachePath(PathConfig):
+    @classmethod
+    def get_value(cls) -> Path:
+        return CacheRoot() / "http"
+
+
 class ConfigRoot(FixedPathSingleton):
     @classmethod
     def init_value(cls) -> Path:
@@ -371,6 +407,10 @@ class ConfigSchema(UserDict[str, ConfigSection]):
                         "data_type": BOOL,
                         "default": "no",
                     },
+                    "LocalRepoUrl": {
+                        "data_type": STR,
+                        "default": "",
+                    },
                 },
                 "build": {
                     "KeepBuildDir": {
@@ -393,6 +433,34 @@ class ConfigSchema(UserDict[str, ConfigSection]):
                         "data_type": BOOL,
                         "default": "no",
                     },
+                    "Jobs": {
+                        "data_type": INT,
+                        "default": "1",
+                    },
+                    "BuildCacheSize": {
+                        "data_type": INT,
+                        "default": "0",
+                    },
+                    "LocalRepoPath": {
+                        "data_type": STR,
+                        "default": "",
+                    },
+                    "LocalRepoName": {
+                        "data_type": STR,
+                        "default": "pikaur-local",
+                    },
+                    "BuildWorkers": {
+                        "data_type": STR,
+                        "default": "",
+                    },
+                    "BuildWorkersTokenPath": {
+                        "data_type": STR,
+                        "default": "",
+                    },
+                    "PrefetchJobs": {
+                        "data_type": INT,
+                        "default": "4",
+                    },
                     "DynamicUsers": {
                         "data_type": STR,
                         "default": "never",
@@ -609,6 +677,30 @@ class ConfigSchema(UserDict[str, ConfigSection]):
                         "data_type": STR,
                         "default": "",
                     },
+                    "AurCacheExpiration": {
+                        "data_type": INT,
+                        "default": "0",
+                    },
+                    "AurCacheSize": {
+                        "data_type": INT,
+                        "default": "10000",
+                    },
+                    "AurIndexExpiration": {
+                        "data_type": INT,
+                        "default": "0",
+                    },
+                    "HttpCacheSize": {
+                        "data_type": INT,
+                        "default": "32",
+                    },
+                    "AurConcurrency": {
+                        "data_type": INT,
+                        "default": "8",
+                    },
+                    "AurPostBatchSize": {
+                        "data_type": INT,
+                        "default": "1000",
+                    },
                 },
             }
         return cls.config_schema
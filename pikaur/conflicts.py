@@ -4,8 +4,9 @@ from typing import TYPE_CHECKING
 
 from .aur_deps import find_repo_deps_of_aur_pkgs
 from .pacman import PackageDB
-from .updates import get_remote_package_version
-from .version import VersionMatcher
+from .pikatypes import PackageSource
+from .updates import get_remote_package_version, get_remote_package_versions
+from .version import DepSpec, VersionMatcher, match_versions
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -37,24 +38,19 @@ def get_new_aur_pkgs_conflicts(aur_packages: "list[AURPackageInfo]") -> dict[str
     return new_pkgs_conflicts_lists
 
 
-def get_all_local_pkgs_conflicts() -> dict[str, list[str]]:
-    all_local_pkgs_info = PackageDB.get_local_dict()
-    all_local_pgks_conflicts_lists = {}
-    for local_pkg_info in all_local_pkgs_info.values():
-        conflicts: list[str] = []
-        if local_pkg_info.conflicts:
-            conflicts += local_pkg_info.conflicts
-        if local_pkg_info.replaces:
-            conflicts += local_pkg_info.replaces
-        if conflicts:
-            all_local_pgks_conflicts_lists[local_pkg_info.name] = list(set(conflicts))
-    return all_local_pgks_conflicts_lists
+def get_remote_version(
+        pkg_name: str, remote_versions: dict[str, str | None] | None,
+) -> str | None:
+    if remote_versions is not None and pkg_name in remote_versions:
+        return remote_versions[pkg_name]
+    return get_remote_package_version(pkg_name)
 
 
 def find_conflicting_with_new_pkgs(
         new_pkg_name: str,
-        all_pkgs_names: list[str],
+        all_pkgs_names: set[str],
         new_pkg_conflicts_list: list[str],
+        remote_versions: dict[str, str | None] | None = None,
 ) -> dict[str, list[str]]:
     """
     Find if any of new packages have Conflicts with
@@ -66,57 +62,98 @@ def find_conflicting_with_new_pkgs(
         conflict_version_matcher = VersionMatcher(conflict_line, is_pkg_deps=True)
         conflict_pkg_name = conflict_version_matcher.pkg_name
         if new_pkg_name != conflict_pkg_name:
-            for installed_pkg_name in all_pkgs_names:
-                if (
-                        conflict_pkg_name == installed_pkg_name
-                ) and (
-                    not conflict_version_matcher or
-                    conflict_version_matcher(get_remote_package_version(installed_pkg_name))
-                ):
-                    new_pkgs_conflicts.setdefault(new_pkg_name, []).append(conflict_pkg_name)
-            for provided_dep, provides in local_provided.items():
-                for provided_pkg in provides:
-                    installed_pkg_name = provided_pkg.package.name
-                    if (
-                            conflict_pkg_name == provided_dep
-                    ) and (
-                        new_pkg_name != installed_pkg_name
-                    ) and (
-                        not conflict_version_matcher or
-                        conflict_version_matcher(
-                            provided_pkg.version_matcher.version or
-                            get_remote_package_version(installed_pkg_name),
-                        )
-                    ):
-                        new_pkgs_conflicts.setdefault(new_pkg_name, [])
-                        new_pkg_conflicts = new_pkgs_conflicts[new_pkg_name]
-                        if installed_pkg_name not in new_pkg_conflicts:
-                            new_pkg_conflicts.append(installed_pkg_name)
+            if (
+                    conflict_pkg_name in all_pkgs_names
+            ) and (
+                not conflict_version_matcher.version or
+                conflict_version_matcher(get_remote_version(conflict_pkg_name, remote_versions))
+            ):
+                new_pkgs_conflicts.setdefault(new_pkg_name, []).append(conflict_pkg_name)
+            provided_pkgs = [
+                provided_pkg
+                for provided_pkg in local_provided.get(conflict_pkg_name, [])
+                if provided_pkg.package.name != new_pkg_name
+            ]
+            # match versions of all the installed providers at once:
+            version_matches = conflict_version_matcher.match_many([
+                provided_pkg.version_matcher.version
+                or get_remote_version(provided_pkg.package.name, remote_versions)
+                for provided_pkg in provided_pkgs
+            ]) if conflict_version_matcher.version else [True] * len(provided_pkgs)
+            for provided_pkg, version_matches_conflict in zip(
+                    provided_pkgs, version_matches, strict=True,
+            ):
+                installed_pkg_name = provided_pkg.package.name
+                if version_matches_conflict:
+                    new_pkgs_conflicts.setdefault(new_pkg_name, [])
+                    new_pkg_conflicts = new_pkgs_conflicts[new_pkg_name]
+                    if installed_pkg_name not in new_pkg_conflicts:
+                        new_pkg_conflicts.append(installed_pkg_name)
     return new_pkgs_conflicts
 
 
 def find_conflicting_with_local_pkgs(
         new_pkg_name: str,
-        all_local_pgks_conflicts_lists: dict[str, list[str]],
+        remote_versions: dict[str, str | None] | None = None,
 ) -> dict[str, list[str]]:
     """Find if any of already installed packages have Conflicts with the new ones."""
     new_pkgs_conflicts: dict[str, list[str]] = {}
-    for local_pkg_name, local_pkg_conflicts_list in all_local_pgks_conflicts_lists.items():
-        if new_pkg_name == local_pkg_name:
-            continue
-        for conflict_line in local_pkg_conflicts_list:
-            conflict_version_matcher = VersionMatcher(conflict_line, is_pkg_deps=True)
-            if (
-                    conflict_version_matcher.pkg_name == new_pkg_name
-            ) and (
-                local_pkg_name != new_pkg_name
-            ) and (
-                conflict_version_matcher(get_remote_package_version(new_pkg_name))
-            ):
-                new_pkgs_conflicts.setdefault(new_pkg_name, []).append(local_pkg_name)
+    conflicting = [
+        (local_pkg_name, DepSpec.parse(conflict_line, is_pkg_deps=True))
+        for local_pkg_name, conflict_line in PackageDB.get_index(
+            PackageSource.LOCAL,
+        ).get_conflicting(new_pkg_name)
+        if new_pkg_name != local_pkg_name
+    ]
+    new_pkg_version = get_remote_version(new_pkg_name, remote_versions) if any(
+        conflict_dep_spec.version for _local_pkg_name, conflict_dep_spec in conflicting
+    ) else None
+    # match all the conflict lines against the new version at once:
+    version_matches = match_versions(
+        [conflict_dep_spec for _local_pkg_name, conflict_dep_spec in conflicting],
+        [new_pkg_version],
+    ) if new_pkg_version else [[True]] * len(conflicting)
+    for (local_pkg_name, _conflict_dep_spec), [version_matches_conflict] in zip(
+            conflicting, version_matches, strict=True,
+    ):
+        if version_matches_conflict:
+            new_pkgs_conflicts.setdefault(new_pkg_name, []).append(local_pkg_name)
     return new_pkgs_conflicts
 
 
+def get_versioned_conflicts_targets(
+        new_pkgs_conflicts_lists: dict[str, list[str]],
+        all_pkgs_names: set[str],
+        new_pkgs_names: list[str],
+) -> set[str]:
+    """Names of packages whose remote version is needed to check the conflicts."""
+    local_provided = PackageDB.get_local_provided_dict()
+    local_index = PackageDB.get_index(PackageSource.LOCAL)
+    targets: set[str] = set()
+    for conflicts_list in new_pkgs_conflicts_lists.values():
+        for conflict_line in conflicts_list:
+            conflict_version_matcher = VersionMatcher(conflict_line, is_pkg_deps=True)
+            if not conflict_version_matcher.version:
+                continue
+            conflict_pkg_name = conflict_version_matcher.pkg_name
+            if conflict_pkg_name in all_pkgs_names:
+                targets.add(conflict_pkg_name)
+            targets.update(
+                provided_pkg.package.name
+                for provided_pkg in local_provided.get(conflict_pkg_name, [])
+                if not provided_pkg.version_matcher.version
+            )
+    targets.update(
+        new_pkg_name
+        for new_pkg_name in new_pkgs_names
+        if any(
+            VersionMatcher(conflict_line, is_pkg_deps=True).version
+            for _local_pkg_name, conflict_line in local_index.get_conflicting(new_pkg_name)
+        )
+    )
+    return targets
+
+
 def find_aur_conflicts(
         aur_pkgs_install_infos: "Sequence[AURInstallInfo]",
         repo_packages_names: list[str],
@@ -130,8 +167,7 @@ def find_aur_conflicts(
     repo_deps_names = [vm.pkg_name for vm in repo_deps_version_matchers]
     all_pkgs_to_be_installed = aur_packages_names + repo_deps_names
 
-    all_local_pkgs_info = PackageDB.get_local_dict()
-    all_local_pkgs_names = list(all_local_pkgs_info.keys())
+    all_local_pkgs_names = PackageDB.get_index(PackageSource.LOCAL).pkgnames
 
     new_pkgs_conflicts_lists = {}
     new_pkgs_conflicts_lists.update(
@@ -140,20 +176,24 @@ def find_aur_conflicts(
     new_pkgs_conflicts_lists.update(
         get_new_aur_pkgs_conflicts(aur_pkgs),
     )
-    all_local_pgks_conflicts_lists = get_all_local_pkgs_conflicts()
+    all_pkgs_names = {*all_local_pkgs_names, *all_pkgs_to_be_installed, *repo_packages_names}
+    remote_versions = get_remote_package_versions(get_versioned_conflicts_targets(
+        new_pkgs_conflicts_lists, all_pkgs_names, all_pkgs_to_be_installed,
+    ))
 
     conflicts_result = {}
     for new_pkg_name, new_pkg_conflicts_list in new_pkgs_conflicts_lists.items():
         conflicts_result.update(
             find_conflicting_with_new_pkgs(
                 new_pkg_name,
-                all_local_pkgs_names + all_pkgs_to_be_installed + repo_packages_names,
+                all_pkgs_names,
                 new_pkg_conflicts_list,
+                remote_versions,
             ),
         )
     for new_pkg_name in all_pkgs_to_be_installed:
         conflicts_result.update(
-            find_conflicting_with_local_pkgs(new_pkg_name, all_local_pgks_conflicts_lists),
+            find_conflicting_with_local_pkgs(new_pkg_name, remote_versions),
         )
 
     return conflicts_result
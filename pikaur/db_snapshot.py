@@ -0,0 +1,366 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import json
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar, Final, NamedTuple
+
+from .alpm import PacmanConfig, PyAlpmWrapper
+from .config import PackageDbSnapshotPath
+from .logging_extras import create_logger
+from .os_utils import mkdir, write_file_atomically
+from .pikatypes import PackageSource
+from .version import DepSpec, compare_versions
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    import pyalpm
+
+
+logger = create_logger("db_snapshot")
+
+
+class PackageSnapshot(NamedTuple):
+    """Subset of `pyalpm.Package` fields which is enough for read-only queries."""
+
+    name: str
+    version: str
+    repo: str
+    provides: list[str]
+    depends: list[str]
+    optdepends: list[str]
+    conflicts: list[str]
+    replaces: list[str]
+    groups: list[str]
+
+    @classmethod
+    def from_alpm(cls, pkg: "pyalpm.Package") -> "PackageSnapshot":
+        return cls(
+            name=pkg.name,
+            version=pkg.version,
+            repo=pkg.db.name,
+            provides=pkg.provides,
+            depends=pkg.depends,
+            optdepends=pkg.optdepends,
+            conflicts=pkg.conflicts,
+            replaces=pkg.replaces,
+            groups=pkg.groups,
+        )
+
+
+def get_reverse_deps(
+        packages: list[PackageSnapshot], *, optional: bool,
+) -> dict[str, set[str]]:
+    """Names of packages by the names of their dependencies (or optional ones)."""
+    reverse_deps: dict[str, set[str]] = {}
+    for pkg in packages:
+        for dep_line in (pkg.optdepends if optional else pkg.depends):
+            dep_name = DepSpec.parse(dep_line.split(":", 1)[0].strip()).pkg_name
+            reverse_deps.setdefault(dep_name, set()).add(pkg.name)
+    return reverse_deps
+
+
+def get_conflicts(packages: list[PackageSnapshot]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Names of packages with their `conflicts` or `replaces` line
+    by the name of package they're conflicting with.
+    """
+    conflicts: dict[str, list[tuple[str, str]]] = {}
+    for pkg in packages:
+        for conflict_line in {*pkg.conflicts, *pkg.replaces}:
+            conflict_name = DepSpec.parse(conflict_line, is_pkg_deps=True).pkg_name
+            conflicts.setdefault(conflict_name, []).append((pkg.name, conflict_line))
+    return conflicts
+
+
+class PackageIndex:
+    """Lookup tables over snapshot packages of local DB or of all the sync DBs."""
+
+    __slots__ = (
+        "_conflicts",
+        "_optional_for",
+        "_packages",
+        "_replaces",
+        "_required_by",
+        "groups",
+        "pkgnames",
+        "providers",
+    )
+
+    pkgnames: frozenset[str]
+    providers: dict[str, list[PackageSnapshot]]
+    groups: dict[str, list[PackageSnapshot]]
+    _packages: list[PackageSnapshot]
+    _required_by: dict[str, set[str]] | None
+    _optional_for: dict[str, set[str]] | None
+    _conflicts: dict[str, list[tuple[str, str]]] | None
+    _replaces: dict[str, list[str]] | None
+
+    def __init__(self, packages: list[PackageSnapshot]) -> None:
+        self._packages = packages
+        self._required_by = None
+        self._optional_for = None
+        self._conflicts = None
+        self._replaces = None
+        self.pkgnames = frozenset(pkg.name for pkg in packages)
+        self.providers = {}
+        self.groups = {}
+        for pkg in packages:
+            self.providers.setdefault(pkg.name, []).append(pkg)
+            for provided_line in pkg.provides:
+                provided_name = DepSpec.parse(provided_line).pkg_name
+                if provided_name != pkg.name:
+                    self.providers.setdefault(provided_name, []).append(pkg)
+            for group in pkg.groups:
+                self.groups.setdefault(group, []).append(pkg)
+
+    @staticmethod
+    def _get_dependants(
+            reverse_deps: dict[str, set[str]], pkg_name: str, provides: list[str],
+    ) -> list[str]:
+        return sorted({
+            dependant
+            for name in (pkg_name, *(DepSpec.parse(line).pkg_name for line in provides))
+            for dependant in reverse_deps.get(name, ())
+        })
+
+    def get_required_by(self, pkg_name: str, provides: list[str]) -> list[str]:
+        """Same as `pyalpm.Package.compute_requiredby()`."""
+        if self._required_by is None:
+            self._required_by = get_reverse_deps(self._packages, optional=False)
+        return self._get_dependants(self._required_by, pkg_name, provides)
+
+    def get_optional_for(self, pkg_name: str, provides: list[str]) -> list[str]:
+        """Same as `pyalpm.Package.compute_optionalfor()`."""
+        if self._optional_for is None:
+            self._optional_for = get_reverse_deps(self._packages, optional=True)
+        return self._get_dependants(self._optional_for, pkg_name, provides)
+
+    def get_conflicting(self, pkg_name: str) -> list[tuple[str, str]]:
+        """Packages (with their conflict line) which conflict with or replace `pkg_name`."""
+        if self._conflicts is None:
+            self._conflicts = get_conflicts(self._packages)
+        return self._conflicts.get(pkg_name, [])
+
+    def get_replaces(self) -> dict[str, list[str]]:
+        """Names of packages replaced by each package (except the package itself)."""
+        if self._replaces is None:
+            replaces: dict[str, list[str]] = {}
+            for pkg in self._packages:
+                for replaced_name in pkg.replaces:
+                    if replaced_name != pkg.name:
+                        replaces.setdefault(pkg.name, []).append(replaced_name)
+            self._replaces = replaces
+        return self._replaces
+
+
+class PackageDBSnapshot(PyAlpmWrapper):
+    """
+    Summary of local and sync package databases persisted between pikaur runs,
+    so read-only queries don't need to load all the packages with pyalpm.
+    Each of them is re-built when mtime or size of its DB files changes.
+    """
+
+    FORMAT_VERSION: Final = 2
+
+    _data: ClassVar[dict[str, "Any"] | None] = None
+    _packages: ClassVar[dict[PackageSource, list[PackageSnapshot]]] = {}
+    _indexes: ClassVar[dict[PackageSource, PackageIndex]] = {}
+    _repo_priorities: ClassVar[dict[str, int] | None] = None
+    _pacman_config: ClassVar[PacmanConfig | None] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_pacman_config(cls) -> PacmanConfig:
+        if not cls._pacman_config:
+            cls._pacman_config = PacmanConfig()
+        return cls._pacman_config
+
+    @classmethod
+    def get_repo_names(cls) -> list[str]:
+        """Sync DB names in the order of their priority."""
+        return list(cls.get_pacman_config().repos)
+
+    @classmethod
+    def get_repo_priorities(cls) -> dict[str, int]:
+        """Sync DB names to their priority, 0 is the highest one."""
+        if cls._repo_priorities is not None:
+            return cls._repo_priorities
+        repo_priorities = {
+            repo_name: priority for priority, repo_name in enumerate(cls.get_repo_names())
+        }
+        cls._repo_priorities = repo_priorities
+        return repo_priorities
+
+    @classmethod
+    def get_local_db_path(cls) -> Path:
+        return Path(cls.get_pacman_config().options["DBPath"]) / "local"
+
+    @classmethod
+    def _get_db_files(cls, package_source: PackageSource) -> list[Path]:
+        if package_source == PackageSource.LOCAL:
+            return [cls.get_local_db_path()]
+        sync_db_path = Path(cls.get_pacman_config().options["DBPath"]) / "sync"
+        return [sync_db_path / f"{repo_name}.db" for repo_name in cls.get_repo_names()]
+
+    @classmethod
+    def get_key(cls, package_source: PackageSource) -> list[list[str | int]]:
+        key: list[list[str | int]] = []
+        for path in cls._get_db_files(package_source):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                key.append([str(path)])
+            else:
+                key.append([str(path), stat.st_mtime_ns, stat.st_size])
+        return key
+
+    @classmethod
+    def _load_data(cls) -> dict[str, "Any"]:
+        if cls._data is not None:
+            return cls._data
+        snapshot_path = PackageDbSnapshotPath()
+        data = {}
+        try:
+            data = json.loads(snapshot_path.read_bytes())
+        except (OSError, ValueError) as exc:
+            logger.debug("can't load {}: {}", snapshot_path, exc)
+        if not isinstance(data, dict) or data.get("version") != cls.FORMAT_VERSION:
+            data = {"version": cls.FORMAT_VERSION}
+        cls._data = data
+        return data
+
+    @classmethod
+    def _build(cls, package_source: PackageSource) -> list[PackageSnapshot]:
+        handle = cls.get_alpm_handle()
+        alpm_pkgs = (
+            handle.get_localdb().search("")
+            if package_source == PackageSource.LOCAL
+            else [pkg for sync_db in handle.get_syncdbs() for pkg in sync_db.search("")]
+        )
+        return [PackageSnapshot.from_alpm(pkg) for pkg in alpm_pkgs]
+
+    @classmethod
+    def _save(cls) -> None:
+        snapshot_path = PackageDbSnapshotPath()
+        try:
+            mkdir(snapshot_path.parent)
+            write_file_atomically(
+                snapshot_path, json.dumps(cls._load_data(), separators=(",", ":")).encode(),
+            )
+        except OSError as exc:
+            logger.debug("can't save {}: {}", snapshot_path, exc)
+
+    @classmethod
+    def get_packages(cls, package_source: PackageSource) -> list[PackageSnapshot]:
+        """
+        Local packages or packages from all the sync DBs
+        (in the same order as `PackageDB.get_repo_list()`).
+        """
+        with cls._lock:
+            if package_source not in cls._packages:
+                section = package_source.name.lower()
+                key = cls.get_key(package_source)
+                data = cls._load_data()
+                if data.get(section, {}).get("key") == key:
+                    packages = [PackageSnapshot._make(row) for row in data[section]["packages"]]
+                else:
+                    logger.debug("re-building {} DB snapshot", section)
+                    packages = cls._build(package_source)
+                    data[section] = {"key": key, "packages": packages}
+                    cls._save()
+                cls._packages[package_source] = packages
+            return cls._packages[package_source]
+
+    @classmethod
+    def update(
+            cls,
+            package_source: PackageSource,
+            changed_names: set[str],
+            new_pkgs: "list[pyalpm.Package]",
+    ) -> None:
+        """Patch already loaded snapshot with re-read packages instead of re-building it."""
+        with cls._lock:
+            packages = cls._packages.get(package_source)
+            if packages is None:
+                return
+            packages = sorted(
+                [pkg for pkg in packages if pkg.name not in changed_names]
+                + [PackageSnapshot.from_alpm(pkg) for pkg in new_pkgs],
+                key=lambda pkg: pkg.name,
+            )
+            cls._packages[package_source] = packages
+            cls._indexes.pop(package_source, None)
+            cls._load_data()[package_source.name.lower()] = {
+                "key": cls.get_key(package_source),
+                "packages": packages,
+            }
+            cls._save()
+            cls._alpm_handle = None
+
+    @classmethod
+    def get_index(cls, package_source: PackageSource) -> PackageIndex:
+        if package_source not in cls._indexes:
+            cls._indexes[package_source] = PackageIndex(cls.get_packages(package_source))
+        return cls._indexes[package_source]
+
+    @classmethod
+    def find_satisfier(
+            cls, package_source: PackageSource, dep_line: str,
+    ) -> PackageSnapshot | None:
+        """Same as `pyalpm.find_satisfier()`."""
+        dep_spec = DepSpec.parse(dep_line)
+        for pkg in cls.get_index(package_source).providers.get(dep_spec.pkg_name, []):
+            if pkg.name == dep_spec.pkg_name and dep_spec.match(pkg.version):
+                return pkg
+            for provided_line in pkg.provides:
+                provided = DepSpec.parse(provided_line)
+                if provided.pkg_name != dep_spec.pkg_name:
+                    continue
+                if (not dep_spec.version) or (
+                        provided.cond == "=" and provided.version
+                        and dep_spec.match(provided.version)
+                ):
+                    return pkg
+        return None
+
+    @classmethod
+    def find_repo_package(cls, pkg_name: str) -> PackageSnapshot | None:
+        """
+        Package with exactly that name from the repo with the highest priority
+        (the one which `pacman --sync pkg_name` would install).
+        """
+        repo_priorities = cls.get_repo_priorities()
+        return min(
+            (
+                pkg
+                for pkg in cls.get_index(PackageSource.REPO).providers.get(pkg_name, ())
+                if pkg.name == pkg_name
+            ),
+            key=lambda pkg: repo_priorities.get(pkg.repo, len(repo_priorities)),
+            default=None,
+        )
+
+    @classmethod
+    def get_upgradeable(cls) -> list[PackageSnapshot]:
+        """Same as `pacman --query --upgrades`."""
+        repo_pkgs: dict[str, PackageSnapshot] = {}
+        for pkg in cls.get_packages(PackageSource.REPO):
+            repo_pkgs.setdefault(pkg.name, pkg)
+        return [
+            local_pkg
+            for local_pkg in cls.get_packages(PackageSource.LOCAL)
+            if (repo_pkg := repo_pkgs.get(local_pkg.name))
+            and compare_versions(repo_pkg.version, local_pkg.version) > 0
+        ]
+
+    @classmethod
+    def discard(cls, package_source: PackageSource) -> None:
+        with cls._lock:
+            cls._packages.pop(package_source, None)
+            cls._indexes.pop(package_source, None)
+            if package_source == PackageSource.REPO:
+                cls._pacman_config = None
+                cls._repo_priorities = None
+            cls._alpm_handle = None
@@ -72,6 +72,11 @@ class DependencyNotBuiltYetError(Exception):
     pass
 
 
+@dataclass
+class DependencyCycleError(Exception):
+    package_bases: list[str]
+
+
 class AURError(Exception):
     url: str
     error: str
@@ -4,6 +4,7 @@
 import contextlib
 import hashlib
 import itertools
+from functools import partial
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
 from tempfile import NamedTemporaryFile
@@ -11,7 +12,14 @@ from typing import TYPE_CHECKING
 
 from .args import parse_args, reconstruct_args
 from .aur import find_aur_packages
-from .build import PackageBuild, PkgbuildChanged, clone_aur_repos
+from .build import (
+    PackageBuild,
+    PkgbuildChanged,
+    clone_aur_repos,
+    prefetch_sources,
+    remove_build_deps,
+)
+from .build_scheduler import BuildScheduler
 from .config import (
     DECORATION,
     DEFAULT_CONFIG_ENCODING,
@@ -23,6 +31,7 @@ from .conflicts import find_aur_conflicts
 from .exceptions import (
     BuildError,
     CloneError,
+    DependencyCycleError,
     DependencyError,
     DependencyNotBuiltYetError,
     DependencyVersionMismatchError,
@@ -126,7 +135,7 @@ def _remove_packages(packages_to_be_removed: list[str]) -> None:
             ]),
             pikspect=True,
         )
-        PackageDB.discard_local_cache()
+        PackageDB.update_local_cache()
 
 
 def _get_local_version(package_name: str) -> str:
@@ -385,7 +394,8 @@ class InstallPackagesCLI:
         if answer == translate("e"):
             self.edit_pkgbuild_during_the_build(pkg_name)
             self.main_sequence()
-        elif answer == translate("s"):
+            raise self.ExitMainSequence
+        if answer == translate("s"):
             self.discard_install_info(pkg_name)
         else:  # "A"
             raise SysExit(125)
@@ -1142,91 +1152,102 @@ class InstallPackagesCLI:
             self.main_sequence()
             raise self.ExitMainSequence
 
-    def build_packages(self) -> None:  # pylint: disable=too-many-branches,too-many-statements
-        logger.debug("<< BUILD PACKAGES")
-        if self.args.needed or self.args.devel:
-            self._get_installed_status()
+    def _is_build_skipped(self, pkg_build: PackageBuild) -> bool:
+        return (
+            pkg_build.package_base in self.built_package_bases
+        ) or (
+            self.args.needed and pkg_build.version_already_installed
+        )
 
-        failed_to_build_package_names = []
-        deps_fails_counter: dict[str, int] = {}
-        packages_to_be_built = self.all_aur_packages_names[:]
-        index = 0
-        while packages_to_be_built:
-            logger.debug("  Packages to be built: {}", packages_to_be_built)
-            logger.debug("  Gonna build PKGBUILDS: {}", self.package_builds_by_name)
-            if index >= len(packages_to_be_built):
-                index = 0
-
-            pkg_name = packages_to_be_built[index]
-            pkg_build = self._get_pkgbuild_for_name_or_provided(pkg_name)
-            pkg_base = pkg_build.package_base
-            if (
-                pkg_base in self.built_package_bases
-            ) or (
-                    self.args.needed and pkg_build.version_already_installed
-            ):
-                logger.debug("  Already built: {}", pkg_base)
-                pkg_build.set_built_package_path()
-                packages_to_be_built.remove(pkg_name)
-                continue
+    def _build_package(self, pkg_build: PackageBuild, *, remove_deps: bool) -> bool:
+        pkg_base = pkg_build.package_base
+        if self._is_build_skipped(pkg_build):
+            logger.debug("  Already built: {}", pkg_base)
+            pkg_build.set_built_package_path()
+            return True
 
-            try:
-                logger.debug("  Gonna build pkgnames: {}", pkg_build.package_names)
-                pkg_build.build(
-                    all_package_builds=self.package_builds_by_name,
-                    resolved_conflicts=self.resolved_conflicts,
-                    skip_checkfunc_for_pkgnames=self.skip_checkfunc_for_pkgnames,
-                )
-            except PkgbuildChanged as exc:
-                logger.debug("  PKGBUILD changed: {}", exc)
-                self.handle_pkgbuild_changed(pkg_build)
-            except (BuildError, DependencyError) as exc:
-                print_stderr(exc)
+        try:
+            logger.debug("  Gonna build pkgnames: {}", pkg_build.package_names)
+            pkg_build.build(
+                all_package_builds=self.package_builds_by_name,
+                resolved_conflicts=self.resolved_conflicts,
+                skip_checkfunc_for_pkgnames=self.skip_checkfunc_for_pkgnames,
+                remove_deps=remove_deps,
+            )
+        except (BuildError, DependencyError, DependencyNotBuiltYetError) as exc:
+            print_stderr(exc)
+            return False
+        logger.debug("  Build done for packages {}", pkg_build.package_names)
+        self.built_package_bases.append(pkg_base)
+        return True
+
+    def _run_builds(self, scheduler: BuildScheduler) -> None:
+        # concurrent builds could still need the deps installed for the other ones:
+        remove_deps = scheduler.jobs == 1
+        try:
+            scheduler.run(partial(self._build_package, remove_deps=remove_deps))
+        finally:
+            if not remove_deps:
+                remove_build_deps(list(scheduler.package_builds.values()))
+            for pkg_base in scheduler.failed:
+                pkg_build = scheduler.package_builds[pkg_base]
                 print_stderr(
                     color_line(
-                        translate("Can't build '{name}'.").format(name=pkg_name) + "\n",
+                        translate("Can't build '{name}'.").format(
+                            name=", ".join(pkg_build.package_names),
+                        ) + "\n",
                         ColorsHighlight.red,
                     ),
                 )
-                # if not ask_to_continue():
-                #     raise SysExit(125)
-                for pkg_name_aff_by_error in pkg_build.package_names:
-                    failed_to_build_package_names.append(pkg_name_aff_by_error)
-                    if pkg_name_aff_by_error in packages_to_be_built:
-                        packages_to_be_built.remove(pkg_name_aff_by_error)
-                    self.discard_install_info(pkg_name_aff_by_error)
-                    for remaining_aur_pkg_name in packages_to_be_built[:]:
-                        if remaining_aur_pkg_name not in self.all_aur_packages_names:
-                            packages_to_be_built.remove(remaining_aur_pkg_name)
-            except DependencyNotBuiltYetError as exc:
-                logger.debug("  {} Dep not built yet: {}", index, exc)
-                index += 1
-                for pkg_name_without_dep in pkg_build.package_names:
-                    deps_fails_counter.setdefault(pkg_name_without_dep, 0)
-                    deps_fails_counter[pkg_name_without_dep] += 1
-                    if deps_fails_counter[pkg_name_without_dep] > len(self.all_aur_packages_names):
-                        print_error(
-                            translate(
-                                "Dependency cycle detected between {}",
-                            ).format(deps_fails_counter),
-                        )
-                        self.prompt_dependency_cycle(pkg_name_without_dep)
-            else:
-                logger.debug(
-                    "  Build done for packages {}, removing from queue {}",
-                    pkg_build.package_names,
-                    packages_to_be_built,
+                for pkg_name in pkg_build.package_names:
+                    self.failed_to_build_package_names.append(pkg_name)
+                    self.discard_install_info(pkg_name)
+
+    def build_packages(self) -> None:
+        logger.debug("<< BUILD PACKAGES")
+        if self.args.needed or self.args.devel:
+            self._get_installed_status()
+
+        self.failed_to_build_package_names = []
+        prefetch_sources(
+            (
+                pkg_build for pkg_build in (
+                    self._get_pkgbuild_for_name_or_provided(pkg_name)
+                    for pkg_name in self.all_aur_packages_names
+                )
+                if not self._is_build_skipped(pkg_build)
+            ),
+            self.package_builds_by_name,
+        )
+        jobs = 1 if UsingDynamicUsers() else self.args.build_jobs
+        while True:
+            package_builds = {
+                pkg_build.package_base: pkg_build
+                for pkg_build in (
+                    self._get_pkgbuild_for_name_or_provided(pkg_name)
+                    for pkg_name in self.all_aur_packages_names
+                )
+            }
+            logger.debug("  Gonna build PKGBUILDS: {}", package_builds)
+            try:
+                scheduler = BuildScheduler(
+                    list(package_builds.values()), self.package_builds_by_name, jobs=jobs,
+                )
+            except DependencyCycleError as exc:
+                print_error(
+                    translate(
+                        "Dependency cycle detected between {}",
+                    ).format(", ".join(exc.package_bases)),
                 )
-                self.built_package_bases.append(pkg_base)
-                for built_pkg_name in pkg_build.package_names + pkg_build.provides:
-                    if (
-                            (built_pkg_name not in self.ignored_pkgnames)
-                            and (built_pkg_name in packages_to_be_built)
-                    ):
-                        packages_to_be_built.remove(built_pkg_name)
-            logger.debug("")
-
-        self.failed_to_build_package_names = failed_to_build_package_names
+                self.prompt_dependency_cycle(package_builds[exc.package_bases[0]].package_names[0])
+                continue
+            try:
+                self._run_builds(scheduler)
+            except PkgbuildChanged as exc:
+                logger.debug("  PKGBUILD changed: {}", exc)
+                self.handle_pkgbuild_changed(exc.build)
+                continue
+            break
         logger.debug(">> BUILD PACKAGES")
 
     def _save_transaction(
@@ -1280,7 +1301,7 @@ class InstallPackagesCLI:
         ) and not ask_to_continue(default_yes=False):  # pragma: no cover
             self._revert_transaction(PackageSource.REPO)
             raise SysExit(125)
-        PackageDB.discard_local_cache()
+        PackageDB.update_local_cache()
         self._save_transaction(
             PackageSource.REPO, installed=self.install_package_names,
         )
@@ -1329,7 +1350,7 @@ class InstallPackagesCLI:
             ) and not ask_to_continue(default_yes=False):  # pragma: no cover
                 self._revert_transaction(PackageSource.AUR)
                 raise SysExit(125)
-            PackageDB.discard_local_cache()
+            PackageDB.update_local_cache()
             self._save_transaction(
                 PackageSource.AUR, installed=list(aur_packages_to_install.keys()),
             )
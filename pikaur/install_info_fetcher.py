@@ -5,17 +5,19 @@ from itertools import chain
 from multiprocessing.pool import ThreadPool
 from typing import TYPE_CHECKING, cast
 
-from .alpm import OFFICIAL_REPOS, PacmanConfig
+from .alpm import OFFICIAL_REPOS
 from .args import parse_args, reconstruct_args
 from .aur import find_aur_packages, find_aur_provided_deps, strip_aur_repo_name
 from .aur_deps import find_aur_deps, find_repo_deps_of_aur_pkgs
 from .exceptions import DependencyError, DependencyVersionMismatchError, SysExit
 from .i18n import translate
+from .local_repo import LocalRepo
 from .logging_extras import create_logger
+from .package_filter import PackageFilter
 from .pacman import (
+    IgnoredPackages,
     PackageDB,
     find_sysupgrade_packages,
-    get_ignored_pkgnames_from_patterns,
     get_pacman_command,
     strip_repo_name,
 )
@@ -38,7 +40,7 @@ from .print_department import print_ignored_package, print_not_found_packages
 from .prompt import ask_to_continue
 from .replacements import find_replacements
 from .srcinfo import SrcInfo
-from .updates import find_aur_updates, print_upgradeable
+from .updates import find_aur_updates, is_devel_pkg, print_upgradeable
 from .version import VersionMatcher
 
 if TYPE_CHECKING:
@@ -125,9 +127,9 @@ Gonna fetch install info for:
 
     def package_is_ignored(self, package_name: str) -> bool:
         return bool(
-            package_name in get_ignored_pkgnames_from_patterns(
-                [package_name],
-                self.manually_excluded_packages_names + PacmanConfig().options.get("IgnorePkg", []),
+            (
+                PackageFilter.get(self.manually_excluded_packages_names)(package_name)
+                or IgnoredPackages.is_ignored(package_name)
             )
             and not (
                 package_name in self.install_package_names
@@ -270,6 +272,9 @@ Gonna fetch install info for:
 
         self.mark_dependent()
 
+        if LocalRepo.get_url() and not self.args.rebuild:
+            self.get_local_repo_pkgs_info()
+
     # pylint: disable=too-many-statements,too-many-locals,too-many-branches
     def _get_repo_pkgs_info(
             self, pkg_lines: list[str], extra_args: list[str] | None = None,
@@ -697,6 +702,15 @@ Gonna fetch install info for:
             added_pkg_names.append(aur_pkg.name)
         logger.debug("get_aur_deps_info: [done]")
 
+    def get_local_repo_pkgs_info(self) -> None:
+        """Mark AUR packages which are going to be downloaded from the local repo."""
+        for info in self.aur_install_info:
+            if info.pkgbuild_path or is_devel_pkg(info.package.packagebase):
+                continue
+            if LocalRepo.find_package(info.name, info.new_version):
+                logger.debug("{} is found in the local repo", info.name)
+                info.repository = LocalRepo.get_name()
+
     def mark_dependent(self) -> None:
         """Update packages' install info to show deps in prompt."""
         logger.debug(":: marking dependant pkgs...")
@@ -704,7 +718,8 @@ Gonna fetch install info for:
         all_provided_pkgs = PackageDB.get_repo_provided_dict()
         logger.debug("  :: mark_dependant :: get local pkgs...")
         all_local_pkgs = PackageDB.get_local_dict()
-        all_local_pkgnames = PackageDB.get_local_pkgnames()
+        local_index = PackageDB.get_index(PackageSource.LOCAL)
+        all_local_pkgnames = local_index.pkgnames
         all_deps_install_infos: Sequence[InstallInfo] = (
             self.new_repo_deps_install_info +
             self.new_thirdparty_repo_deps_install_info +
@@ -809,10 +824,12 @@ Gonna fetch install info for:
             if (
                     local_pkg := all_local_pkgs.get(pkg_install_info.name)
             ):
-                req = local_pkg.compute_requiredby()
-                opt = local_pkg.compute_optionalfor()
-                pkg_install_info.required_by_installed = req or []
-                pkg_install_info.optional_for_installed = opt or []
+                pkg_install_info.required_by_installed = local_index.get_required_by(
+                    local_pkg.name, local_pkg.provides,
+                )
+                pkg_install_info.optional_for_installed = local_index.get_optional_for(
+                    local_pkg.name, local_pkg.provides,
+                )
                 pkg_install_info.installed_as_dependency = cast("bool", local_pkg.reason)
 
         logger.debug("== marked dependant pkgs.")
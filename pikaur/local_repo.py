@@ -0,0 +1,210 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import base64
+import binascii
+import hashlib
+import io
+import shutil
+import tarfile
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar, Final, NamedTuple
+from urllib.parse import urlsplit
+
+from .config import PikaurConfig
+from .filelock import FileLock
+from .i18n import translate
+from .logging_extras import create_logger
+from .os_utils import mkdir
+from .pikaprint import print_warning
+from .spawn import joined_spawn
+from .urllib_helper import read_bytes_from_url
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+logger = create_logger("local_repo")
+
+
+DB_SUFFIX: Final = ".db.tar.gz"
+DESC_FILENAME: Final = "desc"
+# neither the DB nor the packages are signed by their checksums,
+# so they shouldn't be fetched over plain http:
+SECURE_URL_SCHEMES: Final = ("https", "file")
+
+
+class LocalRepoPackage(NamedTuple):
+    name: str
+    version: str
+    filename: str
+    sha256sum: str
+    # base64-encoded detached signature, added by `repo-add` if the package has it:
+    pgpsig: str = ""
+
+
+def parse_desc(desc: str) -> dict[str, str]:
+    """First values of `%FIELD%` sections of pacman sync DB `desc` file."""
+    fields: dict[str, str] = {}
+    field = None
+    for line in desc.splitlines():
+        if line.startswith("%") and line.endswith("%"):
+            field = line.strip("%")
+        elif field and line:
+            fields.setdefault(field, line)
+    return fields
+
+
+def parse_db(db_bytes: bytes) -> dict[str, LocalRepoPackage]:
+    packages: dict[str, LocalRepoPackage] = {}
+    with tarfile.open(fileobj=io.BytesIO(db_bytes)) as db_file:
+        for member in db_file:
+            if Path(member.name).name != DESC_FILENAME:
+                continue
+            desc_file = db_file.extractfile(member)
+            if not desc_file:
+                continue
+            fields = parse_desc(desc_file.read().decode())
+            packages[fields["NAME"]] = LocalRepoPackage(
+                name=fields["NAME"],
+                version=fields["VERSION"],
+                filename=fields["FILENAME"],
+                sha256sum=fields.get("SHA256SUM", ""),
+                pgpsig=fields.get("PGPSIG", ""),
+            )
+    return packages
+
+
+class LocalRepo:
+    """
+    Pacman-compatible repository of the packages built by pikaur.
+    Successful builds are added into `[build]LocalRepoPath` with `repo-add`,
+    which updates the existing DB file instead of re-scanning all the packages.
+    AUR packages are installed without building them from the repo at `[sync]LocalRepoUrl`
+    (or the `LocalRepoPath` itself) if it has the same version as AUR.
+    """
+
+    _packages: ClassVar[dict[str, LocalRepoPackage] | None] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_name(cls) -> str:
+        return PikaurConfig().build.LocalRepoName.get_str()
+
+    @classmethod
+    def get_path(cls) -> Path | None:
+        repo_path = PikaurConfig().build.LocalRepoPath.get_str()
+        return Path(repo_path).expanduser().resolve() if repo_path else None
+
+    @classmethod
+    def get_url(cls) -> str | None:
+        if repo_url := PikaurConfig().sync.LocalRepoUrl.get_str():
+            return repo_url.rstrip("/")
+        repo_path = cls.get_path()
+        if not repo_path or not (repo_path / f"{cls.get_name()}.db").exists():
+            return None
+        return repo_path.as_uri()
+
+    @classmethod
+    def publish(cls, package_paths: "Iterable[Path]") -> None:
+        repo_path = cls.get_path()
+        if not repo_path:
+            return
+        mkdir(repo_path)
+        new_paths = []
+        for package_path in package_paths:
+            for path in (package_path, package_path.with_name(package_path.name + ".sig")):
+                if path.exists():
+                    logger.debug("Copying {} to {}", path, repo_path)
+                    shutil.copy2(path, repo_path / path.name)
+            new_paths.append(repo_path / package_path.name)
+        if not new_paths:
+            return
+        with FileLock(repo_path / f".{cls.get_name()}.lock"):
+            result = joined_spawn([
+                "repo-add", "--quiet", "--remove",
+                str(repo_path / f"{cls.get_name()}{DB_SUFFIX}"),
+                *(str(path) for path in new_paths),
+            ])
+        if result.returncode != 0:
+            print_warning(
+                translate("Can't add packages to local repository {}:").format(repo_path),
+            )
+            print_warning(result.stdout_text or "")
+        cls._packages = None
+
+    @classmethod
+    def _load_packages(cls, repo_url: str) -> dict[str, LocalRepoPackage]:
+        db_bytes = read_bytes_from_url(
+            f"{repo_url}/{cls.get_name()}.db", optional=True, autoretry=False,
+        )
+        if not db_bytes:
+            return {}
+        try:
+            return parse_db(db_bytes)
+        except (tarfile.TarError, KeyError, UnicodeDecodeError) as exc:
+            logger.debug("can't read local repo DB from {}: {}", repo_url, exc)
+            return {}
+
+    @classmethod
+    def get_secure_url(cls) -> str | None:
+        repo_url = cls.get_url()
+        if repo_url and urlsplit(repo_url).scheme not in SECURE_URL_SCHEMES:
+            logger.debug("local repo URL {} is not secure", repo_url)
+            return None
+        return repo_url
+
+    @classmethod
+    def get_packages(cls) -> dict[str, LocalRepoPackage]:
+        with cls._lock:
+            if cls._packages is None:
+                repo_url = cls.get_secure_url()
+                if not repo_url and (insecure_url := cls.get_url()):
+                    print_warning(
+                        translate(
+                            "Local repository URL {} is ignored, "
+                            "only https:// and file:// are supported.",
+                        ).format(insecure_url),
+                    )
+                cls._packages = cls._load_packages(repo_url) if repo_url else {}
+                logger.debug("local repo packages: {}", cls._packages)
+            return cls._packages
+
+    @classmethod
+    def find_package(cls, pkg_name: str, version: str) -> LocalRepoPackage | None:
+        pkg = cls.get_packages().get(pkg_name)
+        if pkg and pkg.version == version:
+            return pkg
+        return None
+
+    @classmethod
+    def download(cls, pkg: LocalRepoPackage, destination: Path) -> Path | None:
+        """
+        Package file in `destination` dir or `None` if it failed to download.
+        Signature from the repo DB is saved next to it,
+        so pacman would verify it according to its `LocalFileSigLevel`.
+        """
+        repo_url = cls.get_secure_url()
+        if not repo_url:
+            return None
+        # DB entries are not trusted to point outside of `destination`:
+        filename = Path(pkg.filename).name
+        pkg_bytes = read_bytes_from_url(f"{repo_url}/{filename}", optional=True)
+        if not pkg_bytes or (
+                pkg.sha256sum and hashlib.sha256(pkg_bytes).hexdigest() != pkg.sha256sum
+        ):
+            print_warning(
+                translate("Can't download {} from local repository.").format(filename),
+            )
+            return None
+        try:
+            sig_bytes = base64.b64decode(pkg.pgpsig, validate=True)
+        except binascii.Error as exc:
+            logger.debug("can't decode signature of {}: {}", filename, exc)
+            sig_bytes = b""
+        mkdir(destination)
+        pkg_path = destination / filename
+        pkg_path.write_bytes(pkg_bytes)
+        if sig_bytes:
+            pkg_path.with_name(f"{filename}.sig").write_bytes(sig_bytes)
+        return pkg_path
@@ -104,6 +104,18 @@ class MakepkgConfig:
             cls._user_makepkg_path = config_path
         return cls._user_makepkg_path if isinstance(cls._user_makepkg_path, Path) else None
 
+    @classmethod
+    def get_config_paths(cls) -> list[Path]:
+        """Config files in the same order as makepkg itself loads them."""
+        main_path = Path(parse_args().makepkg_config or "/etc/makepkg.conf")
+        config_paths = [
+            main_path,
+            *sorted(main_path.with_name(f"{main_path.name}.d").glob("*.conf")),
+        ]
+        if user_path := cls.get_user_makepkg_path():
+            config_paths.append(user_path)
+        return [path for path in config_paths if path.exists()]
+
     @classmethod
     def get(
             cls,
@@ -154,16 +166,18 @@ class MakePkgCommand:
             cls._cmd = ["env", "PKGDEST=", *cls._cmd]
             cls.pkgdest_skipped = True
 
+    @staticmethod
+    def get_flags() -> list[str]:
+        mflags = parse_args().mflags
+        return mflags.split(",") if mflags else []
+
     @classmethod
     def get(cls) -> list[str]:
         if cls._cmd is None:
             args = parse_args()
-            makepkg_flags = (
-                args.mflags.split(",") if args.mflags else []
-            )
             config_args = (
                 ["--config", args.makepkg_config] if args.makepkg_config else []
             )
-            cls._cmd = [args.makepkg_path or "makepkg", *makepkg_flags, *config_args]
+            cls._cmd = [args.makepkg_path or "makepkg", *cls.get_flags(), *config_args]
             cls._apply_dynamic_users_workaround()
         return cls._cmd
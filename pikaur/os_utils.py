@@ -128,5 +128,15 @@ def chown_to_current(path: Path) -> None:
 
 def mkdir(path: Path) -> None:
     if not path.exists():
-        path.mkdir(parents=True)
+        path.mkdir(parents=True, exist_ok=True)
     chown_to_current(path)
+
+
+def write_file_atomically(path: Path, content: bytes) -> None:
+    """
+    Write to a temporary file next to `path` and then move it in place,
+    so concurrent readers would never see a partially written file.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
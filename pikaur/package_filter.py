@@ -0,0 +1,48 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import fnmatch
+import re
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from re import Pattern
+
+
+class PackageFilter:
+    """
+    Package name globs (as in `IgnorePkg`) compiled into a single regex
+    plus a set of exact names, with match results cached per package name.
+    """
+
+    __slots__ = ("_cache", "_names", "_regex")
+
+    _filters_cache: ClassVar[dict[tuple[str, ...], "PackageFilter"]] = {}
+
+    _names: frozenset[str]
+    _regex: "Pattern[str] | None"
+    _cache: dict[str, bool]
+
+    def __init__(self, patterns: "Iterable[str]", names: "Iterable[str]" = ()) -> None:
+        patterns = list(dict.fromkeys(patterns))
+        self._names = frozenset(names)
+        self._regex = re.compile("|".join(
+            fnmatch.translate(pattern) for pattern in patterns
+        )) if patterns else None
+        self._cache = {}
+
+    @classmethod
+    def get(cls, patterns: "Iterable[str]") -> "PackageFilter":
+        """Filter for the given patterns, compiled only once per run."""
+        key = tuple(patterns)
+        if key not in cls._filters_cache:
+            cls._filters_cache[key] = cls(key)
+        return cls._filters_cache[key]
+
+    def __call__(self, pkg_name: str) -> bool:
+        result = self._cache.get(pkg_name)
+        if result is None:
+            result = self._cache[pkg_name] = (pkg_name in self._names) or bool(
+                self._regex and self._regex.match(pkg_name),
+            )
+        return result
@@ -1,19 +1,24 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# pylint: disable=too-many-lines
 
-import fnmatch
+import os
 import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, ClassVar
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar, cast
 
 import pyalpm
 
-from .alpm import PyAlpmWrapper
+from .alpm import PacmanConfig, PyAlpmWrapper
 from .args import PACMAN_APPEND_OPTS, get_pacman_str_opts, parse_args, reconstruct_args
+from .db_snapshot import PackageDBSnapshot, PackageIndex
 from .exceptions import DependencyError, PackagesNotFoundInRepoError
 from .i18n import translate
 from .lock import FancyLock
 from .logging_extras import create_logger
+from .package_filter import PackageFilter
 from .pacman_i18n import _p
 from .pikaprint import color_enabled, print_error, print_stderr
 from .pikatypes import AnyPackage, PackageSource
@@ -21,16 +26,26 @@ from .privilege import sudo
 from .prompt import retry_interactive_command, retry_interactive_command_or_exit
 from .provider import Provider
 from .spawn import spawn
-from .version import VersionMatcher
+from .version import DepSpec, VersionMatcher
 
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
-    from pathlib import Path
     from re import Pattern
     from typing import Final
 
 
 REPO_NAME_DELIMITER: "Final" = "/"
+PRINT_FORMAT_OPTS_WITH_VALUE: "Final" = (
+    "--print-format",
+    # those are already applied to pyalpm handle or not affecting the transaction:
+    "--config", "--dbpath", "--root", "--cachedir", "--gpgdir", "--hookdir", "--logfile",
+)
+PRINT_FORMAT_OPTS_IGNORED: "Final" = (
+    "--sync", "-S",
+    "--color=always", "--color=never",
+    "--noconfirm", "--confirm", "--asdeps", "--asexplicit",
+    "--noprogressbar", "--noscriptlet", "--disable-download-timeout",
+)
 
 
 logger = create_logger("pacman")
@@ -128,6 +143,36 @@ class ProvidedDependency:
         )
 
 
+def get_provided_dependencies(pkg: pyalpm.Package) -> list[ProvidedDependency]:
+    """Package itself and everything it provides."""
+    provided_dependencies = [ProvidedDependency(
+        name=pkg.name,
+        package=pkg,
+        version_matcher=VersionMatcher(pkg.name, is_pkg_deps=True),
+    )]
+    for provided_pkg_line in pkg.provides or []:
+        version_matcher = VersionMatcher(provided_pkg_line, is_pkg_deps=True)
+        provided_dependencies.append(ProvidedDependency(
+            name=version_matcher.pkg_name,
+            package=pkg,
+            version_matcher=version_matcher,
+        ))
+    return provided_dependencies
+
+
+def pyalpm_supports_transactions() -> bool:
+    """pikaur-static's pyalpm (see `pikaur_static/pyalpm.py`) can only read the DBs."""
+    return hasattr(pyalpm, "find_satisfier")
+
+
+def find_satisfier(pkgs: list[pyalpm.Package], dep_line: str) -> pyalpm.Package | None:
+    """Only if `pyalpm_supports_transactions()`."""
+    satisfier: pyalpm.Package | None = (
+        pyalpm.find_satisfier(pkgs, dep_line)  # type: ignore[attr-defined]  # pylint: disable=no-member
+    )
+    return satisfier
+
+
 def get_pkg_id(pkg: AnyPackage) -> str:
     if isinstance(pkg, pyalpm.Package):
         return f"{pkg.db.name}/{pkg.name}"
@@ -226,30 +271,67 @@ class PackageDBCommon(ABC):
                     cls.get_local_list() if package_source == PackageSource.LOCAL
                     else cls.get_repo_list()
             ):
-                provided_pkg_names.setdefault(pkg.name, []).append(
-                    ProvidedDependency(
-                        name=pkg.name,
-                        package=pkg,
-                        version_matcher=VersionMatcher(pkg.name, is_pkg_deps=True),
-                    ),
-                )
-                if pkg.provides:
-                    for provided_pkg_line in pkg.provides:
-                        version_matcher = VersionMatcher(provided_pkg_line, is_pkg_deps=True)
-                        provided_name = version_matcher.pkg_name
-                        provided_pkg_names.setdefault(provided_name, []).append(
-                            ProvidedDependency(
-                                name=provided_name,
-                                package=pkg,
-                                version_matcher=version_matcher,
-                            ),
-                        )
+                for provided_dependency in get_provided_dependencies(pkg):
+                    provided_pkg_names.setdefault(provided_dependency.name, []).append(
+                        provided_dependency,
+                    )
             for what_provides, provided_pkgs in list(provided_pkg_names.items()):
                 if len(provided_pkgs) == 1 and provided_pkgs[0].name == what_provides:
                     del provided_pkg_names[what_provides]
             cls._provided_dict_cache[package_source] = provided_pkg_names
         return cls._provided_dict_cache[package_source]
 
+    @classmethod
+    def _patch_provided_dict(
+            cls,
+            package_source: PackageSource,
+            old_pkgs: list[pyalpm.Package],
+            new_pkgs: list[pyalpm.Package],
+    ) -> set[str]:
+        """
+        Replace entries of `old_pkgs` with `new_pkgs` in already built provided dict,
+        returns the names of all the affected provided dependencies.
+        """
+        changed_names = {pkg.name for pkg in old_pkgs + new_pkgs}
+        new_provided_dependencies = [
+            provided_dependency
+            for pkg in new_pkgs
+            for provided_dependency in get_provided_dependencies(pkg)
+        ]
+        affected_names = {
+            provided_dependency.name
+            for pkg in old_pkgs
+            for provided_dependency in get_provided_dependencies(pkg)
+        } | {provided_dependency.name for provided_dependency in new_provided_dependencies}
+        provided_pkg_names = cls._provided_dict_cache.get(package_source)
+        if not provided_pkg_names:
+            return affected_names
+        omitted_names = affected_names - provided_pkg_names.keys()
+        # dependencies provided only by a single package are omitted from the dict:
+        for pkg in cls._packages_list_cache.get(package_source, []):
+            if (pkg.name not in changed_names) and (
+                    {pkg.name, *(DepSpec.parse(line).pkg_name for line in pkg.provides or [])}
+                    & omitted_names
+            ):
+                for provided_dependency in get_provided_dependencies(pkg):
+                    if provided_dependency.name in omitted_names:
+                        provided_pkg_names.setdefault(provided_dependency.name, []).append(
+                            provided_dependency,
+                        )
+        for what_provides in affected_names:
+            provided_pkgs = [
+                provided_dependency
+                for provided_dependency in provided_pkg_names.pop(what_provides, [])
+                if provided_dependency.package.name not in changed_names
+            ] + [
+                provided_dependency
+                for provided_dependency in new_provided_dependencies
+                if provided_dependency.name == what_provides
+            ]
+            if len(provided_pkgs) > 1:
+                provided_pkg_names[what_provides] = provided_pkgs
+        return affected_names
+
     @classmethod
     def get_repo_provided_dict(cls) -> dict[str, list[ProvidedDependency]]:
         return cls.get_provided_dict(PackageSource.REPO)
@@ -274,18 +356,23 @@ class RepositoryNotFoundError(Exception):
 class PackageDB(PackageDBCommon, PyAlpmWrapper):
 
     _pacman_pformat_cache: ClassVar[dict[str, RawPrintFormat]] = {}
-    _pacman_test_cache: ClassVar[dict[str, list[VersionMatcher]]] = {}
+    _pacman_test_cache: ClassVar[dict[str, VersionMatcher | None]] = {}
     _pacman_repo_pkg_present_cache: ClassVar[dict[str, bool]] = {}
+    _local_db_entries: ClassVar[dict[str, int] | None] = None
+    # alpm handle can't have more than one transaction at once:
+    _transaction_lock: ClassVar[Lock] = Lock()
 
     @classmethod
     def discard_local_cache(cls) -> None:
         super().discard_local_cache()
+        PackageDBSnapshot.discard(PackageSource.LOCAL)
         cls._alpm_handle = None
         cls._pacman_test_cache = {}
 
     @classmethod
     def discard_repo_cache(cls) -> None:
         super().discard_repo_cache()
+        PackageDBSnapshot.discard(PackageSource.REPO)
         cls._alpm_handle = None
         cls._pacman_pformat_cache = {}
         cls._pacman_repo_pkg_present_cache = {}
@@ -300,17 +387,91 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
             with DbLockLocal():
                 if not quiet:
                     print_stderr(translate("Reading local package database..."))
+                cls._local_db_entries = cls._scan_local_db()
                 cls._packages_list_cache[PackageSource.LOCAL] = cls.search_local("")
         return cls._packages_list_cache[PackageSource.LOCAL]
 
+    @classmethod
+    def _scan_local_db(cls) -> dict[str, int]:
+        """Local DB entries (`pkgname-pkgver-pkgrel`) with mtimes of their `desc` files."""
+        entries = {}
+        with os.scandir(PackageDBSnapshot.get_local_db_path()) as dir_entries:
+            for entry in dir_entries:
+                try:
+                    entries[entry.name] = (Path(entry.path) / "desc").stat().st_mtime_ns
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+        return entries
+
+    @classmethod
+    def update_local_cache(cls) -> None:
+        """
+        Update local package caches after a transaction:
+        only the packages which were changed are re-read,
+        and the caches depending on them are patched or invalidated selectively.
+        """
+        old_entries = cls._local_db_entries
+        if (old_entries is None) or (not cls._packages_list_cache.get(PackageSource.LOCAL)):
+            cls.discard_local_cache()
+            return
+        new_entries = cls._scan_local_db()
+        changed_names = {
+            entry.rsplit("-", 2)[0]
+            for entry, _mtime in set(old_entries.items()).symmetric_difference(
+                new_entries.items(),
+            )
+        }
+        logger.debug("local packages changed: {}", changed_names)
+        cls._local_db_entries = new_entries
+        if not changed_names:
+            return
+        with DbLockLocal():
+            cls._alpm_handle = None
+            local_db = cls.get_alpm_handle().get_localdb()
+            new_pkgs = [
+                pkg for pkg_name in sorted(changed_names)
+                if (pkg := local_db.get_pkg(pkg_name))
+            ]
+            local_pkgs = cls._packages_list_cache[PackageSource.LOCAL]
+            old_pkgs = [pkg for pkg in local_pkgs if pkg.name in changed_names]
+            cls._packages_list_cache[PackageSource.LOCAL] = sorted(
+                [pkg for pkg in local_pkgs if pkg.name not in changed_names] + new_pkgs,
+                key=lambda pkg: pkg.name,
+            )
+            local_dict = cls._packages_dict_cache.get(PackageSource.LOCAL)
+            if local_dict:
+                for pkg in old_pkgs:
+                    del local_dict[pkg.name]
+                local_dict.update({pkg.name: pkg for pkg in new_pkgs})
+            affected_names = cls._patch_provided_dict(PackageSource.LOCAL, old_pkgs, new_pkgs)
+            cls._pacman_test_cache = {
+                dep_line: version_matcher
+                for dep_line, version_matcher in cls._pacman_test_cache.items()
+                if DepSpec.parse(dep_line).pkg_name not in affected_names
+            }
+            PackageDBSnapshot.update(PackageSource.LOCAL, changed_names, new_pkgs)
+
+    @classmethod
+    def get_repo_pkgnames(cls) -> list[str]:
+        return [pkg.name for pkg in PackageDBSnapshot.get_packages(PackageSource.REPO)]
+
+    @classmethod
+    def get_local_pkgnames(cls) -> list[str]:
+        return [pkg.name for pkg in PackageDBSnapshot.get_packages(PackageSource.LOCAL)]
+
+    @classmethod
+    def get_index(cls, package_source: PackageSource) -> PackageIndex:
+        """Package name sets, provides and groups maps of local or sync DBs."""
+        return PackageDBSnapshot.get_index(package_source)
+
     @classmethod
     def get_repo_priority(cls, repo_name: str) -> int:
         """0 is the highest priority."""
-        repos = [r.name for r in cls.get_alpm_handle().get_syncdbs()]
-        if repo_name not in repos:
-            repo_not_found = f"'{repo_name}' in {repos}"
+        repo_priorities = PackageDBSnapshot.get_repo_priorities()
+        if repo_name not in repo_priorities:
+            repo_not_found = f"'{repo_name}' in {list(repo_priorities)}"
             raise RepositoryNotFoundError(repo_not_found)
-        return repos.index(repo_name)
+        return repo_priorities[repo_name]
 
     @classmethod
     def get_provided_dict(
@@ -320,9 +481,10 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
         if not cls._provided_dict_cache.get(package_source):
             provided_pkg_names = super().get_provided_dict(package_source)
             if package_source == PackageSource.REPO:
+                repo_priorities = PackageDBSnapshot.get_repo_priorities()
                 for provided_pkgs in provided_pkg_names.values():
                     provided_pkgs.sort(
-                        key=lambda p: f"{cls.get_repo_priority(p.package.db.name)}{p.package.name}",
+                        key=lambda p: (repo_priorities[p.package.db.name], p.package.name),
                     )
             cls._provided_dict_cache[package_source] = provided_pkg_names
         return cls._provided_dict_cache[package_source]
@@ -389,16 +551,126 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
             final_args += ["--nodeps", "--nodeps"]
         cache_index = " ".join(sorted(final_args))
         if cls._pacman_pformat_cache.get(cache_index) is None:
-            proc = spawn(final_args)
-            cls._pacman_pformat_cache[cache_index] = RawPrintFormat(
-                returncode=proc.returncode,
-                stdout_text=proc.stdout_text,
-                stderr_text=proc.stderr_text,
-            )
+            simulated_result = cls._simulate_print_format(final_args)
+            if simulated_result:
+                cls._pacman_pformat_cache[cache_index] = simulated_result
+            else:
+                proc = spawn(final_args)
+                cls._pacman_pformat_cache[cache_index] = RawPrintFormat(
+                    returncode=proc.returncode,
+                    stdout_text=proc.stdout_text,
+                    stderr_text=proc.stderr_text,
+                )
         else:
             logger.debug("cached pformat {}", final_args)
         return cls._pacman_pformat_cache[cache_index]
 
+    @classmethod
+    def _find_sync_target(
+            cls, target: str, sync_dbs: list[pyalpm.DB],
+    ) -> pyalpm.Package | None:
+        """
+        Resolve `pacman --sync` package target the same way as pacman does it.
+        Returns None for groups and targets which can't be found,
+        so pacman itself would be asked about them.
+        """
+        if REPO_NAME_DELIMITER in target:
+            repo_name, target_name = target.split(REPO_NAME_DELIMITER, 1)
+            sync_dbs = [sync_db for sync_db in sync_dbs if sync_db.name == repo_name]
+        else:
+            target_name = target
+        pkg_name = VersionMatcher(target_name).pkg_name
+        for sync_db in sync_dbs:
+            pkg = sync_db.get_pkg(pkg_name)
+            if pkg and find_satisfier([pkg], target_name):
+                return pkg
+        for sync_db in sync_dbs:
+            provider = find_satisfier(sync_db.pkgcache, target_name)
+            if provider:
+                return provider
+        return None
+
+    @classmethod
+    def _find_sync_targets(
+            cls, targets: list[str],
+    ) -> list[pyalpm.Package] | None:
+        handle = cls.get_alpm_handle()
+        sync_dbs = handle.get_syncdbs()
+        pkgs: dict[str, pyalpm.Package] = {}
+        for target in targets:
+            pkg = cls._find_sync_target(target, sync_dbs)
+            if not pkg:
+                logger.debug("can't simulate pacman: target {} not resolved", target)
+                return None
+            pkgs[get_pkg_id(pkg)] = pkg
+        return list(pkgs.values())
+
+    @classmethod
+    def _prepare_transaction(
+            cls, pkgs: list[pyalpm.Package], *, nodeps_level: int,
+    ) -> list[pyalpm.Package]:
+        with cls._transaction_lock:
+            transaction = cls.get_alpm_handle().init_transaction(  # type: ignore[attr-defined]
+                nolock=True, nodepversion=nodeps_level > 0,
+            )
+            try:
+                for pkg in pkgs:
+                    transaction.add_pkg(pkg)
+                transaction.prepare()
+                to_add: list[pyalpm.Package] = transaction.to_add
+                return to_add
+            finally:
+                transaction.release()
+
+    @classmethod
+    def _simulate_print_format(
+            cls, cmd_args: list[str],
+    ) -> RawPrintFormat | None:
+        """
+        Same as `pacman --sync --print-format "%r/%n" ...` but using pyalpm dry-run transaction.
+        Returns None if pyalpm or given pacman options are not supported,
+        or if the transaction fails: pacman's own error output is used then.
+        """
+        if not pyalpm_supports_transactions():
+            return None
+        targets: list[str] = []
+        nodeps_level = 0
+        args_to_parse = iter(cmd_args[1:])
+        for arg in args_to_parse:
+            if arg in PRINT_FORMAT_OPTS_WITH_VALUE:
+                next(args_to_parse, None)
+            elif arg in {"--nodeps", "-d"}:
+                nodeps_level += 1
+            elif arg.startswith("-"):
+                if arg not in PRINT_FORMAT_OPTS_IGNORED:
+                    logger.debug("can't simulate pacman {}: unsupported {}", cmd_args, arg)
+                    return None
+            else:
+                targets.append(arg)
+        if {
+                VersionMatcher(target.rsplit(REPO_NAME_DELIMITER, 1)[-1]).pkg_name
+                for target in targets
+        }.intersection(cls.get_alpm_handle().ignorepkgs):  # type: ignore[attr-defined]
+            # pacman would ask whether to install ignored package anyway
+            return None
+        try:
+            pkgs = cls._find_sync_targets(targets)
+            if pkgs is None:
+                return None
+            to_add = (
+                pkgs
+                if nodeps_level > 1
+                else cls._prepare_transaction(pkgs, nodeps_level=nodeps_level)
+            )
+        except pyalpm.error as exc:
+            logger.debug("can't simulate pacman {}: {}", cmd_args, exc)
+            return None
+        return RawPrintFormat(
+            returncode=0,
+            stdout_text="\n".join(get_pkg_id(pkg) for pkg in to_add),
+            stderr_text="",
+        )
+
     @classmethod
     def get_print_format_output(
             cls, cmd_args: list[str], *, check_deps: bool = True, package_only: bool = False,
@@ -445,35 +717,57 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
             package_only=package_only,
         )
 
+    @classmethod
+    def _get_unsatisfied_dep_lines(cls, dep_lines: list[str]) -> list[str]:
+        return [
+            dep_line for dep_line in dep_lines
+            if not PackageDBSnapshot.find_satisfier(PackageSource.LOCAL, dep_line)
+        ]
+
     @classmethod
     def get_pacman_test_output(cls, cmd_args: list[str]) -> list[VersionMatcher]:
-        if not cmd_args:
-            return []
-        cache_index = " ".join(sorted(cmd_args))
-        cached_pkgs = cls._pacman_test_cache.get(cache_index)
-        if cached_pkgs is not None:
-            # logger.debug("cached deptest {}", cmd_args)
-            return cached_pkgs
-        results: list[VersionMatcher] = []
-        not_found_packages_output = spawn([
-            # pacman --deptest flag conflicts with some --sync options:
-            *get_pacman_command(ignore_args=["overwrite"]),
-            "--deptest",
-            *cmd_args,
-        ]).stdout_text
-        if not not_found_packages_output:
-            cls._pacman_test_cache[cache_index] = results
-            return results
-        for line in not_found_packages_output.splitlines():
-            try:
-                version_matcher = VersionMatcher(line)
-            except ValueError:
-                print_stderr(line)
-                continue
-            else:
-                results.append(version_matcher)
-        cls._pacman_test_cache[cache_index] = results
-        return results
+        """
+        Same as `pacman --deptest`, but memoized per each dependency line,
+        so only the lines not seen before are checked.
+        """
+        dep_lines_to_check = [
+            dep_line for dep_line in dict.fromkeys(cmd_args)
+            if dep_line not in cls._pacman_test_cache
+        ]
+        if dep_lines_to_check:
+            logger.debug("deptest {}", dep_lines_to_check)
+            not_found_matchers: dict[str, VersionMatcher] = {}
+            for line in cls._get_unsatisfied_dep_lines(dep_lines_to_check):
+                try:
+                    not_found_matchers[line.replace(" ", "")] = VersionMatcher(line)
+                except ValueError:
+                    print_stderr(line)
+            for dep_line in dep_lines_to_check:
+                cls._pacman_test_cache[dep_line] = not_found_matchers.get(
+                    dep_line.replace(" ", ""),
+                )
+        return [
+            version_matcher
+            for dep_line in dict.fromkeys(cmd_args)
+            if (version_matcher := cls._pacman_test_cache[dep_line]) is not None
+        ]
+
+    @classmethod
+    def prefetch_deps(cls, dep_lines: list[str]) -> None:
+        """
+        Check dependency lines of many packages against local and sync DBs at once,
+        so later per-package checks from worker threads are served from memo.
+        """
+        split_dep_lines = list({
+            splitted_line
+            for dep_line in dep_lines
+            for splitted_line in dep_line.split(",")
+        })
+        not_found_local_names = set(cls.get_not_found_local_packages(split_dep_lines))
+        cls.get_not_found_repo_packages([
+            dep_line for dep_line in split_dep_lines
+            if VersionMatcher(dep_line).pkg_name in not_found_local_names
+        ])
 
     @classmethod
     def get_not_found_repo_packages(cls, pkg_lines: list[str]) -> list[str]:
@@ -483,9 +777,11 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
 
         not_found_pkg_names = []
         pkg_names_to_check: list[str] = []
-        for pkg_name in pkg_lines:
+        for pkg_name in (
+                splitted_line for pkg_line in pkg_lines for splitted_line in pkg_line.split(",")
+        ):
             if pkg_name not in cls._pacman_repo_pkg_present_cache:
-                pkg_names_to_check += pkg_name.split(",")
+                pkg_names_to_check.append(pkg_name)
             elif not cls._pacman_repo_pkg_present_cache[pkg_name]:
                 not_found_pkg_names.append(VersionMatcher(pkg_name).pkg_name)
 
@@ -545,7 +841,7 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
         if len(results) == 1:
             return found_pkgs[0]
 
-        pkg_name = VersionMatcher(pkg_name).pkg_name
+        pkg_name = DepSpec.parse(pkg_name).pkg_name
         matching_pkgs: list[pyalpm.Package] = [
             pkg
             for pkg in found_pkgs
@@ -554,7 +850,7 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
         for pkg in found_pkgs:
             if pkg.provides:
                 for provided_pkg_line in pkg.provides:
-                    provided_name = VersionMatcher(provided_pkg_line).pkg_name
+                    provided_name = DepSpec.parse(provided_pkg_line).pkg_name
                     if provided_name == pkg_name:
                         matching_pkgs.append(pkg)
         if not matching_pkgs:
@@ -569,12 +865,7 @@ class PackageDB(PackageDBCommon, PyAlpmWrapper):
 
 
 def get_upgradeable_package_names() -> list[str]:
-    upgradeable_packages_output = spawn([
-        *get_pacman_command(), "--query", "--upgrades", "--quiet",
-    ]).stdout_text
-    if not upgradeable_packages_output:
-        return []
-    return upgradeable_packages_output.splitlines()
+    return [pkg.name for pkg in PackageDBSnapshot.get_upgradeable()]
 
 
 def find_upgradeable_packages(*, skip_dep_test: bool = False) -> list[pyalpm.Package]:
@@ -637,7 +928,7 @@ def find_sysupgrade_packages(
 
 
 def find_packages_not_from_repo() -> list[str]:
-    repo_pkg_names = PackageDB.get_repo_pkgnames()
+    repo_pkg_names = PackageDB.get_index(PackageSource.REPO).pkgnames
     return [
         pkg_name
         for pkg_name in PackageDB.get_local_pkgnames()
@@ -707,7 +998,7 @@ def install_built_deps(
             conflicts=resolved_conflicts,
         )
 
-    PackageDB.discard_local_cache()
+    PackageDB.update_local_cache()
 
     if not (deps_upgrade_success and explicit_upgrade_success):
         raise DependencyError
@@ -717,14 +1008,55 @@ def strip_repo_name(pkg_name: str) -> str:
     return pkg_name.split(REPO_NAME_DELIMITER, 1)[-1]
 
 
-def get_ignored_pkgnames_from_patterns(
-        orig_pkg_names: list[str],
-        ignore_patterns: list[str],
-) -> list[str]:
-    ignored_pkg_names: list[str] = []
-    for pkg_name in orig_pkg_names:
-        for ignore_pattern in ignore_patterns:
-            if fnmatch.fnmatch(pkg_name, ignore_pattern):
-                ignored_pkg_names.append(pkg_name)
-                break
-    return ignored_pkg_names
+class IgnoredPackages:
+    """
+    Packages ignored in pacman config (`IgnorePkg` and `IgnoreGroup`)
+    or with `--ignore` and `--ignoregroup` args.
+    """
+
+    _config_filter: ClassVar[PackageFilter | None] = None
+    _args_filter: ClassVar[PackageFilter | None] = None
+
+    @staticmethod
+    def _get_group_pkgnames(group_patterns: list[str]) -> set[str]:
+        if not group_patterns:
+            return set()
+        group_filter = PackageFilter(group_patterns)
+        return {
+            pkg.name
+            for package_source in (PackageSource.REPO, PackageSource.LOCAL)
+            for group_name, pkgs in PackageDB.get_index(package_source).groups.items()
+            if group_filter(group_name)
+            for pkg in pkgs
+        }
+
+    @classmethod
+    def get_config_filter(cls) -> PackageFilter:
+        if cls._config_filter is not None:
+            return cls._config_filter
+        options = PacmanConfig().options
+        config_filter = PackageFilter(
+            options.get("IgnorePkg", []),
+            names=cls._get_group_pkgnames(cast("list[str]", options.get("IgnoreGroup", []))),
+        )
+        cls._config_filter = config_filter
+        return config_filter
+
+    @classmethod
+    def get_args_filter(cls) -> PackageFilter:
+        if cls._args_filter is not None:
+            return cls._args_filter
+        args = parse_args()
+        args_filter = PackageFilter(
+            args.ignore, names=cls._get_group_pkgnames(args.ignoregroup),
+        )
+        cls._args_filter = args_filter
+        return args_filter
+
+    @classmethod
+    def is_ignored_in_config(cls, pkg_name: str) -> bool:
+        return cls.get_config_filter()(pkg_name)
+
+    @classmethod
+    def is_ignored(cls, pkg_name: str) -> bool:
+        return cls.get_args_filter()(pkg_name) or cls.is_ignored_in_config(pkg_name)
@@ -1,5 +1,5 @@
 from .args import parse_args, reconstruct_args
-from .config import DECORATION, BuildCachePath, PackageCachePath
+from .config import DECORATION, BuildCachePath, BuildResultsCachePath, PackageCachePath
 from .exceptions import SysExit
 from .i18n import translate
 from .logging_extras import create_logger
@@ -18,6 +18,7 @@ def clean_aur_cache() -> None:
     for directory, message, minimal_clean_level in (
             (BuildCachePath(), translate("Build directory"), 1),
             (PackageCachePath(), translate("Packages directory"), 2),
+            (BuildResultsCachePath(), translate("Build results cache"), 2),
     ):
         print_stdout(f"\n{message}: {directory}")
         question = translate("Do you want to remove all files?")
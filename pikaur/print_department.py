@@ -3,7 +3,6 @@
 import operator
 import sys
 from datetime import datetime
-from fnmatch import fnmatch
 from typing import TYPE_CHECKING, ClassVar, cast
 
 import pyalpm
@@ -19,6 +18,7 @@ from .config import (
     UpgradeSortingValues,
 )
 from .i18n import translate, translate_many
+from .package_filter import PackageFilter
 from .pikaprint import (
     Colors,
     ColorsHighlight,
@@ -483,15 +483,14 @@ class SysupgradePrettyFormatter:
         warn_about_packages_list: list[InstallInfo] = []
 
         if warn_about_packages_str:
-            globs_and_names = warn_about_packages_str.split(",")
+            warn_about_filter = PackageFilter.get(warn_about_packages_str.split(","))
 
             def remove_globs_from_pkg_list(pkg_list: "list[InstallInfoT]") -> None:
                 pkg_install_info: InstallInfoT
                 for pkg_install_info in pkg_list[::]:
-                    for glob in globs_and_names:
-                        if fnmatch(pkg_install_info.name, glob):
-                            pkg_list.remove(pkg_install_info)
-                            warn_about_packages_list.append(pkg_install_info)
+                    if warn_about_filter(pkg_install_info.name):
+                        pkg_list.remove(pkg_install_info)
+                        warn_about_packages_list.append(pkg_install_info)
 
             pkg_list: list[RepoInstallInfo] | list[AURInstallInfo]
             for pkg_list in self.all_install_info_lists:
@@ -4,7 +4,8 @@ import os
 import shutil
 import sys
 import tty
-from typing import TYPE_CHECKING
+from threading import RLock
+from typing import TYPE_CHECKING, ClassVar
 
 from .args import LiteralArgs, parse_args
 from .config import PikaurConfig, PromptLockPath
@@ -56,6 +57,22 @@ class Answers:
         self._do_init()
 
 
+class InteractivePromptLock:
+    """
+    Concurrent builds (see `[build]Jobs`) ask the user one at a time,
+    so their prompts and interactive commands don't race for stdin.
+    Re-entrant, for nested prompts like retry question after a failed command.
+    """
+
+    _lock: ClassVar[RLock] = RLock()
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+
+    def __exit__(self, *_exc_details: object) -> None:
+        self._lock.release()
+
+
 def read_answer_from_tty(question: str, answers: "Sequence[str] | None" = None) -> str:
     """
     Function displays a question and reads a single character
@@ -120,6 +137,7 @@ def get_input(
     logger.debug("Gonna get input from user...")
     answer = ""
     with (
+            InteractivePromptLock(),
             FileLock(PromptLockPath()),
             TTYInputWrapper(),
             TTYRestoreContext(before=True, after=True),
@@ -223,6 +241,16 @@ def retry_interactive_command(
         *,
         pikspect: bool = False,
         conflicts: list[list[str]] | None = None,
+) -> bool:
+    with InteractivePromptLock():
+        return _retry_interactive_command(cmd_args, pikspect=pikspect, conflicts=conflicts)
+
+
+def _retry_interactive_command(
+        cmd_args: list[str],
+        *,
+        pikspect: bool,
+        conflicts: list[list[str]] | None,
 ) -> bool:
     args = parse_args()
     while True:
@@ -258,12 +286,13 @@ def retry_interactive_command_or_exit(
         pikspect: bool = False,
         conflicts: list[list[str]] | None = None,
 ) -> None:
-    if not retry_interactive_command(
-            cmd_args,
-            pikspect=pikspect,
-            conflicts=conflicts,
-    ) and not ask_to_continue(default_yes=False):
-        raise SysExit(125)
+    with InteractivePromptLock():
+        if not retry_interactive_command(
+                cmd_args,
+                pikspect=pikspect,
+                conflicts=conflicts,
+        ) and not ask_to_continue(default_yes=False):
+            raise SysExit(125)
 
 
 def get_editor() -> list[str] | None:
@@ -1,48 +1,30 @@
 
-from .exceptions import PackagesNotFoundInRepoError
-from .i18n import translate_many
+from .db_snapshot import PackageDBSnapshot
 from .pacman import PackageDB
-from .pikaprint import print_warning
+from .pikatypes import PackageSource
 
 
 def find_replacements() -> dict[str, list[str]]:
-    all_repo_pkgs_info = PackageDB.get_repo_list()
-    all_repo_pkg_names = PackageDB.get_repo_pkgnames()
-    all_local_pkgs_info = PackageDB.get_local_dict()
-    all_local_pkgs_names = all_local_pkgs_info.keys()
+    all_local_pkgs_names = PackageDB.get_index(PackageSource.LOCAL).pkgnames
+    repo_priorities = PackageDBSnapshot.get_repo_priorities()
 
-    replaces_lists: dict[str, list[str]] = {}
-    for repo_pkg_info in all_repo_pkgs_info:
-        if repo_pkg_info.replaces:
-            for dep_name in repo_pkg_info.replaces:
-                repo_pkg_name = repo_pkg_info.name
-                if dep_name != repo_pkg_name:
-                    replaces_lists.setdefault(repo_pkg_name, []).append(dep_name)
+    def get_repo_priority(pkg_name: str) -> int | None:
+        repo_pkg = PackageDBSnapshot.find_repo_package(pkg_name)
+        return repo_priorities[repo_pkg.repo] if repo_pkg else None
 
     new_pkgs_replaces: dict[str, list[str]] = {}
-    for pkg_name, replace_list in replaces_lists.items():
+    for pkg_name, replace_list in PackageDB.get_index(PackageSource.REPO).get_replaces().items():
         for replace_pkg_name in replace_list:
-            try:
-                if (replace_pkg_name in all_local_pkgs_names) and (
-                        (pkg_name not in all_repo_pkg_names) or (
-                            replace_pkg_name not in all_repo_pkg_names or (
-                                PackageDB.get_repo_priority(
-                                    PackageDB.find_repo_package(replace_pkg_name).db.name,
-                                ) >= PackageDB.get_repo_priority(
-                                    PackageDB.find_repo_package(pkg_name).db.name,
-                                )
-                            )
-                        )
-                ):
-                    new_pkgs_replaces.setdefault(pkg_name, []).append(replace_pkg_name)
-            except PackagesNotFoundInRepoError as exc:
-                print_warning(
-                    translate_many(
-                        "'{packages}' package is available in the repo but can't be installed",
-                        "'{packages}' packages are available in the repo but can't be installed",
-                        len(exc.packages),
-                    ).format(
-                        packages=", ".join(exc.packages),
-                    ),
-                )
+            if replace_pkg_name not in all_local_pkgs_names:
+                continue
+            replaced_priority = get_repo_priority(replace_pkg_name)
+            replacer_priority = get_repo_priority(pkg_name)
+            if (
+                    replacer_priority is None
+            ) or (
+                replaced_priority is None
+            ) or (
+                replaced_priority >= replacer_priority
+            ):
+                new_pkgs_replaces.setdefault(pkg_name, []).append(replace_pkg_name)
     return new_pkgs_replaces
@@ -0,0 +1,169 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+
+import json
+import os
+import sqlite3
+from threading import Lock
+from typing import TYPE_CHECKING, ClassVar, Final
+
+from .config import RepoSearchIndexPath
+from .db_snapshot import PackageDBSnapshot
+from .logging_extras import create_logger
+from .os_utils import mkdir
+from .pacman import REPO_NAME_DELIMITER, PackageDB
+from .pikatypes import PackageSource
+from .version import DepSpec
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pyalpm
+
+
+logger = create_logger("repo_search_index")
+
+
+SQL_SCHEMA: Final = """
+CREATE TABLE meta (
+    db_key TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE packages USING fts5(
+    repo UNINDEXED, name, desc, provides, groups, tokenize = 'trigram'
+);
+"""
+
+REGEX_SPECIAL_CHARS: Final = frozenset("^$.[]()|*+?{}\\")
+TRIGRAM_LENGTH: Final = 3
+
+
+class RepoSearchIndex:
+    """
+    SQLite FTS5 trigram index over names, descriptions, provides and groups
+    of all the sync DB packages, re-built when the sync DBs change.
+    For queries without regex syntax it matches the same packages as `pyalpm.DB.search()`.
+    """
+
+    FORMAT_VERSION: Final = 1
+
+    _connection: ClassVar[sqlite3.Connection | None] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def can_search(cls, queries: list[str]) -> bool:
+        return bool(queries) and all(
+            query
+            and (REPO_NAME_DELIMITER not in query)
+            and not REGEX_SPECIAL_CHARS.intersection(query)
+            for query in queries
+        )
+
+    @classmethod
+    def build(cls, index_path: "Path", db_key: str) -> None:
+        tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        mkdir(tmp_path.parent)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            with connection:
+                connection.executescript(SQL_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {cls.FORMAT_VERSION}")
+                connection.execute("INSERT INTO meta VALUES (?)", (db_key, ))
+                connection.executemany(
+                    "INSERT INTO packages VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (
+                            sync_db.name,
+                            pkg.name,
+                            pkg.desc or "",
+                            "\n".join(DepSpec.parse(line).pkg_name for line in pkg.provides),
+                            "\n".join(pkg.groups),
+                        )
+                        for sync_db in PackageDB.get_alpm_handle().get_syncdbs()
+                        for pkg in sync_db.search("")
+                    ),
+                )
+        finally:
+            connection.close()
+        tmp_path.replace(index_path)
+
+    @classmethod
+    def _connect(cls, index_path: "Path") -> sqlite3.Connection:
+        return sqlite3.connect(
+            f"{index_path.as_uri()}?mode=ro", uri=True, check_same_thread=False,
+        )
+
+    @classmethod
+    def _get_db_key(cls, index_path: "Path") -> str | None:
+        try:
+            connection = cls._connect(index_path)
+        except sqlite3.Error:
+            return None
+        try:
+            format_version: int = connection.execute("PRAGMA user_version").fetchone()[0]
+            if format_version != cls.FORMAT_VERSION:
+                return None
+            db_key: str = connection.execute("SELECT db_key FROM meta").fetchone()[0]
+        except (sqlite3.Error, TypeError) as exc:
+            logger.debug("can't read {}: {}", index_path, exc)
+            return None
+        finally:
+            connection.close()
+        return db_key
+
+    @classmethod
+    def _get_connection(cls) -> sqlite3.Connection:
+        if cls._connection is None:
+            index_path = RepoSearchIndexPath()
+            db_key = json.dumps(PackageDBSnapshot.get_key(PackageSource.REPO))
+            if cls._get_db_key(index_path) != db_key:
+                logger.debug("re-building {}", index_path)
+                cls.build(index_path, db_key)
+            cls._connection = cls._connect(index_path)
+        return cls._connection
+
+    @classmethod
+    def _search_names(cls, queries: list[str], *, names_only: bool) -> list[tuple[str, str]]:
+        conditions: list[str] = []
+        params: list[str] = []
+        if match_queries := [query for query in queries if len(query) >= TRIGRAM_LENGTH]:
+            conditions.append("packages MATCH ?")
+            escaped_queries = [query.replace('"', '""') for query in match_queries]
+            params.append(" AND ".join(f'"{query}"' for query in escaped_queries))
+        for query in queries:
+            if len(query) < TRIGRAM_LENGTH:
+                conditions.append(
+                    "(instr(lower(name), ?) OR instr(lower(desc), ?)"
+                    " OR instr(lower(provides), ?) OR instr(lower(groups), ?))",
+                )
+                params += [query.lower()] * 4
+            if names_only:
+                conditions.append("instr(name, ?)")
+                params.append(query)
+        with cls._lock:
+            return cls._get_connection().execute(
+                "SELECT repo, name FROM packages WHERE " + " AND ".join(conditions),  # noqa: S608
+                params,
+            ).fetchall()
+
+    @classmethod
+    def search(
+            cls, queries: list[str], *, names_only: bool = False,
+    ) -> "list[pyalpm.Package] | None":
+        """
+        Sync DB packages matching all the queries,
+        `None` if the index can't be used.
+        """
+        try:
+            found = cls._search_names(queries, names_only=names_only)
+        except (sqlite3.Error, OSError) as exc:
+            logger.debug("can't use repo search index: {}", exc)
+            return None
+        sync_dbs = {
+            sync_db.name: sync_db
+            for sync_db in PackageDB.get_alpm_handle().get_syncdbs()
+        }
+        return [
+            pkg
+            for repo, name in found
+            if (sync_db := sync_dbs.get(repo)) and (pkg := sync_db.get_pkg(name))
+        ]
@@ -7,8 +7,8 @@ from typing import TYPE_CHECKING
 
 from .args import parse_args
 from .aur import (
+    AurClient,
     AurRPCErrors,
-    aur_rpc_search,
     get_all_aur_names,
     get_all_aur_packages,
 )
@@ -19,6 +19,7 @@ from .pacman import PackageDB, get_pkg_id, refresh_pkg_db_if_needed
 from .pikaprint import print_error, print_stderr
 from .pikatypes import AnyPackage, AURPackageInfo, SamePackageT
 from .print_department import print_package_search_results
+from .repo_search_index import RepoSearchIndex
 
 if TYPE_CHECKING:
     import pyalpm
@@ -74,32 +75,27 @@ def package_search_thread_aur(  # pylint: disable=too-many-branches
     result = {}
     if queries:
         use_as_filters: list[str] = []
-        with ThreadPool() as pool:
-            requests = {}
-            for query in queries:
-                requests[query] = pool.apply_async(aur_rpc_search, (query, ))
-            pool.close()
-            for query, request in requests.items():
-                try:
-                    result[query] = request.get()
-                except AURError as exc:
-                    if exc.error == AurRPCErrors.TOO_MANY_RESULTS:
-                        print_error(
-                            translate("AUR: Too many package results for '{query}'").format(
-                                query=query,
-                            ),
-                        )
-                        use_as_filters.append(query)
-                    elif exc.error == AurRPCErrors.QUERY_TOO_SMALL:
-                        print_error(
-                            translate("AUR: Query arg too small '{query}'").format(
-                                query=query,
-                            ),
-                        )
-                        use_as_filters.append(query)
-                    else:
-                        raise
-            pool.join()
+        for query, query_result in AurClient.search_many(queries).items():
+            if not isinstance(query_result, AURError):
+                if isinstance(query_result, BaseException):
+                    raise query_result
+                result[query] = query_result
+            elif query_result.error == AurRPCErrors.TOO_MANY_RESULTS:
+                print_error(
+                    translate("AUR: Too many package results for '{query}'").format(
+                        query=query,
+                    ),
+                )
+                use_as_filters.append(query)
+            elif query_result.error == AurRPCErrors.QUERY_TOO_SMALL:
+                print_error(
+                    translate("AUR: Query arg too small '{query}'").format(
+                        query=query,
+                    ),
+                )
+                use_as_filters.append(query)
+            else:
+                raise query_result
         for query in use_as_filters:
             result = filter_search_results(result, query, names_only=args.namesonly)
         if args.namesonly:
@@ -141,6 +137,12 @@ def package_search_thread_repo(
         search_query: list[str], db_names: list[str] | None = None,
 ) -> "list[pyalpm.Package]":
     args = parse_args()
+    if (not db_names) and RepoSearchIndex.can_search(search_query):
+        indexed_result = RepoSearchIndex.search(search_query, names_only=args.namesonly)
+        if indexed_result is not None:
+            if not args.quiet:
+                sys.stderr.write("#" * len(search_query))
+            return indexed_result
     use_as_filters: list[str] = []
     result_repo = {}
     with ThreadPool() as pool:
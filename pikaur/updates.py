@@ -3,21 +3,21 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from .alpm import PacmanConfig
 from .args import parse_args
 from .aur import find_aur_packages
 from .config import DEFAULT_TIMEZONE, PikaurConfig
+from .db_snapshot import PackageDBSnapshot
 from .exceptions import PackagesNotFoundInRepoError
 from .i18n import translate, translate_many
 from .logging_extras import create_logger
 from .pacman import (
+    IgnoredPackages,
     PackageDB,
     find_packages_not_from_repo,
     find_upgradeable_packages,
-    get_ignored_pkgnames_from_patterns,
 )
 from .pikaprint import print_stderr, print_stdout
-from .pikatypes import AURInstallInfo, InstallInfo, RepoInstallInfo
+from .pikatypes import AURInstallInfo, InstallInfo, PackageSource, RepoInstallInfo
 from .print_department import (
     pretty_format_upgradeable,
     print_ignored_package,
@@ -27,7 +27,7 @@ from .print_department import (
 from .version import VERSION_DEVEL, compare_versions
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Sequence
     from typing import Final
 
     import pyalpm
@@ -88,6 +88,30 @@ def get_remote_package_version(new_pkg_name: str) -> str | None:
     return None
 
 
+def get_remote_package_versions(pkg_names: "Iterable[str]") -> dict[str, str | None]:
+    """
+    Same as `get_remote_package_version()` for many packages at once:
+    repo ones are taken from the DB snapshot and the rest are fetched from AUR in one batch.
+    """
+    versions: dict[str, str | None] = {}
+    not_found_in_repo: list[str] = []
+    for pkg_name in dict.fromkeys(pkg_names):
+        repo_pkg = (
+            PackageDBSnapshot.find_repo_package(pkg_name)
+            or PackageDBSnapshot.find_satisfier(PackageSource.REPO, pkg_name)
+        )
+        if repo_pkg:
+            versions[pkg_name] = repo_pkg.version
+        else:
+            not_found_in_repo.append(pkg_name)
+    if not_found_in_repo:
+        aur_packages, _not_found = find_aur_packages(not_found_in_repo)
+        aur_versions = {aur_pkg.name: aur_pkg.version for aur_pkg in aur_packages}
+        for pkg_name in not_found_in_repo:
+            versions[pkg_name] = aur_versions.get(pkg_name)
+    return versions
+
+
 def find_repo_upgradeable() -> list[RepoInstallInfo]:
     """
     Unlike `pikaur.install_info_fetcher.InstallInfoFetcher.get_upgradeable_repo_pkgs_info`
@@ -165,7 +189,7 @@ def find_aur_updates(  # pylint: disable=too-many-branches
     )
 
     stable_versions_pkgs: dict[str, pyalpm.Package | AURPackageInfo] = {}
-    repo_pkg_names = PackageDB.get_repo_pkgnames()
+    repo_pkg_names = PackageDB.get_index(PackageSource.REPO).pkgnames
     for pkg_name in stable_names_of_devel_pkgs:
         if pkg_name in not_found_aur_pkgs:
             not_found_aur_pkgs.remove(pkg_name)
@@ -245,21 +269,11 @@ def print_upgradeable(
         logger.debug(">>> PRINT_UPGRADEABLE: no updates")
         return
     logger.debug("updates={}", updates)
-    pkg_names = [pkg.name for pkg in updates]
-    manually_ignored_pkg_names = get_ignored_pkgnames_from_patterns(
-        pkg_names,
-        args.ignore,
-    )
-    config_ignored_pkg_names = get_ignored_pkgnames_from_patterns(
-        pkg_names,
-        PacmanConfig().options.get("IgnorePkg", []),
-    )
-    ignored_pkg_names = manually_ignored_pkg_names + config_ignored_pkg_names
     for pkg in updates[:]:
-        if pkg.name in ignored_pkg_names:
+        if IgnoredPackages.is_ignored(pkg.name):
             updates.remove(pkg)
             ignored_from = None
-            if pkg.name in config_ignored_pkg_names:
+            if IgnoredPackages.is_ignored_in_config(pkg.name):
                 ignored_from = translate("(ignored in Pacman config)")
             print_ignored_package(install_info=pkg, ignored_from=ignored_from)
     if ignored_only:
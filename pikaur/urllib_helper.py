@@ -1,15 +1,26 @@
 import gzip
+import hashlib
 import json
 import socket
+from base64 import b64encode
+from collections import defaultdict
+from http import HTTPStatus
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from io import BytesIO
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
 from time import sleep
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 from urllib import request
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
 
 from .args import parse_args
-from .config import PikaurConfig
+from .config import HttpCachePath, PikaurConfig
 from .exceptions import SysExit
 from .i18n import translate
+from .logging_extras import create_logger
+from .os_utils import mkdir, write_file_atomically
 from .pikaprint import ColorsHighlight, color_line, print_error, print_stderr
 from .prompt import ask_to_continue
 
@@ -19,6 +30,277 @@ if TYPE_CHECKING:
 
 DEFAULT_WEB_ENCODING: "Final" = "utf-8"
 NOCONFIRM_RETRY_INTERVAL: "Final" = 3
+USER_AGENT: "Final" = "Mozilla/5.0"
+MAX_REDIRECTS: "Final" = 10
+REDIRECT_STATUSES: "Final" = (
+    HTTPStatus.MOVED_PERMANENTLY,
+    HTTPStatus.FOUND,
+    HTTPStatus.SEE_OTHER,
+    HTTPStatus.TEMPORARY_REDIRECT,
+    HTTPStatus.PERMANENT_REDIRECT,
+)
+PRESERVE_METHOD_REDIRECT_STATUSES: "Final" = (
+    HTTPStatus.TEMPORARY_REDIRECT,
+    HTTPStatus.PERMANENT_REDIRECT,
+)
+
+
+logger = create_logger("urllib_helper")
+
+
+type ConnectionKey = tuple[str, str, int, str | None]
+
+
+class HttpResponseCache:
+    """
+    On-disk cache of HTTP responses which have `ETag` or `Last-Modified` validators.
+    Cached entry is sent as a conditional request and re-used on `304 Not Modified`.
+    Least recently used entries are evicted when cache exceeds `[network]HttpCacheSize` MiB.
+    """
+
+    _lock: ClassVar[Lock] = Lock()
+    # sum of the cached bodies sizes, counted once per run:
+    _total_size: ClassVar[int | None] = None
+
+    @classmethod
+    def get_max_size(cls) -> int:
+        return PikaurConfig().network.HttpCacheSize.get_int() * 1024 * 1024
+
+    @classmethod
+    def _get_paths(cls, url: str) -> tuple[Path, Path]:
+        url_hash = hashlib.sha256(url.encode()).hexdigest()
+        cache_dir = HttpCachePath()
+        return cache_dir / f"{url_hash}.json", cache_dir / f"{url_hash}.body"
+
+    @classmethod
+    def get_validators(cls, url: str) -> dict[str, str]:
+        if cls.get_max_size() <= 0:
+            return {}
+        meta_path, _body_path = cls._get_paths(url)
+        try:
+            meta = json.loads(meta_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        if meta.get("url") != url:
+            return {}
+        validators = {}
+        if meta.get("etag"):
+            validators["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            validators["If-Modified-Since"] = meta["last_modified"]
+        return validators
+
+    @classmethod
+    def get_body(cls, url: str) -> bytes | None:
+        _meta_path, body_path = cls._get_paths(url)
+        try:
+            body = body_path.read_bytes()
+            body_path.touch()
+        except OSError as exc:
+            logger.debug("can't read cached response for {}: {}", url, exc)
+            return None
+        return body
+
+    @classmethod
+    def _get_total_size(cls) -> int:
+        if cls._total_size is None:
+            cls._total_size = sum(
+                body_path.stat().st_size for body_path in HttpCachePath().glob("*.body")
+            )
+        return cls._total_size
+
+    @classmethod
+    def _write(cls, url: str, headers: "Any", body: bytes) -> int:
+        """Returns the change of the cache size."""
+        meta_path, body_path = cls._get_paths(url)
+        mkdir(meta_path.parent)
+        old_size = body_path.stat().st_size if body_path.exists() else 0
+        write_file_atomically(body_path, body)
+        write_file_atomically(meta_path, json.dumps({
+            "url": url, "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"),
+        }).encode())
+        return len(body) - old_size
+
+    @classmethod
+    def put(cls, url: str, headers: "Any", body: bytes) -> None:
+        max_size = cls.get_max_size()
+        if (
+                (max_size <= 0) or (len(body) > max_size)
+                or not (headers.get("ETag") or headers.get("Last-Modified"))
+        ):
+            return
+        with cls._lock:
+            try:
+                total_size = cls._get_total_size() + cls._write(url, headers, body)
+                cls._total_size = total_size
+                if total_size > max_size:
+                    cls._evict(max_size)
+            except OSError as exc:
+                logger.debug("can't cache response for {}: {}", url, exc)
+                cls._total_size = None
+
+    @classmethod
+    def _evict(cls, max_size: int) -> None:
+        bodies = sorted(
+            (
+                (body_path.stat(), body_path)
+                for body_path in HttpCachePath().glob("*.body")
+            ),
+            key=lambda stat_and_path: stat_and_path[0].st_mtime,
+            reverse=True,
+        )
+        total_size = 0
+        for body_stat, body_path in bodies:
+            if total_size + body_stat.st_size > max_size:
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+                body_path.unlink(missing_ok=True)
+            else:
+                total_size += body_stat.st_size
+        cls._total_size = total_size
+
+
+class HttpConnectionPool:
+    """
+    Persistent (keep-alive) HTTP(S) connections, re-used between requests
+    to the same host, with at most `POOL_SIZE` connections per host.
+    Proxy settings are the same as for `urllib`
+    (`[network]AurHttpProxy`/`AurHttpsProxy` options or `*_proxy` env vars).
+    """
+
+    POOL_SIZE: "Final" = 8
+    TIMEOUT: "Final" = 60
+
+    _idle_connections: ClassVar[dict[ConnectionKey, list[HTTPConnection]]] = defaultdict(list)
+    _semaphores: ClassVar[dict[ConnectionKey, BoundedSemaphore]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_proxy(cls, url: SplitResult) -> str | None:
+        net_config = PikaurConfig().network
+        proxy_addr = {
+            "http": net_config.AurHttpProxy.get_str(),
+            "https": net_config.AurHttpsProxy.get_str(),
+        }.get(url.scheme)
+        if proxy_addr:
+            return proxy_addr
+        if request.proxy_bypass(url.netloc):
+            return None
+        return request.getproxies().get(url.scheme)
+
+    @classmethod
+    def _parse_proxy(cls, proxy_addr: str) -> tuple[SplitResult, dict[str, str]]:
+        proxy = urlsplit(proxy_addr if "://" in proxy_addr else f"http://{proxy_addr}")
+        proxy_headers = {}
+        if proxy.username:
+            credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+            proxy_headers["Proxy-Authorization"] = (
+                "Basic " + b64encode(credentials.encode()).decode()
+            )
+        return proxy, proxy_headers
+
+    @classmethod
+    def _connect(cls, key: ConnectionKey) -> HTTPConnection:
+        scheme, host, port, proxy_addr = key
+        connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+        if not proxy_addr:
+            return connection_class(host, port, timeout=cls.TIMEOUT)
+        proxy, proxy_headers = cls._parse_proxy(proxy_addr)
+        connection = connection_class(proxy.hostname or "", proxy.port, timeout=cls.TIMEOUT)
+        if scheme == "https":
+            connection.set_tunnel(host, port, headers=proxy_headers)
+        return connection
+
+    @classmethod
+    def _acquire(cls, key: ConnectionKey) -> tuple[HTTPConnection, bool]:
+        with cls._lock:
+            if cls._idle_connections[key]:
+                return cls._idle_connections[key].pop(), True
+        return cls._connect(key), False
+
+    @classmethod
+    def _release(cls, key: ConnectionKey, connection: HTTPConnection) -> None:
+        with cls._lock:
+            cls._idle_connections[key].append(connection)
+
+    @classmethod
+    def _get_semaphore(cls, key: ConnectionKey) -> BoundedSemaphore:
+        with cls._lock:
+            if key not in cls._semaphores:
+                cls._semaphores[key] = BoundedSemaphore(cls.POOL_SIZE)
+            return cls._semaphores[key]
+
+    @classmethod
+    def _request(
+            cls, url: str, extra_headers: dict[str, str], data: bytes | None = None,
+    ) -> tuple[int, str, bytes, "Any"]:
+        parsed_url = urlsplit(url)
+        proxy_addr = cls.get_proxy(parsed_url)
+        key: ConnectionKey = (
+            parsed_url.scheme,
+            parsed_url.hostname or "",
+            parsed_url.port or (443 if parsed_url.scheme == "https" else 80),
+            proxy_addr,
+        )
+        headers = {"User-Agent": USER_AGENT, **extra_headers}
+        if data is not None:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path += "?" + parsed_url.query
+        if proxy_addr and parsed_url.scheme != "https":
+            # plain HTTP proxy receives the full URL instead of the tunnel
+            path = url
+            headers.update(cls._parse_proxy(proxy_addr)[1])
+        with cls._get_semaphore(key):
+            while True:
+                connection, is_reused = cls._acquire(key)
+                try:
+                    connection.request(
+                        "GET" if data is None else "POST", path, body=data, headers=headers,
+                    )
+                    response = connection.getresponse()
+                    body = response.read()
+                    break
+                except (OSError, HTTPException) as exc:
+                    connection.close()
+                    # server could have closed idle keep-alive connection:
+                    if not is_reused:
+                        raise URLError(exc) from exc
+            if response.will_close:
+                connection.close()
+            else:
+                cls._release(key, connection)
+        return response.status, response.reason, body, response.headers
+
+    @classmethod
+    def get(cls, url: str, *, use_cache: bool = True, data: bytes | None = None) -> bytes:
+        """
+        Same as `urlopen(url, data).read()` but re-using connections,
+        and cached responses for GET requests.
+        """
+        original_url = url
+        validators = (
+            HttpResponseCache.get_validators(original_url)
+            if (use_cache and data is None) else {}
+        )
+        for _redirect_idx in range(MAX_REDIRECTS):
+            status, reason, body, headers = cls._request(url, validators, data)
+            if not (status in REDIRECT_STATUSES and headers.get("Location")):
+                break
+            url = urljoin(url, headers["Location"])
+            if status not in PRESERVE_METHOD_REDIRECT_STATUSES:
+                data = None
+        if validators and status == HTTPStatus.NOT_MODIFIED:
+            cached_body = HttpResponseCache.get_body(original_url)
+            if cached_body is not None:
+                logger.debug("{} not modified", original_url)
+                return cached_body
+            return cls.get(original_url, use_cache=False)
+        if not HTTPStatus.OK <= status < HTTPStatus.MULTIPLE_CHOICES:
+            raise HTTPError(url, status, reason, headers, BytesIO(body))
+        if data is None:
+            HttpResponseCache.put(original_url, headers, body)
+        return body
 
 
 def read_bytes_from_url(
@@ -26,19 +308,23 @@ def read_bytes_from_url(
         *,
         optional: bool = False,
         autoretry: bool = True,
+        data: bytes | None = None,
 ) -> bytes:
     args = parse_args()
+    method = "GET" if data is None else "POST"
     if args.print_commands:
         print_stderr(
-            color_line("=> ", ColorsHighlight.cyan) + f"GET {url}",
+            color_line("=> ", ColorsHighlight.cyan) + f"{method} {url}",
         )
-    req = request.Request(url, headers={"User-Agent": "Mozilla/5.0"})  # noqa: S310
     try:
+        if urlsplit(url).scheme in {"http", "https"}:
+            return HttpConnectionPool.get(url, data=data)
+        req = request.Request(url, data=data, headers={"User-Agent": USER_AGENT})  # noqa: S310
         with request.urlopen(req) as response:  # nosec B310  # noqa: S310
             result_bytes: bytes = response.read()
             return result_bytes
     except URLError as exc:
-        print_error(f"GET {url}")
+        print_error(f"{method} {url}")
         print_error("urllib: " + str(exc.reason))
         if autoretry and ask_to_continue(translate("Do you want to retry?")):  # pragma: no cover
             if args.noconfirm:
@@ -48,19 +334,21 @@ def read_bytes_from_url(
                     ),
                 )
                 sleep(NOCONFIRM_RETRY_INTERVAL)
-            return read_bytes_from_url(url, optional=optional)
+            return read_bytes_from_url(url, optional=optional, data=data)
         if optional:
             return b""
         raise SysExit(102) from exc
 
 
-def get_unicode_from_url(url: str, *, optional: bool = False) -> str:
-    result_bytes = read_bytes_from_url(url, optional=optional)
+def get_unicode_from_url(
+        url: str, *, optional: bool = False, data: bytes | None = None,
+) -> str:
+    result_bytes = read_bytes_from_url(url, optional=optional, data=data)
     return result_bytes.decode(DEFAULT_WEB_ENCODING)
 
 
-def get_json_from_url(url: str) -> "Any":
-    return json.loads(get_unicode_from_url(url))
+def get_json_from_url(url: str, data: bytes | None = None) -> "Any":
+    return json.loads(get_unicode_from_url(url, data=data))
 
 
 def get_gzip_from_url(url: str, *, autoretry: bool = True) -> str:
@@ -1,12 +1,13 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/ ."""
 
+from functools import cache
 from itertools import zip_longest
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
 import pyalpm
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
     from typing import Final
 
 
@@ -25,14 +26,90 @@ def compare_versions(version1: str, version2: str) -> int:
     return pyalpm.vercmp(version1, version2)
 
 
+class DepSpec:
+    """
+    Parsed dependency line (e.g. `python>=3.12`).
+    Instances are immutable and interned by line, use `DepSpec.parse()` to get one.
+    """
+
+    __slots__ = ("cond", "is_pkg_deps", "line", "pkg_name", "version")
+
+    CONDITIONS: "Final" = (">=", "<=", "=", ">", "<")
+
+    _cache: ClassVar[dict[tuple[str, bool], "DepSpec"]] = {}
+
+    cond: str | None
+    is_pkg_deps: bool
+    line: str
+    pkg_name: str
+    version: str | None
+
+    def __init__(self, line: str, *, is_pkg_deps: bool = False) -> None:
+        self.line = line
+        self.is_pkg_deps = is_pkg_deps
+        self.cond = next((cond for cond in self.CONDITIONS if cond in line), None)
+        if self.cond:
+            self.pkg_name, self.version = line.split(self.cond, 1)
+        else:
+            self.pkg_name, self.version = line, None
+
+    @classmethod
+    def parse(cls, line: str, *, is_pkg_deps: bool = False) -> "DepSpec":
+        key = (line, is_pkg_deps)
+        dep_spec = cls._cache.get(key)
+        if dep_spec is None:
+            dep_spec = cls._cache[key] = cls(line, is_pkg_deps=is_pkg_deps)
+        return dep_spec
+
+    def match(
+            self, version: str, vercmp: "Callable[[str, str], int]" = compare_versions,
+    ) -> bool:
+        """Check if `version` satisfies the spec, using given `vercmp` function."""
+        if not (self.cond and self.version):
+            return True
+        if self.is_pkg_deps and ("=" in self.cond):
+            common_version, _ = get_common_version(version, self.version)
+            if common_version == self.version:
+                return True
+        result = vercmp(version, self.version)
+        if result < 0:
+            return "<" in self.cond
+        if result > 0:
+            return ">" in self.cond
+        return "=" in self.cond
+
+    def __call__(self, version: str) -> bool:
+        return self.match(version)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.line}>"
+
+
+def match_versions(
+        dep_specs: "Sequence[DepSpec]", versions: "Sequence[str]",
+) -> list[list[bool]]:
+    """
+    Match each of `versions` against each of `dep_specs`,
+    returns `result[spec_idx][version_idx]`.
+    Each distinct pair of versions gets compared only once.
+    """
+    vercmp = cache(compare_versions)
+    return [
+        [dep_spec.match(version, vercmp) for version in versions]
+        for dep_spec in dep_specs
+    ]
+
+
 class VersionMatcher:
     """
     Represents version string as stated in dependencies (e.g. `>=1.23`).
     And can match that pattern against some version.
     """
 
-    version: str | None = None
-    version_matchers: "list[Callable[[str], int]]"
+    __slots__ = ("line", "pkg_name", "version", "version_matchers")
+
+    version: str | None
+    version_matchers: list[DepSpec]
     line: str
     pkg_name: str
 
@@ -46,8 +123,26 @@ class VersionMatcher:
         )
 
     def __init__(self, depend_line: str, *, is_pkg_deps: bool = False) -> None:
+        dep_spec = DepSpec.parse(depend_line, is_pkg_deps=is_pkg_deps)
         self.line = depend_line
-        self._set_version_matcher_func(is_pkg_deps=is_pkg_deps)
+        self.pkg_name = dep_spec.pkg_name
+        self.version = dep_spec.version
+        self.version_matchers = [dep_spec]
+
+    def match_many(self, versions: "Sequence[str | None]") -> list[bool]:
+        """Same as calling `VersionMatcher` for each of `versions`, but in one batch."""
+        versions_to_match = list({version: None for version in versions if version})
+        matched = dict(zip(
+            versions_to_match,
+            (
+                all(column)
+                for column in zip(
+                    *match_versions(self.version_matchers, versions_to_match), strict=True,
+                )
+            ),
+            strict=True,
+        )) if versions_to_match else {}
+        return [matched[version] if version else True for version in versions]
 
     def add_version_matcher(self, version_matcher: "VersionMatcher") -> None:
         """
@@ -64,76 +159,10 @@ class VersionMatcher:
         elif version_matcher.version:
             self.version += "," + version_matcher.version
 
-    def _set_version_matcher_func(
-            self, *, is_pkg_deps: bool = False,
-    ) -> None:
-        # pylint: disable=invalid-name
-
-        version: str | None = None
-
-        def get_version() -> str | None:
-            return version
-
-        def cmp_lt(v: str) -> int:
-            self_version = get_version()
-            if not self_version:
-                return cmp_default(v)
-            return compare_versions(v, self_version) < 0
-
-        def cmp_gt(v: str) -> int:
-            self_version = get_version()
-            if not self_version:
-                return cmp_default(v)
-            return compare_versions(v, self_version) > 0
-
-        def cmp_eq(v: str) -> int:
-            self_version = get_version()
-            if not self_version:
-                return cmp_default(v)
-            if is_pkg_deps:
-                common_version, _ = get_common_version(v, self_version)
-                if common_version == self_version:
-                    return True
-            return compare_versions(v, self_version) == 0
-
-        def cmp_le(v: str) -> int:
-            return cmp_eq(v) or cmp_lt(v)
-
-        def cmp_ge(v: str) -> int:
-            return cmp_eq(v) or cmp_gt(v)
-
-        def cmp_default(v: str) -> int:  # noqa: ARG001  # pylint: disable=unused-argument
-            return 1
-
-        cond: str | None = None
-        version_matcher = cmp_default
-        for test_cond, matcher in (
-                (">=", cmp_ge),
-                ("<=", cmp_le),
-                ("=", cmp_eq),
-                (">", cmp_gt),
-                ("<", cmp_lt),
-        ):
-            if test_cond in self.line:
-                cond = test_cond
-                version_matcher = matcher
-                break
-
-        if cond:
-            splitted_line = self.line.split(cond)
-            pkg_name = splitted_line[0]
-            version = cond.join(splitted_line[1:])
-        else:
-            pkg_name = self.line
-
-        self.pkg_name = pkg_name
-        self.version = version
-        self.version_matchers = [version_matcher]
-
     def __repr__(self) -> str:
         return (
             f"<{self.__class__.__name__} "
-            f"{self.pkg_name}{[m.__name__ for m in self.version_matchers]}{self.version}>"
+            f"{self.pkg_name}{[m.cond for m in self.version_matchers]}{self.version}>"
         )
 
 
@@ -1,8 +1,11 @@
 # pylint: disable=invalid-name,too-many-branches,too-many-statements  # noqa: INP001
 import asyncio
+import hashlib
+import marshal
 import os
 import sys
 from collections.abc import Callable, Coroutine, Iterable, Sequence
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Final, TypedDict, cast
 
 if TYPE_CHECKING:
@@ -228,6 +231,9 @@ CLI_TO_DB_TRANSLATION: Final[dict[str, str]] = {
 }
 
 
+PARSED_CLI_DB_CACHE_VERSION: Final = 1
+
+
 class DBPlaceholder:  # noqa: B903
 
     def __init__(self, name: str) -> None:
@@ -240,6 +246,8 @@ def get_pacman_cli_package_db(  # noqa: C901
         PACMAN_DICT_FIELDS: Sequence[str],  # noqa: N803
         PACMAN_LIST_FIELDS: Sequence[str],  # noqa: N803
         PACMAN_INT_FIELDS: Sequence[str],  # noqa: N803
+        PACMAN_DB_PATH: str,  # noqa: N803
+        PARSED_DB_CACHE_DIR: Path,  # noqa: N803
 ) -> "type[PackageDBCommonType]":
 
     class CliPackageInfo(PacmanPackageInfo):  # type: ignore[valid-type,misc]
@@ -261,77 +269,115 @@ def get_pacman_cli_package_db(  # noqa: C901
         def parse_pacman_cli_info(
                 cls, lines: list[str], db_type: str,
         ) -> Iterable["CliPackageInfo"]:
-            pkg = cls()
-            field: str | None
-            value: str | list[str] | dict[str, str | None] | None
-            field = value = None
+            parser = CliPackageInfoParser(db_type=db_type)
             for line in lines:
-                if line == "":  # noqa: PLC1901
-                    if db_type == "local":
-                        pkg.db = DBPlaceholder(name="local")
-                    else:
-                        pkg.db = DBPlaceholder(name=pkg.repository)
-                        del pkg.repository
-                    pkg.reason = "dependency" in (cast("str", pkg.reason) or "").lower()
+                if pkg := parser.feed(line):
                     yield pkg
-                    pkg = cls()
-                    continue
-                if not line.startswith(" "):
-                    try:
-                        parsed_field, parsed_value, *parsed_args = line.split(": ")
-                    except ValueError:
-                        print(line)
-                        print(field, value)
-                        raise
-                    parsed_value = parsed_value.lstrip(" \t")
-                    field = parsed_field.rstrip().replace(" ", "_").lower()
-                    field = CLI_TO_DB_TRANSLATION.get(field, field)
-                    if parsed_value == "None":
-                        value = None
+
+    class CliPackageInfoParser:
+        """
+        Incremental parser of `pacman -Qi`/`-Si` output:
+        returns each package as soon as the blank line ending its block is fed.
+        """
+
+        db_type: str
+        pkg: CliPackageInfo
+        field: str | None
+        value: str | list[str] | dict[str, str | None] | None
+
+        def __init__(self, db_type: str) -> None:
+            self.db_type = db_type
+            self.pkg = CliPackageInfo()
+            self.field = self.value = None
+
+        def feed(self, line: str) -> CliPackageInfo | None:
+            field = self.field
+            value = self.value
+            pkg = self.pkg
+            if line == "":  # noqa: PLC1901
+                if self.db_type == "local":
+                    pkg.db = DBPlaceholder(name="local")
+                else:
+                    pkg.db = DBPlaceholder(name=pkg.repository)
+                    del pkg.repository
+                pkg.reason = "dependency" in (cast("str", pkg.reason) or "").lower()
+                self.pkg = CliPackageInfo()
+                self.field = self.value = None
+                return pkg
+            if not line.startswith(" "):
+                try:
+                    parsed_field, parsed_value, *parsed_args = line.split(": ")
+                except ValueError:
+                    print(line)
+                    print(self.field, self.value)
+                    raise
+                parsed_value = parsed_value.lstrip(" \t")
+                field = parsed_field.rstrip().replace(" ", "_").lower()
+                field = CLI_TO_DB_TRANSLATION.get(field, field)
+                if parsed_value == "None":
+                    value = None
+                else:
+                    if field in PACMAN_DICT_FIELDS:
+                        value = {parsed_value: None}
+                    elif field in PACMAN_LIST_FIELDS:
+                        value = parsed_value.split()
                     else:
+                        value = parsed_value
+                    if parsed_args:
                         if field in PACMAN_DICT_FIELDS:
-                            value = {parsed_value: None}
-                        elif field in PACMAN_LIST_FIELDS:
-                            value = parsed_value.split()
+                            value = {parsed_value: parsed_args[0].lstrip()}
                         else:
-                            value = parsed_value
-                        if parsed_args:
-                            if field in PACMAN_DICT_FIELDS:
-                                value = {parsed_value: parsed_args[0].lstrip()}
-                            else:
-                                value = ": ".join([parsed_value, *parsed_args])
-                                if field in PACMAN_LIST_FIELDS:
-                                    value = value.split()
-                elif field in PACMAN_DICT_FIELDS:
-                    parsed_value, *parsed_args = line.split(": ")
-                    parsed_value = parsed_value.lstrip(" \t")
-                    # pylint: disable=unsupported-assignment-operation
-                    value[parsed_value] = (  # type: ignore[index,call-overload]
-                        parsed_args[0]
-                        if parsed_args
-                        else None
-                    )
-                elif field in PACMAN_LIST_FIELDS:
-                    value += line.split()  # type: ignore[operator]
-                else:
-                    value += line  # type: ignore[operator]
-
-                if (
-                        field
-                        and (
-                            value
-                            or not (
-                                (field in PACMAN_DICT_FIELDS)
-                                or (field in PACMAN_INT_FIELDS)
-                                or (field in PACMAN_LIST_FIELDS)
-                            )
+                            value = ": ".join([parsed_value, *parsed_args])
+                            if field in PACMAN_LIST_FIELDS:
+                                value = value.split()
+            elif field in PACMAN_DICT_FIELDS:
+                parsed_value, *parsed_args = line.split(": ")
+                parsed_value = parsed_value.lstrip(" \t")
+                # pylint: disable=unsupported-assignment-operation
+                value[parsed_value] = (  # type: ignore[index,call-overload]
+                    parsed_args[0]
+                    if parsed_args
+                    else None
+                )
+            elif field in PACMAN_LIST_FIELDS:
+                value += line.split()  # type: ignore[operator]
+            else:
+                value += line  # type: ignore[operator]
+
+            if (
+                    field
+                    and (
+                        value
+                        or not (
+                            (field in PACMAN_DICT_FIELDS)
+                            or (field in PACMAN_INT_FIELDS)
+                            or (field in PACMAN_LIST_FIELDS)
                         )
-                ):
-                    try:
-                        setattr(pkg, field, value)
-                    except TypeError:
-                        print(line)
-                        raise
+                    )
+            ):
+                try:
+                    setattr(pkg, field, value)
+                except TypeError:
+                    print(line)
+                    raise
+            self.field = field
+            self.value = value
+            return None
+
+    class PacmanInfoTaskWorker(PacmanTaskWorker):
+        """Parse pacman output while it's streamed instead of buffering all the lines."""
+
+        parser: CliPackageInfoParser
+        packages: list[CliPackageInfo]
+
+        def __init__(self, args: list[str], db_type: str) -> None:
+            super().__init__(args)
+            self.parser = CliPackageInfoParser(db_type=db_type)
+            self.packages = []
+
+        def save_out(self, line: bytes) -> None:
+            if pkg := self.parser.feed(line.rstrip(b"\n").decode("utf-8")):
+                self.packages.append(pkg)
 
     class MergedDBCache(TypedDict):
         local: list[CliPackageInfo]
@@ -351,27 +397,103 @@ def get_pacman_cli_package_db(  # noqa: C901
                 handle: "Handle | None" = None,  # pylint: disable=unused-argument  # noqa: ARG003,E501,RUF100
         ) -> MergedDBCache:
             if not cls._repo_cache:
-                print(" >>> Retrieving local pacman database...")
-                results = MultipleTasksExecutor({
-                    cls.repo: PacmanTaskWorker(["-Si"]),
-                    cls.local: PacmanTaskWorker(["-Qi"]),
-                }).execute()
-                repo_stdouts = results[cls.repo].stdouts
-                if not repo_stdouts:
-                    msg = "no repo stdout"
-                    raise RuntimeError(msg)
-                local_stdouts = results[cls.local].stdouts
-                if not local_stdouts:
-                    msg = "no local stdout"
-                    raise RuntimeError(msg)
-                cls._repo_cache = list(CliPackageInfo.parse_pacman_cli_info(
-                    repo_stdouts, db_type="repo",
-                ))
-                cls._local_cache = list(CliPackageInfo.parse_pacman_cli_info(
-                    local_stdouts, db_type="local",
-                ))
+                cache_key = cls._get_dbs_cache_key()
+                dbs = cls._load_dbs_cache(cache_key)
+                if dbs is None:
+                    dbs = cls._get_dbs_from_pacman()
+                    cls._save_dbs_cache(cache_key, dbs)
+                cls._repo_cache = dbs["repo"]
+                cls._local_cache = dbs["local"]
             return {"repo": cls._repo_cache, "local": cls._local_cache}
 
+        @classmethod
+        def _get_dbs_from_pacman(cls) -> MergedDBCache:
+            print(" >>> Retrieving local pacman database...")
+            workers = {
+                cls.repo: PacmanInfoTaskWorker(["-Si"], db_type="repo"),
+                cls.local: PacmanInfoTaskWorker(["-Qi"], db_type="local"),
+            }
+            MultipleTasksExecutor(cast("dict[str, CmdTaskWorker]", workers)).execute()
+            if not workers[cls.repo].packages:
+                msg = "no repo stdout"
+                raise RuntimeError(msg)
+            if not workers[cls.local].packages:
+                msg = "no local stdout"
+                raise RuntimeError(msg)
+            return {"repo": workers[cls.repo].packages, "local": workers[cls.local].packages}
+
+        @classmethod
+        def _get_dbs_cache_key(cls) -> str:
+            """Hash of mtimes of sync DBs and of local packages' descriptions."""
+            key = hashlib.sha256()
+            db_path = Path(PACMAN_DB_PATH)
+            for pattern in ("sync/*.db", "local/*/desc"):
+                for path in sorted(db_path.glob(pattern)):
+                    stat = path.stat()
+                    key.update(
+                        f"{path.relative_to(db_path)}:{stat.st_mtime_ns}:{stat.st_size}\n".encode(),
+                    )
+            return key.hexdigest()
+
+        @classmethod
+        def _get_dbs_cache_path(cls) -> Path:
+            return PARSED_DB_CACHE_DIR / "pacman_cli.marshal"
+
+        @classmethod
+        def _load_dbs_cache(cls, cache_key: str) -> MergedDBCache | None:
+            try:
+                version, key, parsed_dbs = marshal.loads(  # noqa: S302
+                    cls._get_dbs_cache_path().read_bytes(),
+                )
+            except (OSError, ValueError, EOFError, TypeError) as exc:
+                if VERBOSE:
+                    print(f" ---- can't load parsed pacman output: {exc}")
+                return None
+            if (version != PARSED_CLI_DB_CACHE_VERSION) or (key != cache_key):
+                return None
+            return {
+                "repo": cls._load_pkgs(parsed_dbs["repo"]),
+                "local": cls._load_pkgs(parsed_dbs["local"]),
+            }
+
+        @classmethod
+        def _load_pkgs(cls, parsed_pkgs: list[tuple[str, dict[str, Any]]]) -> list[CliPackageInfo]:
+            result = []
+            for db_name, fields in parsed_pkgs:
+                pkg = CliPackageInfo.__new__(CliPackageInfo)
+                pkg.__dict__.update(fields)
+                pkg.db = DBPlaceholder(name=db_name)
+                result.append(pkg)
+            return result
+
+        @classmethod
+        def _dump_pkgs(cls, pkgs: list[CliPackageInfo]) -> list[tuple[str, dict[str, Any]]]:
+            return [
+                (
+                    pkg.db.name,
+                    {field: value for field, value in vars(pkg).items() if field != "db"},
+                )
+                for pkg in pkgs
+            ]
+
+        @classmethod
+        def _save_dbs_cache(cls, cache_key: str, dbs: MergedDBCache) -> None:
+            parsed_dbs = {
+                "repo": cls._dump_pkgs(dbs["repo"]),
+                "local": cls._dump_pkgs(dbs["local"]),
+            }
+            cache_path = cls._get_dbs_cache_path()
+            tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_bytes(
+                    marshal.dumps((PARSED_CLI_DB_CACHE_VERSION, cache_key, parsed_dbs)),
+                )
+                tmp_path.replace(cache_path)
+            except OSError as exc:
+                if VERBOSE:
+                    print(f" ---- can't save parsed pacman output: {exc}")
+
         @classmethod
         def get_repo_list(
                 cls,
@@ -20,6 +20,13 @@ def version() -> str:
     return "-pypy-0.0.1"
 
 
+class PyalpmError(Exception):
+    pass
+
+
+error = PyalpmError  # nonfinal-ignore
+
+
 class Handle(pypyalpm.Handle):
 
     # def __init__(self, root_dir: str, db_path: str) -> None:
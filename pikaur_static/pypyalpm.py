@@ -4,7 +4,10 @@ Pure-python alpm implementation backported from Pikaur v0.6
 with compatibility layer added for easier integration with pyalpm interface.
 """
 import abc
-import multiprocessing
+import hashlib
+import marshal
+import mmap
+import multiprocessing.pool
 import os
 import re
 import sys
@@ -38,6 +41,11 @@ SUPPORTED_ALPM_VERSION: Final = "9"
 
 PACMAN_DB_PATH: Final = "/var/lib/pacman"
 
+PARSED_DB_CACHE_VERSION: Final = 1
+PARSED_DB_CACHE_DIR: Final = Path(
+    os.environ.get("XDG_CACHE_HOME") or Path("~/.cache").expanduser(),
+) / "pikaur" / "pypyalpm"
+
 
 def debug(*args: Any) -> None:
     if VERBOSE:
@@ -87,6 +95,13 @@ class DB:
             if query in pkg_name
         ]
 
+    @property
+    def pkgcache(self) -> list["Package"]:
+        return [
+            pkg for pkg in self.search("")
+            if pkg.db.name == self.name
+        ]
+
     def get_pkg(self, name: str) -> "Package | None":
         if self.name == DB_NAME_LOCAL:
             return PackageDB.get_local_pkg_uncached(name, handle=self.handle)
@@ -125,7 +140,7 @@ class Package:
     # { "files",  (getter)pyalpm_package_get_files, 0, "list of installed files", NULL } ,
     # { "backup", (getter)_get_list_attribute, 0, "list of tuples (filename, md5sum)", &get_backup } ,  # noqa: E501,RUF100
     # { "deltas", (getter)_get_list_attribute, 0, "list of available deltas", &get_deltas } ,
-    validation: str | None = None
+    validation: str | None
 
     # /* dependency information */
     depends: list[str]
@@ -140,27 +155,22 @@ class Package:
     size: int
     isize: int
 
-    def compute_requiredby(self) -> list[str]:
-        return sorted([
-            pkg.name
-            for pkg in PackageDB.get_local_list(handle=self.db.handle)
+    def _compute_dependants(self, field: str) -> list[str]:
+        reverse_deps = PackageDB.get_local_reverse_deps(field, handle=self.db.handle)
+        return sorted({
+            dependant
             for name in [
                 self.name,
                 *(get_package_name_from_depend_line(line) for line in self.provides),
             ]
-            if name in [get_package_name_from_depend_line(line) for line in pkg.depends]
-        ])
+            for dependant in reverse_deps.get(name, ())
+        })
+
+    def compute_requiredby(self) -> list[str]:
+        return self._compute_dependants("depends")
 
     def compute_optionalfor(self) -> list[str]:
-        return sorted([
-            pkg.name
-            for pkg in PackageDB.get_local_list(handle=self.db.handle)
-            for name in [
-                self.name,
-                *(get_package_name_from_depend_line(line) for line in self.provides),
-            ]
-            if name in [get_package_name_from_depend_line(line) for line in pkg.optdepends]
-        ])
+        return self._compute_dependants("optdepends")
 
     def __init__(self) -> None:
         for field in DB_INFO_TRANSLATION.values():
@@ -237,8 +247,25 @@ DB_INFO_TRANSLATION: Final = {
 }
 
 
+LOCAL_DB_EAGER_SECTIONS: Final = frozenset((
+    "%NAME%",
+    "%VERSION%",
+    "%PROVIDES%",
+    "%DEPENDS%",
+    "%OPTDEPENDS%",
+    "%CONFLICTS%",
+    "%REPLACES%",
+    "%GROUPS%",
+    "%REASON%",
+))
+LOCAL_DB_LAZY_FIELDS: Final = frozenset(
+    DB_INFO_TRANSLATION[section]
+    for section in set(DB_INFO_TRANSLATION) - LOCAL_DB_EAGER_SECTIONS
+)
+
+
 class PacmanPackageInfo(Package):
-    data = None
+    data: str | None
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__} "{self.name}">'
@@ -251,14 +278,18 @@ class PacmanPackageInfo(Package):
     def _parse_pacman_db_info(  # pylint: disable=too-many-branches  # noqa: C901,E501,RUF100
         cls,
         db_file: IO[bytes],
+        sections: frozenset[str] | None = None,
     ) -> "Iterable[PacmanPackageInfo]":
 
         pkg = cls()
         value: str | list[str] | dict[str, str | None] | int | None
         line = field = real_field = value = None
+        skip_section = False
 
         # while line != "":  # noqa: PLC1901,RUF100
         for line_b in db_file.readlines():
+            if skip_section and not line_b.startswith(b"%"):
+                continue
             # line = db_file.readline().strip().decode("utf-8")
             line = line_b.strip().decode("utf-8")
             if line.startswith("%"):
@@ -267,6 +298,11 @@ class PacmanPackageInfo(Package):
                 if real_field:
                     setattr(pkg, real_field, value)
 
+                skip_section = (sections is not None) and (line not in sections)
+                if skip_section:
+                    real_field = None
+                    continue
+
                 field = line
                 real_field = DB_INFO_TRANSLATION.get(field)
                 if not real_field:
@@ -303,9 +339,10 @@ class PacmanPackageInfo(Package):
                 else:
                     value = cast("str", value) + parsed_value
 
-        if not real_field:
+        if real_field:
+            setattr(pkg, real_field, value)
+        elif not skip_section:
             raise RuntimeError(field)
-        setattr(pkg, real_field, value)
 
         yield pkg
 
@@ -317,13 +354,55 @@ class PacmanPackageInfo(Package):
                     yield from cls._parse_pacman_db_info(extracted)
 
     @classmethod
-    def parse_pacman_db_info(cls, file_name: str) -> "Iterable[PacmanPackageInfo]":
+    def parse_pacman_db_info(
+            cls, file_name: str, sections: frozenset[str] | None = None,
+    ) -> "Iterable[PacmanPackageInfo]":
         with open(file_name, "rb") as fobj:  # noqa: PTH123
-            yield from cls._parse_pacman_db_info(fobj)
+            yield from cls._parse_pacman_db_info(fobj, sections=sections)
+
+
+class LocalPackageInfo(PacmanPackageInfo):
+    """
+    Local DB package with only `LOCAL_DB_EAGER_SECTIONS` parsed up front,
+    the rest of `desc` is decoded on the first access to any other field.
+    """
+
+    desc_path: str
+
+    def __init__(self) -> None:  # pylint: disable=super-init-not-called
+        for section in LOCAL_DB_EAGER_SECTIONS:
+            field = DB_INFO_TRANSLATION[section]
+            if field in PACMAN_LIST_FIELDS:
+                setattr(self, field, [])
+            elif field in PACMAN_DICT_FIELDS:
+                setattr(self, field, {})
+            elif field in PACMAN_INT_FIELDS:
+                setattr(self, field, 0)
+            else:
+                setattr(self, field, None)
+
+    def _decode_lazy_fields(self) -> None:
+        if "desc_path" not in self.__dict__:
+            return
+        for pkg in PacmanPackageInfo.parse_pacman_db_info(self.desc_path):
+            for field, value in vars(pkg).items():
+                self.__dict__.setdefault(field, value)
+        del self.__dict__["desc_path"]
+
+    def __getattr__(self, name: str) -> Any:
+        if (name not in LOCAL_DB_LAZY_FIELDS) or ("desc_path" not in self.__dict__):
+            raise AttributeError(name)
+        self._decode_lazy_fields()
+        return self.__dict__[name]
+
+    @property
+    def all(self) -> str:
+        self._decode_lazy_fields()
+        return super().all
 
 
 def get_package_name_from_depend_line(depend_line: str) -> str:
-    return depend_line.split("=", maxsplit=1)[0]
+    return re.split(r"[<>=:]", depend_line, maxsplit=1)[0].strip()
 
 
 def get_pkg_id(pkg: Package) -> str:
@@ -338,6 +417,7 @@ class PackageDBCommon(abc.ABC):
     _local_dict_cache: dict[str, PacmanPackageInfo] | None = None
     _repo_provided_cache: list[str] | None = None
     _local_provided_cache: list[str] | None = None
+    _local_reverse_deps_cache: dict[str, dict[str, set[str]]] | None = None
 
     repo = "repo"
     local = "local"
@@ -401,6 +481,25 @@ class PackageDBCommon(abc.ABC):
             }
         return cls._local_dict_cache
 
+    @classmethod
+    def get_local_reverse_deps(
+            cls,
+            field: str,
+            handle: Handle | None = None,
+    ) -> dict[str, set[str]]:
+        """Names of local packages by the names in their `depends` or `optdepends`."""
+        if cls._local_reverse_deps_cache is None:
+            cls._local_reverse_deps_cache = {}
+        if field not in cls._local_reverse_deps_cache:
+            reverse_deps: dict[str, set[str]] = {}
+            for pkg in cls.get_local_list(handle=handle):
+                for line in getattr(pkg, field):
+                    reverse_deps.setdefault(
+                        get_package_name_from_depend_line(line), set(),
+                    ).add(pkg.name)
+            cls._local_reverse_deps_cache[field] = reverse_deps
+        return cls._local_reverse_deps_cache[field]
+
 
 class PackageDB_ALPM9(PackageDBCommon):  # pylint: disable=invalid-name  # noqa: N801
 
@@ -421,15 +520,70 @@ class PackageDB_ALPM9(PackageDBCommon):  # pylint: disable=invalid-name  # noqa:
         return cls._repo_db_names
 
     @classmethod
-    def _get_repo_dict_for_repo(cls, sync_dir: str, repo_name: str) -> dict[str, PacmanPackageInfo]:
+    def _get_parsed_db_cache_path(cls, repo_path: str) -> Path:
+        path_hash = hashlib.sha256(repo_path.encode("utf-8")).hexdigest()[:16]
+        return PARSED_DB_CACHE_DIR / f"{Path(repo_path).stem}-{path_hash}.marshal"
+
+    @classmethod
+    def _get_parsed_db_cache_key(cls, repo_path: str) -> tuple[int, int]:
+        stat = os.stat(repo_path)  # noqa: PTH116
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def _load_parsed_db(cls, repo_path: str) -> list[dict[str, Any]] | None:
+        """Memory-map previously parsed DB if it's still up to date."""
+        try:
+            with (
+                    cls._get_parsed_db_cache_path(repo_path).open("rb") as fobj,
+                    mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            ):
+                version, key, pkgs_fields = marshal.loads(mapped)  # noqa: S302
+        except (OSError, ValueError, EOFError, TypeError) as exc:
+            debug(f" ---- can't load parsed {repo_path}: {exc}")
+            return None
+        if (
+                version != PARSED_DB_CACHE_VERSION
+        ) or (
+            tuple(key) != cls._get_parsed_db_cache_key(repo_path)
+        ):
+            return None
+        return cast("list[dict[str, Any]]", pkgs_fields)
+
+    @classmethod
+    def _parse_repo(cls, repo_path: str) -> bytes:
+        """
+        Parse sync DB (in a worker process), save the result to the cache
+        and return it in the same compact marshal representation.
+        """
+        debug(f" -------<<- {os.getpid()} {repo_path}")
+        key = cls._get_parsed_db_cache_key(repo_path)
+        pkgs_fields = [
+            {field: value for field, value in vars(pkg).items() if field != "db"}
+            for pkg in PacmanPackageInfo.parse_pacman_db_gzip_info(repo_path)
+        ]
+        parsed_db = marshal.dumps((PARSED_DB_CACHE_VERSION, key, pkgs_fields))
+        cache_path = cls._get_parsed_db_cache_path(repo_path)
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(parsed_db)
+            tmp_path.replace(cache_path)
+        except OSError as exc:
+            debug(f" ---- can't save parsed {repo_path}: {exc}")
+        debug(f" ------->>- {os.getpid()} {repo_path}")
+        return parsed_db
+
+    @classmethod
+    def _get_repo_dict_for_repo(
+            cls, repo_name: str, pkgs_fields: list[dict[str, Any]],
+    ) -> dict[str, PacmanPackageInfo]:
         result = {}
-        debug(f" -------<<- {os.getpid()} {repo_name}")
-        repo_path = os.path.join(sync_dir, f"{repo_name}.db")
         db = DB(name=repo_name)
-        for pkg in PacmanPackageInfo.parse_pacman_db_gzip_info(repo_path):
+        for fields in pkgs_fields:
+            pkg = PacmanPackageInfo.__new__(PacmanPackageInfo)
+            pkg.__dict__.update(fields)
             pkg.db = db
             result[get_pkg_id(pkg)] = pkg
-        debug(f" ------->>- {os.getpid()} {repo_name}")
         return result
 
     @classmethod
@@ -439,17 +593,32 @@ class PackageDB_ALPM9(PackageDBCommon):  # pylint: disable=invalid-name  # noqa:
 
             handle = handle or DefaultHandle.get()
             sync_dir = f"{handle.db_path}/sync/"
-            result = {}
-            with multiprocessing.pool.Pool() as pool:
-                jobs = [
-                    pool.apply_async(cls._get_repo_dict_for_repo, (sync_dir, repo_name))
-                    for repo_name in cls.get_db_names()
-                ]
-                pool.close()
-                for job in jobs:
-                    result.update(job.get())
-                pool.join()
+            repo_paths = {
+                repo_name: os.path.join(sync_dir, f"{repo_name}.db")
+                for repo_name in cls.get_db_names(handle)
+            }
+            parsed_dbs: dict[str, list[dict[str, Any]] | None] = {
+                repo_name: cls._load_parsed_db(repo_path)
+                for repo_name, repo_path in repo_paths.items()
+            }
+            if repos_to_parse := [
+                    repo_name for repo_name, pkgs_fields in parsed_dbs.items()
+                    if pkgs_fields is None
+            ]:
+                num_workers = min(len(repos_to_parse), os.cpu_count() or 1)
+                with multiprocessing.pool.Pool(num_workers) as pool:
+                    jobs = {
+                        repo_name: pool.apply_async(cls._parse_repo, (repo_paths[repo_name], ))
+                        for repo_name in repos_to_parse
+                    }
+                    pool.close()
+                    for repo_name, job in jobs.items():
+                        parsed_dbs[repo_name] = marshal.loads(job.get())[2]  # noqa: S302
+                    pool.join()
 
+            result = {}
+            for repo_name, pkgs_fields in parsed_dbs.items():
+                result.update(cls._get_repo_dict_for_repo(repo_name, pkgs_fields or []))
             cls._repo_dict_cache = result
             debug(f" >>>>>>>>>> {os.getpid()} REPO_DONE")
         return cls._repo_dict_cache
@@ -459,17 +628,21 @@ class PackageDB_ALPM9(PackageDBCommon):  # pylint: disable=invalid-name  # noqa:
             cls, name: str, handle: Handle | None = None,
     ) -> PacmanPackageInfo | None:
         handle = handle or DefaultHandle.get()
-        local_path = Path(f"{handle.db_path}/local/")
-        for dir_path in local_path.iterdir():
-            if name == dir_path.name.rsplit("-", maxsplit=2)[0]:
-                result = list(PacmanPackageInfo.parse_pacman_db_info(
-                    (dir_path / "desc").as_posix(),
-                ))
-                if result:
-                    db = DB(name=DB_NAME_LOCAL)
-                    pkg = result[0]
-                    pkg.db = db
-                    return pkg
+        with os.scandir(f"{handle.db_path}/local/") as entries:
+            for entry in entries:
+                if entry.is_dir() and name == entry.name.rsplit("-", maxsplit=2)[0]:
+                    return cls._get_local_pkg(entry.path)
+        return None
+
+    @classmethod
+    def _get_local_pkg(cls, pkg_dir_path: str) -> PacmanPackageInfo | None:
+        desc_path = f"{pkg_dir_path}/desc"
+        for pkg in LocalPackageInfo.parse_pacman_db_info(
+                desc_path, sections=LOCAL_DB_EAGER_SECTIONS,
+        ):
+            cast("LocalPackageInfo", pkg).desc_path = desc_path
+            pkg.db = DB(name=DB_NAME_LOCAL)
+            return pkg
         return None
 
     @classmethod
@@ -480,16 +653,13 @@ class PackageDB_ALPM9(PackageDBCommon):  # pylint: disable=invalid-name  # noqa:
             handle = handle or DefaultHandle.get()
             result: dict[str, PacmanPackageInfo] = {}
             db = DB(name=DB_NAME_LOCAL)
-            local_path = Path(f"{handle.db_path}/local/")
-            for pkg_dir_path in local_path.iterdir():
-                if not pkg_dir_path.is_dir():
-                    continue
-
-                for pkg in PacmanPackageInfo.parse_pacman_db_info(
-                        (pkg_dir_path / "desc").as_posix(),
-                ):
-                    pkg.db = db
-                    result[pkg.name] = pkg
+            with os.scandir(f"{handle.db_path}/local/") as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+                    if pkg := cls._get_local_pkg(entry.path):
+                        pkg.db = db
+                        result[pkg.name] = pkg
 
             cls._local_dict_cache = result
             debug(" >>>>>>>>>> LOCAL_DONE")
@@ -532,6 +702,8 @@ else:
         PACMAN_DICT_FIELDS=PACMAN_DICT_FIELDS,
         PACMAN_LIST_FIELDS=PACMAN_LIST_FIELDS,
         PACMAN_INT_FIELDS=PACMAN_INT_FIELDS,
+        PACMAN_DB_PATH=PACMAN_DB_PATH,
+        PARSED_DB_CACHE_DIR=PARSED_DB_CACHE_DIR,
     )
 
 
@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING, Self
 from unittest import TestCase, mock
 from unittest.runner import TextTestResult
 
+import pyalpm
 from pycman.config import PacmanConfig
 
 from pikaur.args import CachedArgs, parse_args
@@ -177,6 +178,17 @@ class InterceptSysOutput:
         self.__exit__()
 
 
+def make_package_mock(name: str, **fields: "Any") -> mock.Mock:
+    """`pyalpm.Package` mock, list fields which are not given are empty."""
+    pkg = mock.Mock(spec=pyalpm.Package, **{
+        "provides": [], "depends": [], "conflicts": [], "replaces": [], "groups": [],
+        **fields,
+    })
+    # `name` is an argument of `mock.Mock()` itself:
+    pkg.name = name
+    return pkg
+
+
 def reset_cached_pikaur_args(new_args: list[str]) -> None:
     # re-parse args:
     CachedArgs.args = None
@@ -301,6 +313,18 @@ class PikaurTestCase(TestCase):
         log_stderr(self.separator)
         reset_cached_pikaur_args([])
 
+    def make_tmp_path(self) -> Path:
+        """Temporary dir which is removed after the test."""
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        return Path(tmp_dir.name)
+
+    def start_patchers(self, *patchers: "mock._patch[Any]") -> None:
+        """Same as `InterceptSysOutput.patchers`, but active until the end of the test."""
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def assertInstalled(self, pkg_name: str) -> None:  # noqa: N802
         if not pkg_is_installed(pkg_name):
             self.fail(f'Package "{pkg_name}" is not installed.')
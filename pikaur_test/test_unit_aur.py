@@ -0,0 +1,229 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+# pylint: disable=protected-access
+
+import asyncio
+import gzip
+import json
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from threading import Thread
+from unittest import mock
+
+from pikaur.aur import (
+    AurClient,
+    AurDiskCache,
+    AurPackageListCache,
+    AurPackageSearchCache,
+    AurProvidedPackageSearchCache,
+    aur_rpc_info,
+    aur_rpc_search,
+    find_aur_packages,
+    find_aur_provided_deps,
+    get_all_aur_names,
+    get_max_pkgs_chunks,
+)
+from pikaur.aur_index import AurOfflineIndex
+from pikaur.exceptions import AURError
+from pikaur.pikatypes import AurBaseUrl, AURPackageInfo
+from pikaur_test.helpers import PikaurTestCase
+
+AUR_RPC_RESULT = {
+    "results": [{
+        "Name": "pikaur-test-pkg",
+        "PackageBase": "pikaur-test-pkg",
+        "Version": "1.0-1",
+        "Description": "test package",
+        "Provides": ["pikaur-test-provided"],
+    }],
+}
+AUR_DUMP = [
+    {**AUR_RPC_RESULT["results"][0], "Provides": ["pikaur-test-provided=1.0"]},
+    {"Name": "pikaur-other-pkg", "PackageBase": "pikaur-other-pkg", "Version": "2.0-1"},
+]
+
+
+class AurDiskCacheTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_path = self.make_tmp_path() / "aur_info.json"
+        self.start_patchers(
+            mock.patch("pikaur.aur.AurInfoCachePath", new=lambda: self.cache_path),
+            mock.patch.object(AurDiskCache, "get_expiration", new=lambda: 600),
+            mock.patch.object(AurDiskCache, "_data", new=None),
+            mock.patch.object(AurPackageSearchCache, "cache", new={}),
+            mock.patch.object(AurProvidedPackageSearchCache, "cache", new={}),
+        )
+
+    def test_find_aur_packages_served_from_disk(self):
+        with mock.patch("pikaur.aur.get_json_from_url", return_value=AUR_RPC_RESULT) as rpc:
+            find_aur_packages(["pikaur-test-pkg"])
+            self.assertEqual(rpc.call_count, 1)
+        AurDiskCache.save()
+        self.assertTrue(self.cache_path.exists())
+
+        AurDiskCache._data = None
+        AurPackageSearchCache.cache = {}
+        with mock.patch("pikaur.aur.get_json_from_url") as rpc:
+            found, not_found = find_aur_packages(["pikaur-test-pkg"])
+            rpc.assert_not_called()
+        self.assertEqual(not_found, [])
+        self.assertEqual(found[0].version, "1.0-1")
+        self.assertEqual(found[0].provides, ["pikaur-test-provided"])
+
+    def test_expired_entries_evicted(self):
+        AurDiskCache.put(AurDiskCache.INFO, "fresh", {"name": "fresh"})
+        AurDiskCache.put(AurDiskCache.INFO, "stale", {"name": "stale"})
+        AurDiskCache._load()[AurDiskCache.INFO]["stale"]["fetched"] -= 601
+        self.assertIsNone(AurDiskCache.get(AurDiskCache.INFO, "stale"))
+        AurDiskCache.save()
+        AurDiskCache._data = None
+        self.assertEqual(list(AurDiskCache._load()[AurDiskCache.INFO].keys()), ["fresh"])
+
+    def reload(self) -> None:
+        AurDiskCache.save()
+        AurDiskCache._data = None
+        AurPackageSearchCache.cache = {}
+        AurProvidedPackageSearchCache.cache = {}
+
+    def test_searched_providers_persisted(self):
+        with mock.patch("pikaur.aur.get_json_from_url", return_value=AUR_RPC_RESULT):
+            find_aur_provided_deps(["pikaur-test-provided"])
+        self.reload()
+        with mock.patch("pikaur.aur.get_json_from_url") as rpc:
+            found, not_found = find_aur_provided_deps(["pikaur-test-provided"])
+            # both the providers and their info are cached:
+            rpc.assert_not_called()
+        self.assertEqual(not_found, [])
+        self.assertEqual([pkg.name for pkg in found], ["pikaur-test-pkg"])
+
+    def test_seen_providers_are_not_authoritative(self):
+        with mock.patch("pikaur.aur.get_json_from_url", return_value=AUR_RPC_RESULT):
+            find_aur_packages(["pikaur-test-pkg"])
+        self.reload()
+        self.assertEqual(
+            AurDiskCache.get(AurDiskCache.PROVIDERS, "pikaur-test-provided"), ["pikaur-test-pkg"],
+        )
+        self.assertIsNone(AurDiskCache.get(AurDiskCache.PROVIDES, "pikaur-test-provided"))
+        with mock.patch("pikaur.aur.get_json_from_url", return_value=AUR_RPC_RESULT) as rpc:
+            find_aur_provided_deps(["pikaur-test-provided"])
+            self.assertTrue(any(
+                "type=search" in call.args[0] for call in rpc.call_args_list
+            ))
+
+
+class AurOfflineIndexTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp_path = self.make_tmp_path()
+        (tmp_path / "packages-meta-ext-v1.json.gz").write_bytes(
+            gzip.compress(json.dumps(AUR_DUMP).encode()),
+        )
+        self.server = HTTPServer(
+            ("127.0.0.1", 0),
+            partial(SimpleHTTPRequestHandler, directory=tmp_path),
+        )
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        index_path = tmp_path / "aur_index.sqlite3"
+        self.start_patchers(
+            mock.patch("pikaur.aur_index.AurIndexPath", new=lambda: index_path),
+            mock.patch("pikaur.urllib_helper.HttpCachePath", new=lambda: index_path.parent),
+            mock.patch.object(AurOfflineIndex, "get_expiration", new=lambda: 600),
+            mock.patch.object(AurOfflineIndex, "_connection", new=None),
+            mock.patch.object(
+                AurBaseUrl, "aur_base_url", new=f"http://127.0.0.1:{self.server.server_port}",
+            ),
+            mock.patch.object(SimpleHTTPRequestHandler, "log_message"),
+            mock.patch.object(AurPackageSearchCache, "cache", new={}),
+            mock.patch.object(AurPackageListCache, "cache", new=[]),
+        )
+        self.addCleanup(self.close_index)
+
+    def close_index(self):
+        if AurOfflineIndex._connection:
+            AurOfflineIndex._connection.close()
+
+    def test_lookups_served_from_index(self):
+        with mock.patch("pikaur.aur.get_json_from_url") as rpc:
+            found, not_found = find_aur_packages(["pikaur-test-pkg", "pikaur-missing-pkg"])
+            self.assertEqual([pkg.name for pkg in found], ["pikaur-test-pkg"])
+            self.assertEqual(not_found, ["pikaur-missing-pkg"])
+            self.assertEqual(
+                [pkg.name for pkg in aur_rpc_search("other")], ["pikaur-other-pkg"],
+            )
+            self.assertEqual(
+                [pkg.name for pkg in aur_rpc_search("test package", search_by="name-desc")],
+                ["pikaur-test-pkg"],
+            )
+            self.assertEqual(
+                [pkg.name for pkg in aur_rpc_search("pikaur-test-provided", search_by="provides")],
+                ["pikaur-test-pkg"],
+            )
+            self.assertEqual(
+                sorted(get_all_aur_names()), ["pikaur-other-pkg", "pikaur-test-pkg"],
+            )
+            rpc.assert_not_called()
+
+
+class AurClientTestCase(PikaurTestCase):
+
+    def test_concurrent_info_requests_coalesced(self):
+        async def get_info_twice() -> tuple[list[AURPackageInfo], list[AURPackageInfo]]:
+            return await asyncio.gather(
+                AurClient._info(["pikaur-test-pkg"], with_progressbar=False),
+                AurClient._info(["pikaur-test-pkg", "pikaur-missing-pkg"], with_progressbar=False),
+            )
+
+        with mock.patch(
+                "pikaur.aur.aur_rpc_info",
+                return_value=[AURPackageInfo.from_json(AUR_RPC_RESULT["results"][0])],
+        ) as rpc:
+            first_result, second_result = AurClient._run(get_info_twice())
+        self.assertEqual(rpc.call_count, 2)
+        self.assertEqual(rpc.call_args_list[0].args, (["pikaur-test-pkg"], ))
+        self.assertEqual(rpc.call_args_list[1].args, (["pikaur-missing-pkg"], ))
+        self.assertEqual([pkg.name for pkg in first_result], ["pikaur-test-pkg"])
+        self.assertEqual([pkg.name for pkg in second_result], ["pikaur-test-pkg"])
+
+    def test_search_errors_returned_per_query(self):
+        def rpc_search(search_query: str, search_by: str) -> list[AURPackageInfo]:
+            if search_query == "a":
+                raise AURError(url="", error="Query arg too small.")
+            return [AURPackageInfo(name=search_query, version="1", packagebase=search_by)]
+
+        with mock.patch("pikaur.aur.aur_rpc_search", side_effect=rpc_search):
+            results = AurClient.search_many(["a", "pikaur"])
+        self.assertIsInstance(results["a"], AURError)
+        self.assertEqual(results["pikaur"], [AURPackageInfo(
+            name="pikaur", version="1", packagebase="name-desc",
+        )])
+
+
+class AurInfoChunksTestCase(PikaurTestCase):
+
+    package_names: tuple[str, ...] = tuple(f"pikaur-test-pkg-{idx}" for idx in range(2000))
+
+    def test_chunks_fit_into_url(self):
+        chunks = get_max_pkgs_chunks(list(self.package_names), post_batch_size=0)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            [pkg_name for chunk in chunks for pkg_name in chunk], list(self.package_names),
+        )
+        with mock.patch("pikaur.aur.get_json_from_url", return_value={"results": []}) as rpc:
+            for chunk in chunks:
+                aur_rpc_info(chunk)
+                self.assertIsNone(rpc.call_args.kwargs["data"])
+
+    def test_post_chunks(self):
+        chunks = get_max_pkgs_chunks(list(self.package_names), post_batch_size=900)
+        self.assertEqual([len(chunk) for chunk in chunks], [900, 900, 200])
+        with mock.patch("pikaur.aur.get_json_from_url", return_value={"results": []}) as rpc:
+            aur_rpc_info(chunks[0])
+        url, data = rpc.call_args.args[0], rpc.call_args.kwargs["data"]
+        self.assertNotIn("?", url)
+        self.assertIn(b"type=info", data)
+        self.assertIn(b"&arg[]=pikaur-test-pkg-899", data)
@@ -0,0 +1,49 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+from unittest import mock
+
+from pikaur import aur_deps
+from pikaur.exceptions import DependencyVersionMismatchError
+from pikaur.pacman import PackageDB
+from pikaur.pikatypes import PackageSource
+from pikaur_test.helpers import PikaurTestCase
+
+
+def mismatch_error(*_args: object) -> DependencyVersionMismatchError:
+    raise DependencyVersionMismatchError(
+        version_found="1.0",
+        dependency_line="pikaur-test-dep>=2",
+        who_depends="pikaur-test-pkg",
+        depends_on="pikaur-test-dep",
+        location=PackageSource.REPO,
+    )
+
+
+class FindAurDepsTestCase(PikaurTestCase):
+
+    def find_aur_deps(self, ignore: list[str]) -> dict[str, list[str]]:
+        aur_pkg = mock.Mock()
+        aur_pkg.name = "pikaur-test-pkg"
+        with (
+                mock.patch.object(
+                    aur_deps, "get_aur_pkg_deps_and_version_matchers",
+                    return_value={"pikaur-test-dep": mock.Mock()},
+                ),
+                mock.patch.object(PackageDB, "prefetch_deps"),
+                mock.patch.object(
+                    aur_deps, "find_not_installed_deps_for_aur_pkg", new=mismatch_error,
+                ),
+                mock.patch.object(aur_deps, "prefetch_aur_deps") as prefetch_aur_deps,
+                mock.patch.object(aur_deps, "parse_args", return_value=mock.Mock(ignore=ignore)),
+        ):
+            result = aur_deps.find_aur_deps([aur_pkg])
+        prefetch_aur_deps.assert_called_once_with([])
+        return result
+
+    def test_ignored_version_mismatch(self):
+        self.assertEqual(self.find_aur_deps(["pikaur-test-pkg"]), {})
+
+    def test_version_mismatch(self):
+        with self.assertRaises(DependencyVersionMismatchError):
+            self.find_aur_deps([])
@@ -0,0 +1,71 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+from threading import Barrier
+from typing import Any
+from unittest import mock
+
+from pikaur.build import PackageBuild, prefetch_sources
+from pikaur.build_cache import BuildCache
+from pikaur.local_repo import LocalRepo
+from pikaur_test.helpers import PikaurTestCase
+
+
+def make_package_build(pkg_base: str, *, reviewed: bool = True, prebuilt: bool = False) -> Any:
+    pkg_build = mock.Mock(spec=PackageBuild)
+    pkg_build.package_base = pkg_base
+    pkg_build.package_names = [pkg_base]
+    pkg_build.reviewed = reviewed
+    pkg_build.has_build_results.return_value = prebuilt
+    return pkg_build
+
+
+class PrefetchSourcesTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.config = mock.MagicMock()
+        self.config.return_value.build.PrefetchJobs.get_int.return_value = 2
+        self.start_patchers(
+            mock.patch("pikaur.build.PikaurConfig", new=self.config),
+            mock.patch("pikaur.build.UsingDynamicUsers", return_value=False),
+        )
+
+    def test_prefetched_concurrently(self):
+        pkg_builds = [
+            make_package_build("pikaur-first"),
+            make_package_build("pikaur-second"),
+            make_package_build("pikaur-not-reviewed", reviewed=False),
+            make_package_build("pikaur-prebuilt", prebuilt=True),
+        ]
+        # both prefetches have to be running at the same time to pass the barrier:
+        barrier = Barrier(2, timeout=10)
+        prefetched: list[str] = []
+
+        def prefetch(pkg_build: PackageBuild) -> None:
+            barrier.wait()
+            prefetched.append(pkg_build.package_base)
+
+        with mock.patch.object(PackageBuild, "prefetch_sources", new=prefetch):
+            prefetch_sources(pkg_builds, {})
+        self.assertEqual(sorted(prefetched), ["pikaur-first", "pikaur-second"])
+
+    def test_disabled(self):
+        self.config.return_value.build.PrefetchJobs.get_int.return_value = 0
+        with mock.patch.object(PackageBuild, "prefetch_sources") as prefetch:
+            prefetch_sources([make_package_build("pikaur-first")], {})
+        prefetch.assert_not_called()
+
+    def test_already_built_not_prefetched(self):
+        pkg_build = make_package_build("pikaur-test-pkg")
+        pkg_build.args = mock.Mock(rebuild=False)
+        pkg_build.is_dep = False
+        pkg_build.is_already_built.return_value = True
+        with (
+                mock.patch.object(LocalRepo, "find_package", return_value=None),
+                mock.patch.object(BuildCache, "get_key", return_value="key"),
+                mock.patch.object(BuildCache, "contains", return_value=False),
+                mock.patch.object(BuildCache, "get") as cache_get,
+        ):
+            self.assertTrue(PackageBuild.has_build_results(pkg_build, {}))
+        cache_get.assert_not_called()
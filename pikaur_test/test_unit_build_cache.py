@@ -0,0 +1,167 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+import hashlib
+import json
+from pathlib import Path
+from unittest import mock
+
+from pikaur.build import PackageBuild
+from pikaur.build_cache import BuildCache
+from pikaur.db_snapshot import PackageDBSnapshot, PackageSnapshot
+from pikaur.makepkg_config import MakePkgCommand, MakepkgConfig
+from pikaur_test.helpers import PikaurTestCase
+
+SRCINFO = """pkgbase = pikaur-test-pkg
+\tpkgver = 1.0
+\tpkgrel = 1
+\tmakedepends = pikaur-test-makedep>=2
+\tsha256sums = {checksum}
+
+pkgname = pikaur-test-pkg
+"""
+
+
+def make_key(name: str) -> str:
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+class BuildCacheTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_path = self.make_tmp_path()
+        self.cache_path = self.tmp_path / "build_results"
+        self.max_size = 1024 * 1024
+        self.start_patchers(
+            mock.patch("pikaur.build_cache.BuildResultsCachePath", new=lambda: self.cache_path),
+            mock.patch.object(BuildCache, "get_max_size", new=lambda: self.max_size),
+        )
+
+    def make_package_file(self, name: str, size: int = 1) -> Path:
+        path = self.tmp_path / "pkg" / f"{name}-1.0-1-any.pkg.tar.zst"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * size)
+        return path
+
+    def test_restore(self):
+        self.assertFalse(BuildCache.restore(make_key("key"), self.tmp_path / "dest"))
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        pkg_path.with_name(pkg_path.name + ".sig").write_bytes(b"sig")
+        BuildCache.put(make_key("key"), "pikaur-test-pkg", [pkg_path])
+        self.assertTrue(BuildCache.restore(make_key("key"), self.tmp_path / "dest"))
+        self.assertEqual(
+            sorted(path.name for path in (self.tmp_path / "dest").iterdir()),
+            [pkg_path.name, pkg_path.name + ".sig"],
+        )
+
+    def test_least_recently_used_evicted(self):
+        self.max_size = 2
+        for key in ("first", "second"):
+            BuildCache.put(make_key(key), key, [self.make_package_file(key)])
+        self.assertIsNotNone(BuildCache.get(make_key("first")))
+        BuildCache.put(make_key("third"), "third", [self.make_package_file("third")])
+        self.assertIsNotNone(BuildCache.get(make_key("first")))
+        self.assertIsNone(BuildCache.get(make_key("second")))
+        self.assertFalse((self.cache_path / make_key("second")).exists())
+        self.assertFalse(BuildCache.put(
+            make_key("too-big"), "too-big", [self.make_package_file("too-big", size=3)],
+        ))
+        self.assertIsNone(BuildCache.get(make_key("too-big")))
+
+    def test_contains_not_marked_as_used(self):
+        self.max_size = 2
+        self.assertFalse(BuildCache.contains(make_key("first")))
+        for key in ("first", "second"):
+            BuildCache.put(make_key(key), key, [self.make_package_file(key)])
+        self.assertTrue(BuildCache.contains(make_key("first")))
+        BuildCache.put(make_key("third"), "third", [self.make_package_file("third")])
+        self.assertFalse(BuildCache.contains(make_key("first")))
+        self.assertTrue(BuildCache.contains(make_key("second")))
+
+    def test_import_cache(self):
+        other_cache_path = self.tmp_path / "other_build_results"
+        self.max_size = 4
+        with mock.patch("pikaur.build_cache.BuildResultsCachePath", new=lambda: other_cache_path):
+            BuildCache.put(
+                make_key("key"), "pikaur-test-pkg", [self.make_package_file("pikaur-test-pkg")],
+            )
+            BuildCache.put(
+                make_key("too-big"), "too-big", [self.make_package_file("too-big", size=3)],
+            )
+        self.max_size = 2
+        self.assertEqual(BuildCache.import_cache(other_cache_path), [make_key("key")])
+        self.assertEqual(BuildCache.import_cache(other_cache_path), [])
+        cached_paths = BuildCache.get(make_key("key"))
+        self.assertIsNotNone(cached_paths)
+        self.assertEqual(
+            [path.parent for path in cached_paths or []], [self.cache_path / make_key("key")],
+        )
+
+    def test_import_cache_paths_not_trusted(self):
+        other_cache_path = self.tmp_path / "other_build_results"
+        outside_path = self.make_package_file("pikaur-test-outside")
+        (other_cache_path / make_key("key")).mkdir(parents=True)
+        (other_cache_path / BuildCache.INDEX_FILENAME).write_text(json.dumps({
+            "version": BuildCache.FORMAT_VERSION,
+            "entries": {
+                f"../../pkg/{make_key('key')}": {
+                    "package_base": "pikaur-test-pkg", "files": [outside_path.name],
+                    "size": 1, "last_used": 0,
+                },
+                make_key("key"): {
+                    "package_base": "pikaur-test-pkg", "files": [f"../../pkg/{outside_path.name}"],
+                    "size": 1, "last_used": 0,
+                },
+                make_key("not-a-package"): {
+                    "package_base": "pikaur-test-pkg", "files": [BuildCache.INDEX_FILENAME],
+                    "size": 1, "last_used": 0,
+                },
+            },
+        }))
+        self.assertEqual(BuildCache.import_cache(other_cache_path), [])
+        self.assertTrue(outside_path.exists())
+        self.assertFalse(self.cache_path.exists())
+
+    def test_key_depends_on_build_inputs(self):
+        build_dir = self.tmp_path / "build"
+        build_dir.mkdir()
+        (build_dir / "PKGBUILD").write_text("pkgname=pikaur-test-pkg")
+        pkg_build = mock.Mock(spec=PackageBuild)
+        pkg_build.build_dir = build_dir
+        pkg_build.package_base = "pikaur-test-pkg"
+        pkg_build.package_names = ["pikaur-test-pkg"]
+        pkg_build.current_hash = "0123abcd"
+        pkg_build.skip_carch_check = False
+        pkg_build.get_all_provided_pkgnames.return_value = {}
+        makedep = PackageSnapshot(
+            name="pikaur-test-makedep", version="2.0-1", repo="extra",
+            provides=[], depends=[], optdepends=[], conflicts=[], replaces=[], groups=[],
+        )
+        makepkg_config = {"CFLAGS": "-O2"}
+        build_workers: list[str] = []
+        self.start_patchers(
+            mock.patch("pikaur.build_cache.get_build_workers", new=lambda: build_workers),
+            mock.patch.object(MakepkgConfig, "get", new=makepkg_config.get),
+            mock.patch.object(MakePkgCommand, "get", return_value=["makepkg"]),
+            mock.patch.object(
+                PackageDBSnapshot, "find_satisfier",
+                new=lambda _source, _dep_line: makedep,
+            ),
+        )
+
+        (build_dir / ".SRCINFO").write_text(SRCINFO.format(checksum="aaaa"))
+        key = BuildCache.get_key(pkg_build, {})
+        self.assertEqual(key, BuildCache.get_key(pkg_build, {}))
+
+        (build_dir / ".SRCINFO").write_text(SRCINFO.format(checksum="bbbb"))
+        self.assertNotEqual(key, new_key := BuildCache.get_key(pkg_build, {}))
+
+        makepkg_config["CFLAGS"] = "-O3"
+        self.assertNotEqual(new_key, new_key := BuildCache.get_key(pkg_build, {}))
+
+        makedep = makedep._replace(version="2.1-1")
+        self.assertNotEqual(new_key, new_key := BuildCache.get_key(pkg_build, {}))
+
+        build_workers.append("127.0.0.1:7790")
+        self.assertNotEqual(new_key, BuildCache.get_key(pkg_build, {}))
@@ -0,0 +1,158 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest import mock
+
+from pikaur.build_executor import (
+    CHUNK_SIZE,
+    CLIENT_ROLE,
+    WORKER_ROLE,
+    BuildJob,
+    BuildWorkerServer,
+    FrameKind,
+    FrameStream,
+    RemoteBuildExecutor,
+    WorkerProtocolError,
+)
+from pikaur.makepkg_config import MakepkgConfig
+from pikaur_test.helpers import PikaurTestCase
+
+FAKE_MAKEPKG = """
+import os, sys
+from pathlib import Path
+if Path(".git").exists() or not Path("PKGBUILD").exists():
+    sys.exit(2)
+if Path("pikaur-test-source").stat().st_size != 3 * 64 * 1024:
+    sys.exit(3)
+if "PKGEXT='.pkg.tar.zst'" not in Path(sys.argv[sys.argv.index("--config") + 1]).read_text():
+    sys.exit(4)
+print("building with", *sys.argv[1:])
+if "--nocheck" in sys.argv:
+    sys.exit(1)
+(Path(os.environ["PKGDEST"]) / "pikaur-test-pkg-1.0-1-any.pkg.tar.zst").write_bytes(
+    b"package" * 100_000,
+)
+"""
+
+FAKE_PACMAN = """
+import sys
+from pathlib import Path
+args = sys.argv[1:]
+if args[:3] == ["--query", "--quiet", "--file"]:
+    print(*(Path(path).name.split("-1.0-")[0] for path in args[3:]))
+elif args[:2] != ["--query", "--quiet"]:
+    with Path(__file__).with_suffix(".log").open("a") as log:
+        print(*(Path(arg).name for arg in args), file=log)
+"""
+
+
+class RemoteBuildExecutorTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_path = self.make_tmp_path()
+        fake_makepkg_path = self.tmp_path / "makepkg.py"
+        fake_makepkg_path.write_text(FAKE_MAKEPKG)
+        fake_pacman_path = self.tmp_path / "pacman.py"
+        fake_pacman_path.write_text(FAKE_PACMAN)
+        self.pacman_log_path = fake_pacman_path.with_suffix(".log")
+        self.build_dir = self.tmp_path / "build"
+        (self.build_dir / ".git").mkdir(parents=True)
+        (self.build_dir / "PKGBUILD").write_text("pkgname=pikaur-test-pkg\n")
+        # sources bigger than a single frame:
+        (self.build_dir / "pikaur-test-source").write_bytes(os.urandom(3 * CHUNK_SIZE))
+        makepkg_config_path = self.tmp_path / "makepkg.conf"
+        makepkg_config_path.write_text("PKGEXT='.pkg.tar.zst'\n")
+        self.start_patchers(mock.patch.object(
+            MakepkgConfig, "get_config_paths", return_value=[makepkg_config_path],
+        ))
+
+        server = BuildWorkerServer(
+            ("127.0.0.1", 0), [sys.executable, str(fake_makepkg_path)], b"pikaur-test-token",
+            pacman_cmd=[sys.executable, str(fake_pacman_path)], sudo_cmd=[],
+        )
+        self.addCleanup(server.server_close)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        self.addCleanup(server_thread.join)
+        self.addCleanup(server.shutdown)
+        self.worker_address = f"127.0.0.1:{server.server_address[1]}"
+        self.executor = RemoteBuildExecutor([self.worker_address], b"pikaur-test-token")
+
+    def run_job(self, makepkg_args: list[str], dep_packages: list[Path] | None = None) -> int:
+        return self.executor.run(BuildJob(
+            build_dir=self.build_dir,
+            artifacts_dir=self.tmp_path / "pkgdest",
+            makepkg_args=makepkg_args,
+            env={},
+            dep_packages=dep_packages or [],
+        )).returncode
+
+    def test_build(self):
+        self.assertEqual(self.run_job(["--force"]), 0)
+        self.assertEqual(
+            (self.tmp_path / "pkgdest" / "pikaur-test-pkg-1.0-1-any.pkg.tar.zst").read_bytes(),
+            b"package" * 100_000,
+        )
+
+    def test_failed_build(self):
+        self.assertEqual(self.run_job(["--nocheck"]), 1)
+        self.assertFalse((self.tmp_path / "pkgdest").exists())
+        # worker is released after the job:
+        self.assertEqual(self.run_job(["--force"]), 0)
+
+    def test_not_allowed_args(self):
+        self.assertEqual(self.run_job(["--force", "--install"]), 1)
+        self.assertFalse((self.tmp_path / "pkgdest").exists())
+
+    def test_wrong_token(self):
+        self.executor = RemoteBuildExecutor([self.worker_address], b"pikaur-wrong-token")
+        self.assertEqual(self.run_job(["--force"]), 1)
+        self.assertFalse((self.tmp_path / "pkgdest").exists())
+
+    def test_built_deps_installed_on_worker(self):
+        dep_path = self.tmp_path / "pikaur-test-dep-1.0-1-any.pkg.tar.zst"
+        dep_path.write_bytes(b"dep")
+        self.assertEqual(self.run_job(["--force"], [dep_path]), 0)
+        self.assertEqual(
+            self.pacman_log_path.read_text().splitlines(),
+            [
+                f"--upgrade --needed --asdeps --noconfirm {dep_path.name}",
+                "--remove --noconfirm pikaur-test-dep",
+            ],
+        )
+
+
+class FrameStreamTestCase(PikaurTestCase):
+
+    def send_to_client(self, *frames: tuple[bytes, bytes]) -> FrameStream:
+        stream = io.BytesIO()
+        worker = FrameStream(io.BytesIO(), stream, WORKER_ROLE)
+        worker.start_session(b"pikaur-test-token", b"challenge")
+        for kind, payload in frames:
+            worker.send(kind, payload)
+        client = FrameStream(io.BytesIO(stream.getvalue()), io.BytesIO(), CLIENT_ROLE)
+        client.start_session(b"pikaur-test-token", b"challenge")
+        return client
+
+    def test_signed(self):
+        client = self.send_to_client((FrameKind.LOG, b"log"), (FrameKind.RESULT, b"{}"))
+        self.assertEqual(client.recv(), (FrameKind.LOG, b"log"))
+        self.assertEqual(client.recv(), (FrameKind.RESULT, b"{}"))
+
+    def test_tampered(self):
+        client = self.send_to_client((FrameKind.ARTIFACT, b"pikaur-test-pkg"))
+        client.rfile = io.BytesIO(client.rfile.read().replace(b"test", b"evil"))
+        with self.assertRaises(WorkerProtocolError):
+            client.recv()
+
+    def test_reordered(self):
+        client = self.send_to_client((FrameKind.LOG, b"first"), (FrameKind.LOG, b"second"))
+        client.received = 1
+        with self.assertRaises(WorkerProtocolError):
+            client.recv()
@@ -0,0 +1,111 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+import time
+from threading import Barrier, Lock
+from typing import Any
+from unittest import mock
+
+from pikaur.build import PackageBuild
+from pikaur.build_scheduler import BuildScheduler
+from pikaur.exceptions import DependencyCycleError
+from pikaur.prompt import retry_interactive_command
+from pikaur_test.helpers import PikaurTestCase
+
+
+def make_scheduler(graph: dict[str, set[str]], jobs: int = 1) -> BuildScheduler:
+    pkg_builds: list[Any] = []
+    for pkg_base, deps in graph.items():
+        pkg_build = mock.Mock(spec=PackageBuild)
+        pkg_build.package_base = pkg_base
+        pkg_build.get_build_order_deps.return_value = deps
+        pkg_builds.append(pkg_build)
+    with mock.patch.object(PackageBuild, "get_all_provided_pkgnames", return_value={}):
+        return BuildScheduler(pkg_builds, {}, jobs=jobs)
+
+
+class BuildSchedulerTestCase(PikaurTestCase):
+
+    def test_deps_built_first(self):
+        scheduler = make_scheduler({
+            "pikaur-app": {"pikaur-lib", "pikaur-tool"},
+            "pikaur-lib": {"pikaur-tool", "not-being-built"},
+            "pikaur-tool": set(),
+        })
+        built: list[str] = []
+
+        def build(pkg_build: PackageBuild) -> bool:
+            built.append(pkg_build.package_base)
+            return True
+
+        scheduler.run(build)
+        self.assertEqual(built, ["pikaur-tool", "pikaur-lib", "pikaur-app"])
+        self.assertEqual(scheduler.failed, [])
+
+    def test_independent_builds_run_concurrently(self):
+        scheduler = make_scheduler({"pikaur-a": set(), "pikaur-b": set()}, jobs=2)
+        barrier = Barrier(2, timeout=5)
+        scheduler.run(lambda _pkg_build: barrier.wait() is not None)
+
+    def test_failure_cancels_only_dependants(self):
+        scheduler = make_scheduler({
+            "pikaur-broken": set(),
+            "pikaur-app": {"pikaur-lib"},
+            "pikaur-lib": {"pikaur-broken"},
+            "pikaur-other": set(),
+        }, jobs=4)
+        built: list[str] = []
+        lock = Lock()
+
+        def build(pkg_build: PackageBuild) -> bool:
+            with lock:
+                built.append(pkg_build.package_base)
+            return pkg_build.package_base != "pikaur-broken"
+
+        scheduler.run(build)
+        self.assertEqual(sorted(built), ["pikaur-broken", "pikaur-other"])
+        self.assertEqual(scheduler.failed, ["pikaur-broken", "pikaur-lib", "pikaur-app"])
+        self.assertTrue(scheduler.package_builds["pikaur-app"].failed)
+
+    def test_errors_reraised(self):
+        scheduler = make_scheduler({"pikaur-a": set(), "pikaur-b": {"pikaur-a"}})
+        build = mock.Mock(side_effect=RuntimeError)
+        with self.assertRaises(RuntimeError):
+            scheduler.run(build)
+        self.assertEqual(build.call_count, 1)
+
+    def test_cycle_detected(self):
+        with self.assertRaises(DependencyCycleError) as context:
+            make_scheduler({
+                "pikaur-a": {"pikaur-b"},
+                "pikaur-b": {"pikaur-c"},
+                "pikaur-c": {"pikaur-a"},
+                "pikaur-d": set(),
+            })
+        self.assertEqual(
+            sorted(context.exception.package_bases), ["pikaur-a", "pikaur-b", "pikaur-c"],
+        )
+
+    def test_interactive_commands_not_concurrent(self):
+        scheduler = make_scheduler({"pikaur-a": set(), "pikaur-b": set()}, jobs=2)
+        barrier = Barrier(2, timeout=5)
+        lock = Lock()
+        running: list[str] = []
+        max_running: list[int] = []
+
+        def spawn(cmd_args: list[str]) -> Any:
+            with lock:
+                running.append(cmd_args[0])
+                max_running.append(len(running))
+            time.sleep(0.1)
+            with lock:
+                running.remove(cmd_args[0])
+            return mock.Mock(returncode=0)
+
+        def build(pkg_build: PackageBuild) -> bool:
+            barrier.wait()
+            return retry_interactive_command([pkg_build.package_base])
+
+        with mock.patch("pikaur.prompt.interactive_spawn", new=spawn):
+            scheduler.run(build)
+        self.assertEqual(max(max_running), 1)
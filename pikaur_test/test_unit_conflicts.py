@@ -0,0 +1,50 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+from unittest import mock
+
+from pikaur.conflicts import find_conflicting_with_local_pkgs, find_conflicting_with_new_pkgs
+from pikaur.pacman import PackageDB
+from pikaur_test.helpers import PikaurTestCase, make_package_mock
+
+
+def make_provided(pkg_name: str, version: str | None) -> mock.Mock:
+    return mock.Mock(
+        package=make_package_mock(pkg_name), version_matcher=mock.Mock(version=version),
+    )
+
+
+class ConflictsTestCase(PikaurTestCase):
+
+    def test_conflicting_with_local_pkgs(self):
+        index = mock.Mock()
+        index.get_conflicting.return_value = [
+            ("pikaur-test-old", "pikaur-test-pkg<2"),
+            ("pikaur-test-new", "pikaur-test-pkg>=2"),
+            ("pikaur-test-any", "pikaur-test-pkg"),
+            ("pikaur-test-pkg", "pikaur-test-pkg"),
+        ]
+        with mock.patch.object(PackageDB, "get_index", return_value=index):
+            self.assertEqual(
+                find_conflicting_with_local_pkgs(
+                    "pikaur-test-pkg", remote_versions={"pikaur-test-pkg": "2.1-1"},
+                ),
+                {"pikaur-test-pkg": ["pikaur-test-new", "pikaur-test-any"]},
+            )
+
+    def test_conflicting_with_local_providers(self):
+        local_provided = {"pikaur-test-virtual": [
+            make_provided("pikaur-test-old", "1.0"),
+            make_provided("pikaur-test-new", "2.0"),
+            make_provided("pikaur-test-unversioned", None),
+        ]}
+        with mock.patch.object(
+                PackageDB, "get_local_provided_dict", return_value=local_provided,
+        ):
+            self.assertEqual(
+                find_conflicting_with_new_pkgs(
+                    "pikaur-test-pkg", set(), ["pikaur-test-virtual>=2"],
+                    remote_versions={"pikaur-test-unversioned": "3.0-1"},
+                ),
+                {"pikaur-test-pkg": ["pikaur-test-new", "pikaur-test-unversioned"]},
+            )
@@ -0,0 +1,139 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+# pylint: disable=protected-access
+
+import os
+from unittest import mock
+
+from pikaur.db_snapshot import PackageDBSnapshot, PackageSnapshot
+from pikaur.pikatypes import PackageSource
+from pikaur_test.helpers import PikaurTestCase
+
+LOCAL_PKGS = [
+    PackageSnapshot(
+        name="pikaur-test-pkg", version="1.0-1", repo="local",
+        provides=["pikaur-test-provided=1.0"], depends=[], optdepends=[],
+        conflicts=[], replaces=[], groups=[],
+    ),
+]
+REPO_PKGS = [
+    PackageSnapshot(
+        name="pikaur-test-pkg", version="1.1-1", repo="extra",
+        provides=[], depends=[], optdepends=[], conflicts=[], replaces=[], groups=[],
+    ),
+]
+
+
+class PackageDBSnapshotTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp_path = self.make_tmp_path()
+        self.db_file = tmp_path / "extra.db"
+        self.db_file.write_bytes(b"")
+        self.start_patchers(
+            mock.patch(
+                "pikaur.db_snapshot.PackageDbSnapshotPath",
+                new=lambda: tmp_path / "pacman_db_snapshot.json",
+            ),
+            mock.patch.object(
+                PackageDBSnapshot, "_get_db_files", new=lambda _source: [self.db_file],
+            ),
+            mock.patch.object(PackageDBSnapshot, "_data", new=None),
+            mock.patch.object(PackageDBSnapshot, "_packages", new={}),
+            mock.patch.object(PackageDBSnapshot, "_indexes", new={}),
+        )
+
+    def get_packages(self, package_source: PackageSource) -> list[PackageSnapshot]:
+        PackageDBSnapshot._data = None
+        PackageDBSnapshot.discard(package_source)
+        return PackageDBSnapshot.get_packages(package_source)
+
+    def test_rebuilt_only_when_db_changed(self):
+        with mock.patch.object(PackageDBSnapshot, "_build", return_value=REPO_PKGS) as build:
+            self.assertEqual(self.get_packages(PackageSource.REPO), REPO_PKGS)
+            self.assertEqual(self.get_packages(PackageSource.REPO), REPO_PKGS)
+            self.assertEqual(build.call_count, 1)
+            os.utime(self.db_file, ns=(0, 0))
+            self.get_packages(PackageSource.REPO)
+            self.assertEqual(build.call_count, 2)
+
+    def test_queries(self):
+        with mock.patch.object(
+                PackageDBSnapshot, "_build",
+                side_effect=lambda source: (
+                    LOCAL_PKGS if source == PackageSource.LOCAL else REPO_PKGS
+                ),
+        ):
+            self.get_packages(PackageSource.LOCAL)
+            self.get_packages(PackageSource.REPO)
+            for dep_line, satisfied in (
+                    ("pikaur-test-pkg", True),
+                    ("pikaur-test-pkg>=1.1", False),
+                    ("pikaur-test-provided", True),
+                    ("pikaur-test-provided<1.0", False),
+                    ("pikaur-test-provided>=1.0", True),
+                    ("pikaur-missing-pkg", False),
+            ):
+                self.assertEqual(
+                    bool(PackageDBSnapshot.find_satisfier(PackageSource.LOCAL, dep_line)),
+                    satisfied,
+                    dep_line,
+                )
+            self.assertEqual(PackageDBSnapshot.get_upgradeable(), LOCAL_PKGS)
+
+    def test_index(self):
+        grouped_pkg = PackageSnapshot(
+            name="pikaur-test-grouped", version="1", repo="local",
+            provides=[], depends=["pikaur-test-provided>=1"], optdepends=["pikaur-test-pkg: x"],
+            conflicts=[], replaces=[], groups=["pikaur-test"],
+        )
+        with mock.patch.object(
+                PackageDBSnapshot, "_build", return_value=[*LOCAL_PKGS, grouped_pkg],
+        ):
+            index = PackageDBSnapshot.get_index(PackageSource.LOCAL)
+        self.assertEqual(index.pkgnames, {"pikaur-test-pkg", "pikaur-test-grouped"})
+        self.assertEqual(
+            [pkg.name for pkg in index.providers["pikaur-test-provided"]], ["pikaur-test-pkg"],
+        )
+        self.assertEqual(
+            [pkg.name for pkg in index.groups["pikaur-test"]], ["pikaur-test-grouped"],
+        )
+        self.assertEqual(
+            index.get_required_by("pikaur-test-pkg", ["pikaur-test-provided=1.0"]),
+            ["pikaur-test-grouped"],
+        )
+        self.assertEqual(index.get_required_by("pikaur-test-grouped", []), [])
+        self.assertEqual(
+            index.get_optional_for("pikaur-test-pkg", []), ["pikaur-test-grouped"],
+        )
+
+    def test_conflicts_and_replaces(self):
+        replacing_pkg = PackageSnapshot(
+            name="pikaur-test-new", version="1", repo="core",
+            provides=[], depends=[], optdepends=[],
+            conflicts=["pikaur-test-pkg<1.1"], replaces=["pikaur-test-pkg", "pikaur-test-new"],
+            groups=[],
+        )
+        with (
+                mock.patch.object(
+                    PackageDBSnapshot, "_build", return_value=[*REPO_PKGS, replacing_pkg],
+                ),
+                mock.patch.object(
+                    PackageDBSnapshot, "get_repo_priorities",
+                    return_value={"core": 0, "extra": 1},
+                ),
+        ):
+            index = PackageDBSnapshot.get_index(PackageSource.REPO)
+            self.assertEqual(
+                sorted(index.get_conflicting("pikaur-test-pkg")),
+                [
+                    ("pikaur-test-new", "pikaur-test-pkg"),
+                    ("pikaur-test-new", "pikaur-test-pkg<1.1"),
+                ],
+            )
+            self.assertEqual(index.get_conflicting("pikaur-missing-pkg"), [])
+            self.assertEqual(index.get_replaces(), {"pikaur-test-new": ["pikaur-test-pkg"]})
+            repo_pkg = PackageDBSnapshot.find_repo_package("pikaur-test-pkg")
+            self.assertEqual(repo_pkg.repo if repo_pkg else None, "extra")
+            self.assertIsNone(PackageDBSnapshot.find_repo_package("pikaur-missing-pkg"))
@@ -0,0 +1,142 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+import base64
+import hashlib
+import io
+import tarfile
+from pathlib import Path
+from unittest import mock
+
+from pikaur.local_repo import LocalRepo
+from pikaur_test.helpers import PikaurTestCase
+
+DESC = """%FILENAME%
+{filename}
+
+%NAME%
+{name}
+
+%BASE%
+{name}
+
+%VERSION%
+{version}
+
+%SHA256SUM%
+{checksum}
+
+%PGPSIG%
+{pgpsig}
+"""
+
+
+class LocalRepoTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_path = self.make_tmp_path()
+        self.repo_path = self.tmp_path / "repo"
+        self.repo_path.mkdir()
+        self.spawn = mock.Mock(return_value=mock.Mock(returncode=0))
+        self.start_patchers(
+            mock.patch.object(LocalRepo, "get_name", new=lambda: "pikaur-test"),
+            mock.patch.object(LocalRepo, "get_path", new=lambda: self.repo_path),
+            mock.patch.object(LocalRepo, "get_url", new=self.repo_path.as_uri),
+            mock.patch.object(LocalRepo, "_packages", new=None),
+            mock.patch("pikaur.local_repo.joined_spawn", new=self.spawn),
+        )
+
+    def make_package_file(self, name: str, content: bytes = b"package") -> Path:
+        path = self.tmp_path / "pkg" / f"{name}-1.0-1-any.pkg.tar.zst"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(content)
+        return path
+
+    def write_db(
+            self, packages: dict[str, tuple[str, str, str]], pgpsig: bytes = b"",
+    ) -> None:
+        with tarfile.open(self.repo_path / "pikaur-test.db", "w:gz") as db_file:
+            for name, (version, filename, checksum) in packages.items():
+                desc = DESC.format(
+                    name=name, version=version, filename=filename, checksum=checksum,
+                    pgpsig=base64.b64encode(pgpsig).decode(),
+                ).encode()
+                member = tarfile.TarInfo(f"{name}-{version}/desc")
+                member.size = len(desc)
+                db_file.addfile(member, io.BytesIO(desc))
+
+    def test_publish(self):
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        pkg_path.with_name(pkg_path.name + ".sig").write_bytes(b"sig")
+        LocalRepo.publish([pkg_path])
+        self.assertEqual(
+            sorted(path.name for path in self.repo_path.iterdir()),
+            [pkg_path.name, pkg_path.name + ".sig"],
+        )
+        self.assertEqual(
+            self.spawn.call_args.args[0],
+            [
+                "repo-add", "--quiet", "--remove",
+                str(self.repo_path / "pikaur-test.db.tar.gz"),
+                str(self.repo_path / pkg_path.name),
+            ],
+        )
+
+    def test_find_and_download(self):
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        self.write_db({
+            "pikaur-test-pkg": (
+                "1.0-1", pkg_path.name, hashlib.sha256(pkg_path.read_bytes()).hexdigest(),
+            ),
+        })
+        LocalRepo.publish([pkg_path])
+        self.assertIsNone(LocalRepo.find_package("pikaur-test-pkg", "1.1-1"))
+        self.assertIsNone(LocalRepo.find_package("pikaur-other-pkg", "1.0-1"))
+        local_repo_pkg = LocalRepo.find_package("pikaur-test-pkg", "1.0-1")
+        self.assertIsNotNone(local_repo_pkg)
+        if not local_repo_pkg:
+            return
+        downloaded_path = LocalRepo.download(local_repo_pkg, self.tmp_path / "dest")
+        self.assertEqual(downloaded_path, self.tmp_path / "dest" / pkg_path.name)
+        self.assertEqual(downloaded_path.read_bytes() if downloaded_path else b"", b"package")
+
+    def test_checksum_mismatch(self):
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        self.write_db({"pikaur-test-pkg": ("1.0-1", pkg_path.name, "0" * 64)})
+        LocalRepo.publish([pkg_path])
+        local_repo_pkg = LocalRepo.find_package("pikaur-test-pkg", "1.0-1")
+        self.assertIsNotNone(local_repo_pkg)
+        if not local_repo_pkg:
+            return
+        self.assertIsNone(LocalRepo.download(local_repo_pkg, self.tmp_path / "dest"))
+
+    def test_download_sanitized(self):
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        self.write_db({
+            "pikaur-test-pkg": (
+                "1.0-1", f"../../{pkg_path.name}", hashlib.sha256(b"package").hexdigest(),
+            ),
+        }, pgpsig=b"sig")
+        LocalRepo.publish([pkg_path])
+        local_repo_pkg = LocalRepo.find_package("pikaur-test-pkg", "1.0-1")
+        self.assertIsNotNone(local_repo_pkg)
+        if not local_repo_pkg:
+            return
+        downloaded_path = LocalRepo.download(local_repo_pkg, self.tmp_path / "dest")
+        self.assertEqual(downloaded_path, self.tmp_path / "dest" / pkg_path.name)
+        self.assertEqual(
+            (self.tmp_path / "dest" / f"{pkg_path.name}.sig").read_bytes(), b"sig",
+        )
+
+    def test_insecure_url_ignored(self):
+        pkg_path = self.make_package_file("pikaur-test-pkg")
+        self.write_db({"pikaur-test-pkg": ("1.0-1", pkg_path.name, "")})
+        with (
+                mock.patch.object(
+                    LocalRepo, "get_url", new=lambda: "http://pikaur-test.example.com",
+                ),
+                mock.patch("pikaur.local_repo.read_bytes_from_url") as read_bytes,
+        ):
+            self.assertIsNone(LocalRepo.find_package("pikaur-test-pkg", "1.0-1"))
+        read_bytes.assert_not_called()
@@ -0,0 +1,22 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+
+from pikaur.package_filter import PackageFilter
+from pikaur_test.helpers import PikaurTestCase
+
+
+class PackageFilterTestCase(PikaurTestCase):
+
+    def test_globs_and_names(self):
+        package_filter = PackageFilter(["pikaur-*-git", "linux?"], names=["pikaur-dep"])
+        self.assertTrue(package_filter("pikaur-test-git"))
+        self.assertTrue(package_filter("linux6"))
+        self.assertTrue(package_filter("pikaur-dep"))
+        self.assertFalse(package_filter("pikaur-test"))
+        self.assertFalse(package_filter("linux-lts"))
+        self.assertFalse(package_filter("pikaur-dep-bin"))
+        self.assertFalse(PackageFilter([])("pikaur"))
+
+    def test_compiled_once(self):
+        self.assertIs(PackageFilter.get(["pikaur-*"]), PackageFilter.get(["pikaur-*"]))
+        self.assertIsNot(PackageFilter.get(["pikaur-*"]), PackageFilter.get(["pikaur"]))
@@ -1,8 +1,20 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/"""
 # mypy: disable-error-code=no-untyped-def
+# pylint: disable=protected-access
 
+from typing import Any
+from unittest import mock
+
+import pyalpm
+
+from pikaur.db_snapshot import PackageDBSnapshot
 from pikaur.pacman import PackageDB, RepositoryNotFoundError
-from pikaur_test.helpers import PikaurTestCase
+from pikaur_test.helpers import PikaurTestCase, make_package_mock
+
+
+def with_alpm_transactions() -> Any:
+    # pikaur-static's pyalpm, which is used when pyalpm is not installed, doesn't support them:
+    return mock.patch.object(pyalpm, "find_satisfier", create=True, return_value=None)
 
 
 class PacmanTestCase(PikaurTestCase):
@@ -14,3 +26,151 @@ class PacmanTestCase(PikaurTestCase):
     def test_find_repo_package_multiple_providers(self):
         found_pkg = PackageDB.find_repo_package("java-runtime")
         self.assertIn("jdk-openjdk", found_pkg.name)
+
+    def test_print_format_simulated_with_pyalpm(self):
+        pkg = make_package_mock("pikaur-test-pkg", db=mock.Mock())
+        pkg.db.name = "pikaur-test-repo"
+        handle = mock.Mock(ignorepkgs=[])
+        handle.init_transaction.return_value.to_add = [pkg]
+        with (
+                with_alpm_transactions(),
+                mock.patch.object(PackageDB, "get_alpm_handle", return_value=handle),
+                mock.patch.object(PackageDB, "_find_sync_target", return_value=pkg),
+                mock.patch("pikaur.pacman.spawn") as spawn,
+        ):
+            result = PackageDB._simulate_print_format([
+                "pacman", "--sync", "--print-format", "%r/%n", "pikaur-test-pkg",
+            ])
+            spawn.assert_not_called()
+        self.assertIsNotNone(result)
+        if result:
+            self.assertEqual(result.returncode, 0)
+            self.assertEqual(result.stdout_text, "pikaur-test-repo/pikaur-test-pkg")
+        handle.init_transaction.return_value.add_pkg.assert_called_once_with(pkg)
+        handle.init_transaction.return_value.release.assert_called_once()
+
+    def test_print_format_group_not_simulated(self):
+        sync_db = mock.Mock(pkgcache=[])
+        sync_db.get_pkg.return_value = None
+        handle = mock.Mock(ignorepkgs=[])
+        handle.get_syncdbs.return_value = [sync_db]
+        with (
+                with_alpm_transactions(),
+                mock.patch.object(PackageDB, "get_alpm_handle", return_value=handle),
+        ):
+            self.assertIsNone(PackageDB._simulate_print_format([
+                "pacman", "--sync", "--print-format", "%r/%n", "pikaur-test-group",
+            ]))
+        handle.init_transaction.assert_not_called()
+
+    def test_print_format_without_pyalpm(self):
+        with (
+                mock.patch("pikaur.pacman.pyalpm", new=mock.Mock(spec=[])),
+                mock.patch.object(PackageDB, "get_alpm_handle") as handle,
+        ):
+            self.assertIsNone(PackageDB._simulate_print_format([
+                "pacman", "--sync", "--print-format", "%r/%n", "pikaur-test-pkg",
+            ]))
+            handle.assert_not_called()
+
+    def test_print_format_alpm_error_not_cached(self):
+        pkg = make_package_mock("pikaur-test-pkg", db=mock.Mock())
+        pkg.db.name = "pikaur-test-repo"
+        handle = mock.Mock(ignorepkgs=[])
+        handle.init_transaction.return_value.prepare = mock.Mock(
+            side_effect=pyalpm.error("failed to prepare transaction"),
+        )
+        proc = mock.Mock(
+            returncode=0, stdout_text="pikaur-test-repo/pikaur-test-pkg", stderr_text="",
+        )
+        with (
+                with_alpm_transactions(),
+                mock.patch.object(PackageDB, "get_alpm_handle", return_value=handle),
+                mock.patch.object(PackageDB, "_find_sync_target", return_value=pkg),
+                mock.patch.object(PackageDB, "_pacman_pformat_cache", new={}),
+                mock.patch("pikaur.pacman.spawn", return_value=proc) as spawn,
+        ):
+            result = PackageDB._get_print_format_output_raw(["pacman", "--sync", "pikaur-test-pkg"])
+            spawn.assert_called_once()
+        self.assertEqual(result.returncode, 0)
+        handle.init_transaction.return_value.release.assert_called_once()
+
+    def test_print_format_unsupported_args(self):
+        with mock.patch.object(PackageDB, "get_alpm_handle") as handle:
+            self.assertIsNone(PackageDB._simulate_print_format([
+                "pacman", "--sync", "--sysupgrade", "--print-format", "%r/%n",
+            ]))
+            handle.assert_not_called()
+
+    def test_deptest_memoized_per_dep_line(self):
+        with (
+                mock.patch.object(PackageDB, "_pacman_test_cache", new={}),
+                mock.patch.object(
+                    PackageDB, "_get_unsatisfied_dep_lines",
+                    side_effect=lambda dep_lines: [
+                        line for line in dep_lines if line.startswith("missing")
+                    ],
+                ) as deptest,
+        ):
+            self.assertEqual(
+                PackageDB.get_not_found_local_packages(["glibc", "missing-a>=1"]),
+                ["missing-a"],
+            )
+            self.assertEqual(
+                sorted(PackageDB.get_not_found_local_packages([
+                    "missing-a>=1", "glibc", "missing-b",
+                ])),
+                ["missing-a", "missing-b"],
+            )
+        self.assertEqual(
+            [call.args[0] for call in deptest.call_args_list],
+            [["glibc", "missing-a>=1"], ["missing-b"]],
+        )
+
+    def test_local_cache_updated_incrementally(self):
+        old_pkgs = [
+            make_package_mock("pikaur-test-a", provides=["pikaur-test-virtual"]),
+            make_package_mock("pikaur-test-b"),
+        ]
+        new_pkg = make_package_mock("pikaur-test-b", provides=["pikaur-test-virtual"])
+        local_db_path = self.make_tmp_path()
+        for entry in ("pikaur-test-a-1-1", "pikaur-test-b-1-1"):
+            (local_db_path / entry).mkdir()
+            (local_db_path / entry / "desc").write_text("")
+        handle = mock.Mock()
+        handle.get_localdb.return_value.get_pkg = mock.Mock(
+            side_effect={"pikaur-test-b": new_pkg}.get,
+        )
+        self.start_patchers(
+            mock.patch.object(
+                PackageDBSnapshot, "get_local_db_path", new=lambda: local_db_path,
+            ),
+            mock.patch.object(PackageDBSnapshot, "update"),
+            mock.patch.object(PackageDB, "get_alpm_handle", return_value=handle),
+            mock.patch.object(PackageDB, "search_local", return_value=old_pkgs),
+            mock.patch.object(PackageDB, "_packages_list_cache", new={}),
+            mock.patch.object(PackageDB, "_packages_dict_cache", new={}),
+            mock.patch.object(PackageDB, "_provided_dict_cache", new={}),
+            mock.patch.object(PackageDB, "_pacman_test_cache", new={
+                "pikaur-test-virtual": None, "pikaur-test-other": None,
+            }),
+        )
+
+        self.assertNotIn("pikaur-test-virtual", PackageDB.get_local_provided_dict())
+        (local_db_path / "pikaur-test-b-1-1" / "desc").rename(
+            local_db_path / "pikaur-test-b-1-1" / "old_desc",
+        )
+        (local_db_path / "pikaur-test-b-2-1").mkdir()
+        (local_db_path / "pikaur-test-b-2-1" / "desc").write_text("")
+        PackageDB.update_local_cache()
+
+        self.assertEqual(PackageDB.get_local_dict()["pikaur-test-b"], new_pkg)
+        self.assertEqual(
+            [
+                dep.package.name
+                for dep in PackageDB.get_local_provided_dict()["pikaur-test-virtual"]
+            ],
+            ["pikaur-test-a", "pikaur-test-b"],
+        )
+        self.assertEqual(list(PackageDB._pacman_test_cache), ["pikaur-test-other"])
+        handle.get_localdb.return_value.get_pkg.assert_called_once_with("pikaur-test-b")
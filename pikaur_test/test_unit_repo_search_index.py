@@ -0,0 +1,75 @@
+"""Licensed under GPLv3, see https://www.gnu.org/licenses/"""
+# mypy: disable-error-code=no-untyped-def
+# pylint: disable=protected-access
+
+from unittest import mock
+
+import pyalpm
+
+from pikaur.db_snapshot import PackageDBSnapshot
+from pikaur.pacman import PackageDB
+from pikaur.repo_search_index import RepoSearchIndex
+from pikaur_test.helpers import PikaurTestCase, make_package_mock
+
+
+class RepoSearchIndexTestCase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        index_path = self.make_tmp_path() / "repo_search_index.sqlite3"
+        self.db_key = [["extra.db", 1, 1]]
+        pkgs = [
+            make_package_mock(
+                "pikaur-test-pkg", desc="Test Package", provides=["pikaur-test-provided=1"],
+            ),
+            make_package_mock("pikaur-other-pkg", desc="Other package", groups=["pikaur-group"]),
+            make_package_mock("xy", desc="Short one"),
+        ]
+        sync_db = mock.Mock(spec=pyalpm.DB)
+        sync_db.name = "extra"
+        sync_db.search.return_value = pkgs
+        sync_db.get_pkg = {pkg.name: pkg for pkg in pkgs}.get
+        handle = mock.Mock(spec=pyalpm.Handle)
+        handle.get_syncdbs.return_value = [sync_db]
+        self.start_patchers(
+            mock.patch("pikaur.repo_search_index.RepoSearchIndexPath", new=lambda: index_path),
+            mock.patch.object(PackageDBSnapshot, "get_key", new=lambda _source: self.db_key),
+            mock.patch.object(PackageDB, "get_alpm_handle", return_value=handle),
+            mock.patch.object(RepoSearchIndex, "_connection", new=None),
+        )
+        self.addCleanup(self.close_index)
+
+    def close_index(self) -> None:
+        if RepoSearchIndex._connection:
+            RepoSearchIndex._connection.close()
+        RepoSearchIndex._connection = None
+
+    def search(self, queries: list[str], *, names_only: bool = False) -> list[str]:
+        return sorted(
+            pkg.name for pkg in RepoSearchIndex.search(queries, names_only=names_only) or []
+        )
+
+    def test_search(self):
+        self.assertEqual(self.search(["pkg"]), ["pikaur-other-pkg", "pikaur-test-pkg"])
+        self.assertEqual(self.search(["PACKAGE", "test"]), ["pikaur-test-pkg"])
+        self.assertEqual(self.search(["test-provided"]), ["pikaur-test-pkg"])
+        self.assertEqual(self.search(["pikaur-group"]), ["pikaur-other-pkg"])
+        self.assertEqual(self.search(["xy"]), ["xy"])
+        self.assertEqual(self.search(["package", "xy"]), [])
+        self.assertEqual(self.search(["package"], names_only=True), [])
+        self.assertEqual(self.search(["other"], names_only=True), ["pikaur-other-pkg"])
+        self.assertFalse(RepoSearchIndex.can_search(["pikaur.*"]))
+        self.assertFalse(RepoSearchIndex.can_search(["extra/pikaur"]))
+
+    def test_rebuilt_only_when_db_changed(self):
+        with mock.patch.object(
+                RepoSearchIndex, "build", wraps=RepoSearchIndex.build,
+        ) as build:
+            self.search(["pkg"])
+            self.close_index()
+            self.search(["pkg"])
+            self.assertEqual(build.call_count, 1)
+            self.close_index()
+            self.db_key = [["extra.db", 2, 1]]
+            self.search(["pkg"])
+            self.assertEqual(build.call_count, 2)
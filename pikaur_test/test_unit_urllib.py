@@ -1,8 +1,19 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/"""
 # mypy: disable-error-code=no-untyped-def
 
+import os
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from unittest import mock
+
 from pikaur.exceptions import SysExit
-from pikaur.urllib_helper import get_gzip_from_url, read_bytes_from_url
+from pikaur.urllib_helper import (
+    HttpConnectionPool,
+    HttpResponseCache,
+    get_gzip_from_url,
+    read_bytes_from_url,
+)
 from pikaur_test.helpers import PikaurTestCase
 
 
@@ -29,3 +40,63 @@ class UrllibTestcase(PikaurTestCase):
             get_gzip_from_url(
                 "http://example.com", autoretry=False,
             )
+
+
+class HttpConnectionPoolTestcase(PikaurTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tmp_path = self.make_tmp_path()
+        (tmp_path / "index.html").write_bytes(b"pikaur")
+        self.cache_dir = tmp_path / "cache"
+        self.start_patchers(
+            mock.patch.object(SimpleHTTPRequestHandler, "protocol_version", "HTTP/1.1"),
+            mock.patch.object(SimpleHTTPRequestHandler, "log_message"),
+            mock.patch("pikaur.urllib_helper.HttpCachePath", new=lambda: self.cache_dir),
+            mock.patch.object(HttpResponseCache, "_total_size", new=None),
+        )
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=tmp_path),
+        )
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f"http://127.0.0.1:{server.server_port}"
+
+    def test_connection_reused(self):
+        with mock.patch.object(
+                HttpConnectionPool, "_connect", wraps=HttpConnectionPool._connect,  # pylint: disable=protected-access
+        ) as connect:
+            for _ in range(3):
+                self.assertEqual(read_bytes_from_url(self.url + "/index.html"), b"pikaur")
+            self.assertEqual(connect.call_count, 1)
+
+    def test_not_modified_served_from_cache(self):
+        url = self.url + "/index.html"
+        self.assertEqual(read_bytes_from_url(url), b"pikaur")
+        (cached_body_path, ) = self.cache_dir.glob("*.body")
+        cached_body_path.write_bytes(b"cached")
+        self.assertEqual(read_bytes_from_url(url), b"cached")
+
+    def test_least_recently_used_evicted(self):
+        headers = {"ETag": "etag"}
+        with (
+                mock.patch.object(HttpResponseCache, "get_max_size", new=lambda: 4),
+                mock.patch.object(
+                    HttpResponseCache, "_evict", wraps=HttpResponseCache._evict,  # pylint: disable=protected-access
+                ) as evict,
+        ):
+            HttpResponseCache.put("http://first", headers, b"12")
+            HttpResponseCache.put("http://second", headers, b"34")
+            evict.assert_not_called()
+            os.utime(HttpResponseCache._get_paths("http://first")[1], (1, 1))  # pylint: disable=protected-access
+            HttpResponseCache.put("http://third", headers, b"56")
+            evict.assert_called_once()
+        self.assertIsNone(HttpResponseCache.get_body("http://first"))
+        self.assertEqual(HttpResponseCache.get_body("http://third"), b"56")
+
+    def test_redirect_and_not_found(self):
+        # directory without trailing slash is redirected to index.html:
+        self.assertEqual(read_bytes_from_url(self.url + "/."), b"pikaur")
+        with self.assertRaises(SysExit):
+            read_bytes_from_url(self.url + "/not-found", autoretry=False)
@@ -1,7 +1,7 @@
 """Licensed under GPLv3, see https://www.gnu.org/licenses/"""
 # mypy: disable-error-code=no-untyped-def
 
-from pikaur.version import VersionMatcher
+from pikaur.version import DepSpec, VersionMatcher, match_versions
 from pikaur_test.helpers import PikaurTestCase
 
 
@@ -48,3 +48,25 @@ class VersionTest(PikaurTestCase):
         self.assertFalse(
             VersionMatcher(">=12.0.2.u10", is_pkg_deps=True)("12"),
         )
+
+    def test_dep_spec_interned(self):
+        self.assertIs(DepSpec.parse("python>=3.12"), DepSpec.parse("python>=3.12"))
+        self.assertIsNot(
+            DepSpec.parse("python=3.12"), DepSpec.parse("python=3.12", is_pkg_deps=True),
+        )
+        self.assertEqual(VersionMatcher("python>=3.12").pkg_name, "python")
+
+    def test_match_versions(self):
+        self.assertEqual(
+            match_versions(
+                [DepSpec.parse("a>=12"), DepSpec.parse("a<12"), DepSpec.parse("a")],
+                ["11", "12", "13"],
+            ),
+            [[False, True, True], [True, False, False], [True, True, True]],
+        )
+        self.assertEqual(
+            VersionMatcher("<=12", is_pkg_deps=True).match_many(
+                ["12.0.2.u10-1", "13", None],
+            ),
+            [True, False, True],
+        )